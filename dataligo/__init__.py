@@ -1,4 +1,5 @@
 from .core import Ligo
+from .instrumentation import Instrumentation, LoggingSink, MetricsRegistry, OpenTelemetrySink
 from importlib import resources
 try:
     import tomllib
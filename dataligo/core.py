@@ -1,31 +1,45 @@
 import yaml
-from .datalakes.datalake import S3, GCS, AzureBlob
-from .datawarehouses.datawarehouse import BigQuery, SnowFlake, Redshift, StarRocks
-from .databases.database import Postgres, MySQL, Oracle, MsSQL, Sqlite, MariaDB
-from .nosql.nosql import ElasticSearch, MongoDB, DynamoDB, Redis
+import json
+import importlib
+import threading
+import time
+from functools import lru_cache
 from .exceptions import ConfigMissingException, UnSupportedDataSourceException
+from .instrumentation import Instrumentation
+try:
+    from importlib.metadata import entry_points
+except ModuleNotFoundError:
+    from importlib_metadata import entry_points
 
+# Connector classes are referenced as "module:Class" and only imported on first use,
+# so that `import dataligo` does not pull in every cloud SDK.
 DATA_SOURCES = {
-    's3': S3, # AWS S3
-    'gcs': GCS, # Google Cloud Storage
-    'azureblob': AzureBlob, # Azure Blob Storage
-    'bigquery': BigQuery, # Google BigQuery
-    'snowflake': SnowFlake, # SnowFlake
-    'redshift': Redshift, # AWS Redshift
-    'starrocks': StarRocks, # StarRocks
-    'postgresql': Postgres, # PostgreSQL
-    'mysql': MySQL, # MySQL
-    'oracle': Oracle, # Oracle
-    'mssql': MsSQL, # MsSQL, SQLServer
-    'mariadb': MariaDB, # MariaDB
-    'sqlite': Sqlite, # Sqlite
-    'elasticsearch': ElasticSearch, # ElasticSearch
-    'mongodb': MongoDB, # MongoDB
-    'dynamodb': DynamoDB, # DynamoDB
-    'redis': Redis, # Redis
+    's3': 'dataligo.datalakes.datalake:S3', # AWS S3
+    'gcs': 'dataligo.datalakes.datalake:GCS', # Google Cloud Storage
+    'azureblob': 'dataligo.datalakes.datalake:AzureBlob', # Azure Blob Storage
+    'bigquery': 'dataligo.datawarehouses.datawarehouse:BigQuery', # Google BigQuery
+    'snowflake': 'dataligo.datawarehouses.datawarehouse:SnowFlake', # SnowFlake
+    'redshift': 'dataligo.datawarehouses.datawarehouse:Redshift', # AWS Redshift
+    'starrocks': 'dataligo.datawarehouses.datawarehouse:StarRocks', # StarRocks
+    'postgresql': 'dataligo.databases.database:Postgres', # PostgreSQL
+    'mysql': 'dataligo.databases.database:MySQL', # MySQL
+    'oracle': 'dataligo.databases.database:Oracle', # Oracle
+    'mssql': 'dataligo.databases.database:MsSQL', # MsSQL, SQLServer
+    'mariadb': 'dataligo.databases.database:MariaDB', # MariaDB
+    'sqlite': 'dataligo.databases.database:Sqlite', # Sqlite
+    'elasticsearch': 'dataligo.nosql.nosql:ElasticSearch', # ElasticSearch
+    'mongodb': 'dataligo.nosql.nosql:MongoDB', # MongoDB
+    'dynamodb': 'dataligo.nosql.nosql:DynamoDB', # DynamoDB
+    'redis': 'dataligo.nosql.nosql:Redis', # Redis
 
 }
 
+# Third party connectors can register themselves under this entry point group, eg:
+# [project.entry-points."dataligo.connectors"]
+# mysource = "mypackage.connector:MySource"
+# Their credentials are read from the `connectors` section of the config file.
+ENTRY_POINT_GROUP = 'dataligo.connectors'
+
 DATA_SOURCE_GROUP = {
     'datalakes': ['s3','gcs','azureblob'],
     'datawarehouses': ['snowflake','redshift','bigquery','starrocks','synapse'],
@@ -33,18 +47,72 @@ DATA_SOURCE_GROUP = {
     'nosql': ['mongodb','elasticsearch','dynamodb','redis']
 }
 
+_loaded_data_sources = {}
+
+@lru_cache(maxsize=None)
+def _entry_point_data_sources() -> dict:
+    try:
+        eps = entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:
+        # python < 3.10 returns a dict of groups
+        eps = entry_points().get(ENTRY_POINT_GROUP, [])
+    return {ep.name.lower(): ep for ep in eps}
+
+def _load_data_source(data_source: str):
+    """
+    Imports the connector class of the data source on first use and caches it.
+
+    Args:
+        data_source (str): data source name
+
+    Returns:
+        type: ligo data source class
+    """
+    if data_source not in _loaded_data_sources:
+        if data_source in DATA_SOURCES:
+            target = DATA_SOURCES[data_source]
+            if isinstance(target, str):
+                module_name, class_name = target.split(':')
+                target = getattr(importlib.import_module(module_name), class_name)
+        else:
+            target = _entry_point_data_sources()[data_source].load()
+        _loaded_data_sources[data_source] = target
+    return _loaded_data_sources[data_source]
+
+def _close_connector(connector) -> None:
+    close = getattr(connector, 'close', None)
+    if callable(close):
+        close()
+
 class Ligo():
-    def __init__(self,config_path: str=None, name: str = None) -> None:
+    def __init__(self,config_path: str=None, name: str = None, idle_timeout: float = None,
+                 instrumentation: Instrumentation = None) -> None:
         """
         Ligo class create the ligo object which act as the entrypoint for all the data sources.
 
+        Connectors returned by `connect` are cached per data source and config, so the underlying
+        clients (boto3, gcs, azure, elasticsearch, mongodb etc) are created once and shared across threads.
+        Use `close` or the ligo object as a context manager to release them.
+
+        Every connector returned by `connect` reports the metrics of its calls (bytes, rows, wall time, time to first byte,
+        retries, source and target) to the instrumentation of the ligo object, and logs its messages through it instead of printing them.
+
         Args:
             config_path (str, optional): path of the config file (yaml). Defaults to None.
             name (str, optional): name of the ligo object. Useful if using multiple ligo object. Defaults to None.
+            idle_timeout (float, optional): seconds after the last call of a cached connector after which it is closed and dropped
+                                            from the cache. A connector returned by `connect` can not be used anymore once evicted.
+                                            Defaults to None (never).
+            instrumentation (Instrumentation, optional): metric sinks and verbosity of the connectors.
+                                                         Defaults to None (no sinks, messages not printed).
         """
         self.config_path = config_path
         self.name = name
+        self.idle_timeout = idle_timeout
+        self.instrumentation = instrumentation or Instrumentation()
         self._config = None
+        self._connections = {}
+        self._lock = threading.RLock()
         if config_path is not None:
             self.set_config(self.config_path)
 
@@ -61,6 +129,8 @@ class Ligo():
 
     def update_config(self, data_source: str, credential: dict):
         ds_group = self._config_mapper(data_source)
+        # the cached connectors of the old credentials are closed
+        self._drop_connections(data_source)
         if self._config is not None:
             if ds_group in self._config:
                 self._config[ds_group][data_source] = credential
@@ -77,14 +147,17 @@ class Ligo():
         Returns:
             list: list of supported data sources
         """
-        return list(DATA_SOURCES.keys())
+        data_sources = list(DATA_SOURCES.keys())
+        data_sources += [name for name in _entry_point_data_sources() if name not in DATA_SOURCES]
+        return data_sources
 
-    def connect(self,data_source: str):
+    def connect(self,data_source: str, cache: bool = True):
         """
         Takes data source name as input and return the ligo data source object
 
         Args:
             data_source (str): data source name
+            cache (bool, optional): reuse the connector created by a previous call with the same config. Defaults to True.
 
         Returns:
             object: ligo data source object
@@ -92,15 +165,62 @@ class Ligo():
         data_source = data_source.lower()
         supported_data_sources = self.get_supported_data_sources_list()
         if data_source not in supported_data_sources:
-            raise UnSupportedDataSourceException("Mentioned Data Source not supported. Supported Data Sources are",supported_data_sources)
+            raise UnSupportedDataSourceException(f"Mentioned Data Source not supported. Supported Data Sources are {', '.join(supported_data_sources)}")
         if self._config is not None:
             ds_group = self._config_mapper(data_source)
             ds_config = self._config[ds_group][data_source]
-            return DATA_SOURCES[data_source](ds_config)
+            if not cache:
+                return self._create_connector(data_source, ds_config)
+            key = (data_source, json.dumps(ds_config, sort_keys=True, default=str))
+            with self._lock:
+                self._evict_idle_connections()
+                if key not in self._connections:
+                    self._connections[key] = self._create_connector(data_source, ds_config)
+                connector = self._connections[key]
+                connector.last_used = time.monotonic()
+                return connector
         else:
             raise ConfigMissingException("Config file missing. Add the config file path using set_config method.")
 
+    def close(self) -> None:
+        """
+        Closes all the cached connectors and their underlying clients
+        """
+        with self._lock:
+            connectors = list(self._connections.values())
+            self._connections.clear()
+        for connector in connectors:
+            _close_connector(connector)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     # helper function  
     def _config_mapper(self,data_source) -> str:
-        return [key for key, value in DATA_SOURCE_GROUP.items() if data_source in value][0]
+        ds_groups = [key for key, value in DATA_SOURCE_GROUP.items() if data_source in value]
+        if ds_groups:
+            return ds_groups[0]
+        return 'connectors'
+
+    def _create_connector(self, data_source, ds_config):
+        connector = _load_data_source(data_source)(ds_config)
+        connector.instrumentation = self.instrumentation
+        connector.data_source = data_source
+        connector.last_used = time.monotonic()
+        return connector
+
+    def _drop_connections(self, data_source: str) -> None:
+        with self._lock:
+            for key in [key for key in self._connections if key[0] == data_source]:
+                _close_connector(self._connections.pop(key))
+
+    def _evict_idle_connections(self) -> None:
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        for key in [key for key, connector in self._connections.items() if now - connector.last_used > self.idle_timeout]:
+            _close_connector(self._connections.pop(key))
 
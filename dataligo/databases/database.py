@@ -1,11 +1,133 @@
 import connectorx as cx
 import pandas as pd
 #import mariadb
-from ..exceptions import ParamsMissingException, UnSupportedDataFrameException
+from ..exceptions import ParamsMissingException
 from ..datawarehouses.utils import _df_to_file_writer
+from .utils import (_postgres_copy, _mysql_load, _sqlite_connect, _sqlite_write, EngineCache, DEFAULT_SQLITE_PRAGMAS,
+                    DEFAULT_POOL_SIZE, DEFAULT_POOL_MAX_OVERFLOW, DEFAULT_POOL_RECYCLE)
 import os
-from sqlalchemy import create_engine
-from ..utils import which_dataframe
+import re
+import threading
+from ..utils import _to_pandas, _dask, _rebatch, _as_return_type, _worker_connector
+from ..instrumentation import instrumented, _message
+
+# a select from a single table with an optional where clause, the queries whose primary key can split them
+_SINGLE_TABLE_QUERY = re.compile(r'^\s*select\s.+?\sfrom\s+([\w$."`\[\]]+)\s*(?:(?:as\s+)?\w+\s*)?(?:where\s.*)?;?\s*$',
+                                 re.IGNORECASE | re.DOTALL)
+_NOT_SPLITTABLE = re.compile(r'\b(join|group\s+by|union|intersect|except|limit|offset|fetch|top|order\s+by|having|distinct)\b',
+                             re.IGNORECASE)
+_INTEGER_TYPES = ('smallint', 'integer', 'int', 'bigint', 'tinyint', 'mediumint', 'int2', 'int4', 'int8', 'number', 'largeint')
+
+def _query_table(query):
+    """
+    Returns (schema, table) of a select from a single table, or None if the query is not one
+    """
+    match = _SINGLE_TABLE_QUERY.match(query)
+    if match is None or _NOT_SPLITTABLE.search(query):
+        return None
+    parts = [part.strip('"`[]').replace("'", "''") for part in match.group(1).split('.')]
+    return (parts[-2] if len(parts) > 1 else None), parts[-1]
+
+def _primary_key_query(db_type, schema, table):
+    if db_type=='sqlite':
+        return f"SELECT name, type FROM pragma_table_info('{table}') WHERE pk > 0"
+    if db_type=='oracle':
+        owner = f"AND cols.owner = UPPER('{schema}')" if schema else ''
+        return (f"SELECT cols.column_name, tab.data_type FROM all_constraints cons "
+                f"JOIN all_cons_columns cols ON cons.owner = cols.owner AND cons.constraint_name = cols.constraint_name "
+                f"JOIN all_tab_columns tab ON tab.owner = cols.owner AND tab.table_name = cols.table_name AND tab.column_name = cols.column_name "
+                f"WHERE cons.constraint_type = 'P' AND cols.table_name = UPPER('{table}') {owner}")
+    if db_type=='mysql':
+        table_schema = f"'{schema}'" if schema else 'DATABASE()'
+        return (f"SELECT column_name, data_type FROM information_schema.columns "
+                f"WHERE column_key = 'PRI' AND table_name = '{table}' AND table_schema = {table_schema}")
+    table_schema = f"AND LOWER(tc.table_schema) = LOWER('{schema}')" if schema else ''
+    return (f"SELECT kcu.column_name, c.data_type FROM information_schema.table_constraints tc "
+            f"JOIN information_schema.key_column_usage kcu ON tc.constraint_name = kcu.constraint_name "
+            f"AND tc.table_schema = kcu.table_schema AND tc.table_name = kcu.table_name "
+            f"JOIN information_schema.columns c ON c.table_schema = kcu.table_schema AND c.table_name = kcu.table_name "
+            f"AND c.column_name = kcu.column_name "
+            f"WHERE tc.constraint_type = 'PRIMARY KEY' AND LOWER(tc.table_name) = LOWER('{table}') {table_schema}")
+
+def _primary_key(conn_str, db_type, query):
+    """
+    Returns the integer primary key column of the table a single table query selects from, or None if the query
+    is not a single table select or the table has no single column integer primary key.
+    """
+    table = _query_table(query)
+    if table is None:
+        return None
+    keys = cx.read_sql(conn_str, _primary_key_query(db_type, *table), return_type='arrow').to_pylist()
+    if len(keys)!=1:
+        return None
+    column, data_type = list(keys[0].values())
+    return column if str(data_type).lower() in _INTEGER_TYPES else None
+
+def _strip_query(query):
+    """
+    Removes the trailing semicolon of the query, which would end the subquery it is wrapped in
+    """
+    return query.strip().rstrip(';').rstrip()
+
+def _dask_read_query(connector_class, config, database, query):
+    return cx.read_sql(_worker_connector(connector_class, config)._get_conn_str(database), query)
+
+def _cx_dask_read(connector, database, query, partition_on=None, partition_num=None, partition_range=None):
+    """
+    Returns a lazy dask dataframe of the query, each partition being a connectorx query run on the worker.
+    With partition_on, partition_range (the min and max of that integer column by default) is split into
+    partition_num ranges (one per cpu by default), otherwise the whole query is one partition. The tasks
+    carry the connector config, one node of the graph, and build the connection string on the worker.
+    """
+    dask, dd = _dask()
+    conn_str = connector._get_conn_str(database)
+    query = _strip_query(query)
+    queries = [query]
+    if partition_on is not None:
+        if partition_range is None:
+            bounds = cx.read_sql(conn_str, f"SELECT MIN({partition_on}), MAX({partition_on}) FROM ({query}) t", return_type='arrow')
+            low, high = bounds.column(0)[0].as_py(), bounds.column(1)[0].as_py()
+        else:
+            low, high = partition_range
+        if low is not None:
+            step = -(-(int(high) - int(low) + 1) // (partition_num or os.cpu_count() or 1))
+            # as with connectorx, the first and last partitions are open ended, so partition_range is only a hint
+            edges = list(range(int(low) + step, int(high) + 1, step))
+            predicates = ([f"{partition_on} < {edges[0]} OR {partition_on} IS NULL"] if edges else [])
+            predicates += [f"{partition_on} >= {start} AND {partition_on} < {end}" for start, end in zip(edges, edges[1:])]
+            predicates += [f"{partition_on} >= {edges[-1]}" if edges else "1=1"]
+            queries = [f"SELECT * FROM ({query}) t WHERE {predicate}" for predicate in predicates]
+    # the schema of the query, without fetching any row
+    meta = cx.read_sql(conn_str, f"SELECT * FROM ({query}) t WHERE 1=0")
+    config = dask.delayed(connector._config, pure=True)
+    load = dask.delayed(_dask_read_query, pure=True)
+    return dd.from_delayed([load(type(connector), config, database, partition_query) for partition_query in queries], meta=meta)
+
+def _cx_read(connector, database, query, return_type, partition_on=None, partition_num=None, partition_range=None):
+    """
+    Reads the query with connectorx, split on partition_on into partition_num range queries run over their own
+    connections. partition_num without partition_on partitions the query on the primary key of its table.
+    """
+    conn_str = connector._get_conn_str(database)
+    query = _strip_query(query)
+    if partition_on is None and partition_num:
+        partition_on = _primary_key(conn_str, connector.db_type, query)
+        if partition_on is None:
+            _message('No integer primary key to partition the query on, reading it over one connection')
+    if return_type=='dask':
+        return _cx_dask_read(connector, database, query, partition_on, partition_num, partition_range)
+    if partition_on is None:
+        return cx.read_sql(conn_str, query, return_type=return_type)
+    return cx.read_sql(conn_str, query, return_type=return_type, partition_on=partition_on,
+                       partition_num=partition_num or os.cpu_count() or 1, partition_range=partition_range)
+
+def _cx_iter_batches(conn_str, query, batch_size, return_type):
+    """
+    Streams the result of the query as arrow record batches with connectorx and yields dataframes of batch_size rows
+    """
+    reader = cx.read_sql(conn_str, _strip_query(query), return_type='arrow_stream', batch_size=batch_size)
+    for table in _rebatch(reader, batch_size):
+        yield _as_return_type(table, return_type)
 
 class DBCX():
     def __init__(self,config,db_type):
@@ -17,32 +139,70 @@ class DBCX():
             db_type (str): database type (eg: mysql, postgresql, etc). It is passed by the child class
         """
         self.db_type = db_type
+        self._config = config
         self._conn_str = f"{db_type}://{config['USERNAME']}:{config['PASSWORD']}@{config['HOST']}:{config['PORT']}"
+        self._engines = EngineCache(config.get('POOL_SIZE', DEFAULT_POOL_SIZE), config.get('POOL_MAX_OVERFLOW', DEFAULT_POOL_MAX_OVERFLOW),
+                                    config.get('POOL_RECYCLE', DEFAULT_POOL_RECYCLE), config.get('POOL_PRE_PING', True))
+        self._dbname_in_config = False
         if 'DATABASE' in config:
             if config['DATABASE']:
                 self._dbname_in_config = True
                 self._conn_str  = f"{self._conn_str}/{config['DATABASE']}"
 
-    def read_as_dataframe(self,query: str,database: str = None,return_type='pandas'):
+    def close(self) -> None:
+        """
+        Disposes the sqlalchemy engines of the writes and their connection pools
         """
-        Takes query as argument and return dataframe
+        self._engines.dispose()
+
+    def _get_conn_str(self, database=None):
+        if self._dbname_in_config:
+            return self._conn_str
+        elif database:
+            return f"{self._conn_str}/{database}"
+        raise ParamsMissingException(f"database parameter missing. Either add it in config file or pass it as an argument.")
+
+    @instrumented('database')
+    def read_as_dataframe(self,query: str,database: str = None,return_type='pandas', partition_on: str = None,
+                          partition_num: int = None, partition_range: tuple = None):
+        """
+        Takes query as argument and return dataframe. With partition_on (or partition_num alone, which partitions a
+        single table select on the integer primary key of the table), the query is split into partition_num range
+        queries read in parallel over their own connections.
 
         Args:
             query (str): select query
             database (str, optional): database name, if None, it take it from config. Defaults to None.
-            return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
+            partition_on (str, optional): integer column whose range splits the query into partitions. Defaults to None (one connection).
+            partition_num (int, optional): number of partitions. Defaults to None (one per cpu when partitioned).
+            partition_range (tuple, optional): (min, max) of partition_on. Defaults to None (queried from the database).
 
         Returns:
             DataFrame: Depends on the return_type parameter.
         """
-        if self._dbname_in_config:
-            return cx.read_sql(self._conn_str , query,return_type=return_type)
-        elif database:
-            return cx.read_sql(f"{self._conn_str}/{database}", query,return_type=return_type)
-        else:
-            raise ParamsMissingException(f"database parameter missing. Either add it in config file or pass it as an argument.")
+        return _cx_read(self, database, query, return_type, partition_on, partition_num, partition_range)
         
-    def download_as_file(self,query: str, filename: str, database: str = None):
+    @instrumented('database')
+    def iter_batches(self, query: str, database: str = None, batch_size: int = 100000, return_type='pandas'):
+        """
+        Takes query as argument and yields dataframes of batch_size rows. The result set is streamed as arrow
+        record batches, so the memory used is bounded by the batch size instead of the result size.
+
+        Args:
+            query (str): select query
+            database (str, optional): database name, if None, it take it from config. Defaults to None.
+            batch_size (int, optional): number of rows per dataframe. Defaults to 100000.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow). Defaults to 'pandas'.
+
+        Yields:
+            DataFrame: Depends on the return_type parameter.
+        """
+        yield from _cx_iter_batches(self._get_conn_str(database), query, batch_size, return_type)
+
+    @instrumented('filename')
+    def download_as_file(self,query: str, filename: str, database: str = None, partition_on: str = None,
+                         partition_num: int = None, partition_range: tuple = None):
         """
         Takes query as argument and download the data as file
 
@@ -50,11 +210,16 @@ class DBCX():
             query (str): select query
             filename (str): filename to save the file
             database (str, optional): database name, if None, it take it from config. Defaults to None.
+            partition_on (str, optional): integer column splitting the query into parallel reads, see read_as_dataframe. Defaults to None.
+            partition_num (int, optional): number of partitions. Defaults to None.
+            partition_range (tuple, optional): (min, max) of partition_on. Defaults to None.
         """
-        df = self.read_as_dataframe(query=query, database=database, return_type='pandas')
+        df = self.read_as_dataframe(query=query, database=database, return_type='arrow', partition_on=partition_on,
+                                    partition_num=partition_num, partition_range=partition_range)
         _df_to_file_writer(df, filename=filename)
-        print('File saved to the path:', filename)
+        _message('File saved to the path:', filename)
 
+    @instrumented('table_name')
     def write_dataframe(self, df,  table_name: str, database: str = None, if_exists: str = 'append',index=False):
         """
         Takes dataframe, table name as arguments and write the dataframe to database
@@ -66,20 +231,11 @@ class DBCX():
             if_exists (str, optional): operation to do if the table exists. Defaults to 'append'.
             index (bool, optional): Write DataFrame index as a column. Defaults to False.
         """
-        if self._dbname_in_config:
-            engine = create_engine(self._conn_str)    
-        elif database:
-            engine = create_engine(f"{self._conn_str}/{database}")
-        else:
-            raise ParamsMissingException(f"database parameter missing. Either add it in config file or pass it as an argument.")
+        engine = self._engines.get(self._get_conn_str(database))
 
-        if which_dataframe(df)=='pandas':
-            df.to_sql(table_name,engine,if_exists=if_exists,index=index)
-        elif which_dataframe(df)=='polars':
-            df.to_pandas().to_sql(table_name,engine,if_exists=if_exists,index=index)
-        else:
-            raise UnSupportedDataFrameException(f"Unsupported Dataframe: {which_dataframe(df)}")
-        print("Dataframe saved to the table:", f"{table_name}")
+        # to_sql binds the rows from pandas, polars and arrow input is converted
+        _to_pandas(df).to_sql(table_name,engine,if_exists=if_exists,index=index)
+        _message("Dataframe saved to the table:", f"{table_name}")
 
 
 class Postgres(DBCX):
@@ -92,6 +248,30 @@ class Postgres(DBCX):
         """
         super().__init__(config,'postgresql')
 
+    @instrumented('table_name')
+    def write_dataframe(self, df,  table_name: str, database: str = None, if_exists: str = 'append',index=False,
+                        binary: bool = False, parallel: int = 1):
+        """
+        Takes dataframe, table name as arguments and write the dataframe to Postgres with COPY FROM STDIN. The
+        rows are encoded chunk by chunk while they are sent, pandas, polars and arrow frames are encoded from
+        their arrow buffers. A new table is created with the types of the dataframe columns.
+
+        Args:
+            df (DataFrame): Dataframe which need to be loaded
+            table_name (str): table name
+            database (str, optional): database name. Defaults to None.
+            if_exists (str, optional): operation to do if the table exists (fail, replace, append). As with pandas
+                                       to_sql, replace drops the table and fails if views depend on it. Defaults to 'append'.
+            index (bool, optional): Write DataFrame index as a column. Defaults to False.
+            binary (bool, optional): use the binary COPY format instead of csv. The columns of an existing table must
+                                     have the types of the dataframe columns. Defaults to False.
+            parallel (int, optional): number of connections loading slices of the dataframe into a staging table,
+                                      moved into the table in one transaction. Defaults to 1.
+        """
+        engine = self._engines.get(self._get_conn_str(database))
+        _postgres_copy(engine, df, table_name, if_exists=if_exists, index=index, binary=binary, parallel=parallel)
+        _message("Dataframe saved to the table:", f"{table_name}")
+
 class MySQL(DBCX):
     def __init__(self,config):
         """
@@ -102,6 +282,31 @@ class MySQL(DBCX):
         """
         super().__init__(config,'mysql')
 
+    @instrumented('table_name')
+    def write_dataframe(self, df,  table_name: str, database: str = None, if_exists: str = 'append',index=False,
+                        bulk: bool = False):
+        """
+        Takes dataframe, table name as arguments and write the dataframe to the database. With bulk, the rows are
+        loaded with LOAD DATA LOCAL INFILE, streamed from the arrow buffers of the dataframe while they are encoded
+        (the server needs local_infile enabled).
+
+        Args:
+            df (DataFrame): Dataframe which need to be loaded
+            table_name (str): table name
+            database (str, optional): database name. Defaults to None.
+            if_exists (str, optional): operation to do if the table exists. Defaults to 'append'.
+            index (bool, optional): Write DataFrame index as a column. Defaults to False.
+            bulk (bool, optional): load with LOAD DATA LOCAL INFILE instead of INSERT batches. Defaults to False.
+        """
+        if bulk:
+            engine = self._engines.get(self._get_conn_str(database), local_infile=True)
+            _mysql_load(engine, df, table_name, if_exists=if_exists, index=index)
+        else:
+            engine = self._engines.get(self._get_conn_str(database))
+            # to_sql binds the rows from pandas, polars and arrow input is converted
+            _to_pandas(df).to_sql(table_name,engine,if_exists=if_exists,index=index)
+        _message("Dataframe saved to the table:", f"{table_name}")
+
 class Oracle(DBCX):
     def __init__(self,config):
         """
@@ -122,6 +327,7 @@ class MsSQL(DBCX):
         """
         super().__init__(config,'mssql')
     
+    @instrumented('table_name')
     def write_dataframe(self, df, table_name: str, database: str = None, if_exists: str = 'append', index=False):
         """
         Takes dataframe, table name as arguments and write the dataframe to MsSQL
@@ -133,21 +339,11 @@ class MsSQL(DBCX):
             if_exists (str, optional): operation to do if the table exists. Defaults to 'append'.
             index (bool, optional): Write DataFrame index as a column. Defaults to False.
         """
-        conn_str = self.conn_str.replace('mssql','mssql+pymssql')
-        if self._dbname_in_config:
-            engine = create_engine(conn_str)    
-        elif database:
-            engine = create_engine(f"{conn_str}/{database}")
-        else:
-            raise ParamsMissingException(f"database parameter missing. Either add it in config file or pass it as an argument.")
-        
-        if which_dataframe(df)=='pandas':
-            df.to_sql(table_name,engine,if_exists=if_exists,index=index)
-        elif which_dataframe(df)=='polars':
-            df.to_pandas().to_sql(table_name,engine,if_exists=if_exists,index=index)
-        else:
-            raise UnSupportedDataFrameException(f"Unsupported Dataframe: {which_dataframe(df)}")
-        print("Dataframe saved to the table:", f"{table_name}")
+        engine = self._engines.get(self._get_conn_str(database).replace('mssql','mssql+pymssql', 1))
+
+        # to_sql binds the rows from pandas, polars and arrow input is converted
+        _to_pandas(df).to_sql(table_name,engine,if_exists=if_exists,index=index)
+        _message("Dataframe saved to the table:", f"{table_name}")
 
 class Sqlite():
     def __init__(self,config):
@@ -157,52 +353,100 @@ class Sqlite():
         Args:
             config (dict): Automatically loaded from the config file (yaml)
         """
+        self.db_type = 'sqlite'
+        self._config = config
         self._sqlite_conn = 'sqlite://' + config['DB_PATH']
+        self._pragmas = {**DEFAULT_SQLITE_PRAGMAS, **(config.get('PRAGMAS') or {})}
+        # write connections by absolute db path, reused across write_dataframe calls
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def _get_conn_str(self, db_path=None):
+        return 'sqlite://' + db_path if db_path else self._sqlite_conn
 
-    def read_as_dataframe(self, query: str, db_path=None,return_type='pandas'):
+    def _connection(self, abs_db_path):
+        with self._lock:
+            if abs_db_path not in self._connections:
+                self._connections[abs_db_path] = (_sqlite_connect(abs_db_path, self._pragmas), threading.Lock())
+            return self._connections[abs_db_path]
+
+    def close(self) -> None:
+        """
+        Closes the sqlite write connections
         """
-        Takes query as argument and return a dataframe
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for conn, lock in connections.values():
+            with lock:
+                conn.close()
+
+    @instrumented('db_path')
+    def read_as_dataframe(self, query: str, db_path=None,return_type='pandas', partition_on: str = None,
+                          partition_num: int = None, partition_range: tuple = None):
+        """
+        Takes query as argument and return a dataframe. With partition_on (or partition_num alone, which partitions a
+        single table select on the integer primary key of the table), the query is split into partition_num range
+        queries read in parallel.
 
         Args:
             query (str): select query
             db_path (str, optional): sqlite db file path (eg. /home/user/Desktop/my_sqlite.db). If None, It takes that from config file. Defaults to None.
-            return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
+            partition_on (str, optional): integer column whose range splits the query into partitions. Defaults to None (one connection).
+            partition_num (int, optional): number of partitions. Defaults to None (one per cpu when partitioned).
+            partition_range (tuple, optional): (min, max) of partition_on. Defaults to None (queried from the database).
 
         Returns:
             DataFrame: Depends on the return_type parameter.
         """
-        if db_path:
-            return cx.read_sql('sqlite://' + db_path, query, return_type=return_type)
-        else:
-            return cx.read_sql(self._sqlite_conn, query, return_type=return_type)
+        return _cx_read(self, db_path, query, return_type, partition_on, partition_num, partition_range)
+
+    @instrumented('db_path')
+    def iter_batches(self, query: str, db_path=None, batch_size: int = 100000, return_type='pandas'):
+        """
+        Takes query as argument and yields dataframes of batch_size rows. The result set is streamed as arrow
+        record batches, so the memory used is bounded by the batch size instead of the result size.
+
+        Args:
+            query (str): select query
+            db_path (str, optional): sqlite db file path. If None, It takes that from config file. Defaults to None.
+            batch_size (int, optional): number of rows per dataframe. Defaults to 100000.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow). Defaults to 'pandas'.
+
+        Yields:
+            DataFrame: Depends on the return_type parameter.
+        """
+        yield from _cx_iter_batches(self._get_conn_str(db_path), query, batch_size, return_type)
         
-    def write_dataframe(self,df, table_name: str, db_path: str = None, if_exists: str = 'append',index=False):
+    @instrumented('table_name')
+    def write_dataframe(self,df, table_name: str, db_path: str = None, if_exists: str = 'append',index=False,
+                        indexes: list = None, defer_indexes: bool = False):
         """
-        Takes dataframe, table name as arguments and write the dataframe to SQLite
+        Takes dataframe, table name as arguments and write the dataframe to SQLite. The rows are inserted in one
+        transaction with executemany over the arrow column buffers of pandas, polars and arrow frames, on a
+        connection kept open for the next writes to the same database (see PRAGMAS in the config).
 
         Args:
             df (DataFrame): Dataframe which need to be loaded
             table_name (str): table name
             db_path (str, optional): database path. Defaults to None.
-            if_exists (str, optional): operation to do if the table exists. Defaults to 'append'.
+            if_exists (str, optional): operation to do if the table exists (fail, replace, append). Defaults to 'append'.
             index (bool, optional): Write DataFrame index as a column. Defaults to False.
+            indexes (list, optional): columns (or tuples of columns) to index, created after the rows are loaded. Defaults to None.
+            defer_indexes (bool, optional): drop the existing indexes of the table during the load and recreate them after it. Defaults to False.
         """
         if db_path:
             abs_db_path = os.path.abspath(db_path)
         else:
             db_path = self._sqlite_conn.split('//')[-1]
             abs_db_path = os.path.abspath(db_path)
-        conn_str = 'sqlite:///'+abs_db_path
-        engine = create_engine(conn_str)
-        if which_dataframe(df)=='pandas':
-            df.to_sql(table_name,engine,if_exists=if_exists,index=index)
-        elif which_dataframe(df)=='polars':
-            df.to_pandas().to_sql(table_name,engine,if_exists=if_exists,index=index)
-        else:
-            raise UnSupportedDataFrameException(f"Unsupported Dataframe: {which_dataframe(df)}")
-        print("Dataframe saved to the table:", f"{table_name}")
+        conn, lock = self._connection(abs_db_path)
+        with lock:
+            _sqlite_write(conn, df, table_name, if_exists=if_exists, index=index, indexes=indexes,
+                          defer_indexes=defer_indexes)
+        _message("Dataframe saved to the table:", f"{table_name}")
 
-class MariaDB(DBCX):
+class MariaDB(MySQL):
     def __init__(self,config):
         """
         MariaDB class create mariadb ligo object to load data from mariadb database, through mysql protocol 
@@ -210,7 +454,7 @@ class MariaDB(DBCX):
         Args:
             config (dict): Automatically loaded from the config file (yaml)
         """
-        super().__init__(config,'mysql')
+        super().__init__(config)
 
 # class MariaDB():
 #     def __init__(self,config):
@@ -238,7 +482,7 @@ class MariaDB(DBCX):
 #         Args:
 #             query (str): select query
 #             database (str, optional): database name, if None, it take it from config. Defaults to None.
-#             return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
+#             return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
 
 #         Returns:
 #             DataFrame: Depends on the return_type parameter.
@@ -0,0 +1,648 @@
+import io
+import uuid
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, inspect
+from ..utils import which_dataframe, _to_arrow
+from ..exceptions import UnSupportedDataFrameException
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_MAX_OVERFLOW = 10
+# seconds after which a pooled connection is replaced, before servers / load balancers drop idle connections
+DEFAULT_POOL_RECYCLE = 3600
+
+class EngineCache():
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, max_overflow: int = DEFAULT_POOL_MAX_OVERFLOW,
+                 pool_recycle: int = DEFAULT_POOL_RECYCLE, pool_pre_ping: bool = True) -> None:
+        """
+        EngineCache holds the sqlalchemy engines of a connector, one per connection string and connect arguments,
+        so the writes of the connector reuse the pooled connections instead of connecting every call. Engines are
+        thread safe, the cache can be shared by the threads using the connector.
+
+        Args:
+            pool_size (int, optional): connections kept open per engine. Defaults to DEFAULT_POOL_SIZE.
+            max_overflow (int, optional): connections opened above pool_size under load. Defaults to DEFAULT_POOL_MAX_OVERFLOW.
+            pool_recycle (int, optional): seconds after which a connection is replaced. Defaults to DEFAULT_POOL_RECYCLE.
+            pool_pre_ping (bool, optional): check a connection before handing it out. Defaults to True.
+        """
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def get(self, conn_str: str, **connect_args):
+        """
+        Returns the engine of the connection string and connect arguments, creating it on first use
+        """
+        key = (conn_str, tuple(sorted(connect_args.items())))
+        with self._lock:
+            if key not in self._engines:
+                self._engines[key] = create_engine(conn_str, pool_size=self.pool_size, max_overflow=self.max_overflow,
+                                                   pool_recycle=self.pool_recycle, pool_pre_ping=self.pool_pre_ping,
+                                                   connect_args=connect_args)
+            return self._engines[key]
+
+    def dispose(self) -> None:
+        """
+        Disposes the engines and closes their pooled connections. Connections in use are closed when they are returned.
+        """
+        with self._lock:
+            engines, self._engines = self._engines, {}
+        for engine in engines.values():
+            engine.dispose()
+
+# rows encoded at a time by the COPY writers, the memory used is bounded by one chunk per connection
+DEFAULT_COPY_CHUNK_ROWS = 100000
+# bytes psycopg2 reads from the encoded stream per copy message
+_COPY_BUFFER_SIZE = 1024 * 1024
+_PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+_PGCOPY_TRAILER = struct.pack('>h', -1)
+# postgres epoch (2000-01-01) in days and microseconds since the unix epoch
+_PG_EPOCH_DAYS = 10957
+_PG_EPOCH_MICROS = _PG_EPOCH_DAYS * 86400 * 1000000
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _postgres_type(arrow_type, redshift=False):
+    """
+    Returns the postgres (or redshift) column type of an arrow type
+    """
+    import pyarrow as pa
+    import pyarrow.types as t
+    if t.is_dictionary(arrow_type):
+        return _postgres_type(arrow_type.value_type, redshift)
+    if t.is_boolean(arrow_type):
+        return 'BOOLEAN'
+    if t.is_int8(arrow_type) or t.is_int16(arrow_type) or t.is_uint8(arrow_type):
+        return 'SMALLINT'
+    if t.is_int32(arrow_type) or t.is_uint16(arrow_type):
+        return 'INTEGER'
+    if t.is_integer(arrow_type):
+        return 'BIGINT'
+    if t.is_float16(arrow_type) or t.is_float32(arrow_type):
+        return 'REAL'
+    if t.is_float64(arrow_type):
+        return 'DOUBLE PRECISION'
+    if t.is_decimal(arrow_type):
+        return f'NUMERIC({arrow_type.precision},{arrow_type.scale})'
+    if t.is_date(arrow_type):
+        return 'DATE'
+    if t.is_timestamp(arrow_type):
+        return 'TIMESTAMPTZ' if arrow_type.tz else 'TIMESTAMP'
+    if t.is_string(arrow_type) or t.is_large_string(arrow_type) or arrow_type==pa.null():
+        # redshift TEXT is VARCHAR(256)
+        return 'VARCHAR(65535)' if redshift else 'TEXT'
+    if (t.is_binary(arrow_type) or t.is_large_binary(arrow_type)) and not redshift:
+        return 'BYTEA'
+    raise UnSupportedDataFrameException(f"Unsupported column type: {arrow_type}")
+
+def _create_table_sql(table_name, schema, redshift=False):
+    columns = ', '.join(f"{_quote(field.name)} {_postgres_type(field.type, redshift)}" for field in schema)
+    return f"CREATE TABLE {_quote(table_name)} ({columns})"
+
+def _arrow_input(df, index=False):
+    """
+    Returns (schema, table or RecordBatchReader) of the dataframe to write. Record batch readers are
+    streamed as they are, the other frames are converted to an arrow table (polars without a copy).
+    """
+    df_type = which_dataframe(df)
+    if df_type=='arrow_stream':
+        return df.schema, df
+    if df_type=='pandas' and index:
+        df = df.reset_index()
+    table = _to_arrow(df)
+    return table.schema, table
+
+def _batches(data, chunk_rows):
+    if which_dataframe(data)=='arrow_stream':
+        for batch in data:
+            for offset in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(offset, chunk_rows)
+    else:
+        yield from data.to_batches(max_chunksize=chunk_rows)
+
+def _csv_chunks(batches):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    options = pa_csv.WriteOptions(include_header=False)
+    for batch in batches:
+        sink = pa.BufferOutputStream()
+        pa_csv.write_csv(batch, sink, options)
+        yield memoryview(sink.getvalue())
+
+def _binary_column(array):
+    """
+    Returns (payload, width) of an arrow array in the postgres binary format: a (rows, width) uint8 array for the
+    fixed width types, None and the array itself for text / bytea
+    """
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.types as t
+    if t.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    if t.is_string(array.type) or t.is_binary(array.type) or t.is_large_string(array.type) or t.is_large_binary(array.type):
+        return None, array
+    if t.is_boolean(array.type):
+        values, dtype = array.cast(pa.uint8()), '>u1'
+    elif t.is_int8(array.type) or t.is_int16(array.type) or t.is_uint8(array.type):
+        values, dtype = array.cast(pa.int16()), '>i2'
+    elif t.is_int32(array.type) or t.is_uint16(array.type):
+        values, dtype = array.cast(pa.int32()), '>i4'
+    elif t.is_integer(array.type):
+        values, dtype = array.cast(pa.int64()), '>i8'
+    elif t.is_float16(array.type) or t.is_float32(array.type):
+        values, dtype = array.cast(pa.float32()), '>f4'
+    elif t.is_float64(array.type):
+        values, dtype = array, '>f8'
+    elif t.is_date(array.type):
+        values, dtype = pc.subtract(array.cast(pa.date32()).cast(pa.int32()), _PG_EPOCH_DAYS), '>i4'
+    elif t.is_timestamp(array.type):
+        micros = array.cast(pa.timestamp('us', array.type.tz), safe=False).cast(pa.int64())
+        values, dtype = pc.subtract(micros, _PG_EPOCH_MICROS), '>i8'
+    else:
+        raise UnSupportedDataFrameException(f"Unsupported column type for binary COPY: {array.type}")
+    values = values.fill_null(0).to_numpy(zero_copy_only=False).astype(dtype)
+    return values.view(np.uint8).reshape(len(array), -1), values.dtype.itemsize
+
+def _variable_width_buffers(array):
+    """
+    Returns the (offsets, data) numpy views of a string / binary arrow array
+    """
+    import numpy as np
+    import pyarrow.types as t
+    dtype = np.int64 if t.is_large_string(array.type) or t.is_large_binary(array.type) else np.int32
+    _, offsets, data = array.buffers()
+    offsets = np.frombuffer(offsets, dtype=dtype, count=len(array) + 1, offset=array.offset * np.dtype(dtype).itemsize)
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.empty(0, dtype=np.uint8)
+    return offsets.astype(np.int64), data
+
+def _pgcopy_batch(batch):
+    """
+    Encodes a record batch as rows of the postgres binary COPY format, with numpy instead of a python loop per value
+    """
+    import numpy as np
+    rows = batch.num_rows
+    columns = []
+    row_sizes = np.full(rows, 2, dtype=np.int64)
+    for array in batch.columns:
+        valid = np.ones(rows, dtype=bool) if array.null_count==0 else array.is_valid().to_numpy(zero_copy_only=False)
+        payload, width = _binary_column(array)
+        if payload is None:
+            offsets, data = _variable_width_buffers(width)
+            lengths = np.diff(offsets)
+        else:
+            lengths = np.full(rows, width, dtype=np.int64)
+            offsets = data = None
+        lengths = np.where(valid, lengths, -1)
+        row_sizes += 4 + np.maximum(lengths, 0)
+        columns.append((payload, valid, lengths, offsets, data))
+    starts = np.zeros(rows, dtype=np.int64)
+    np.cumsum(row_sizes[:-1], out=starts[1:])
+    out = np.empty(int(row_sizes.sum()), dtype=np.uint8)
+    out[starts[:, None] + np.arange(2)] = np.frombuffer(struct.pack('>h', len(columns)), dtype=np.uint8)
+    position = starts + 2
+    for payload, valid, lengths, offsets, data in columns:
+        out[position[:, None] + np.arange(4)] = lengths.astype('>i4').view(np.uint8).reshape(rows, 4)
+        position += 4
+        if payload is not None:
+            out[position[valid][:, None] + np.arange(payload.shape[1])] = payload[valid]
+        else:
+            sizes = np.maximum(lengths, 0)
+            row_of_byte = np.repeat(np.arange(rows), sizes)
+            within = np.arange(len(row_of_byte)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            out[position[row_of_byte] + within] = data[offsets[row_of_byte] + within]
+        position += np.maximum(lengths, 0)
+    return memoryview(out)
+
+def _binary_chunks(batches):
+    yield _PGCOPY_HEADER
+    for batch in batches:
+        if batch.num_rows:
+            yield _pgcopy_batch(batch)
+    yield _PGCOPY_TRAILER
+
+class _ChunkStream(io.RawIOBase):
+    def __init__(self, chunks) -> None:
+        """
+        Readable file object over an iterator of bytes-like chunks, encoded as they are read
+        """
+        self._chunks = iter(chunks)
+        self._chunk = memoryview(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not len(self._chunk):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk = memoryview(chunk).cast('B')
+        n = min(len(b), len(self._chunk))
+        b[:n] = self._chunk[:n]
+        self._chunk = self._chunk[n:]
+        return n
+
+def _copy_from_stdin(conn, table_name, columns, chunks, binary=False):
+    """
+    Runs COPY table (columns) FROM STDIN on the DBAPI connection (psycopg2 or psycopg 3), sending the chunks
+    as they are encoded
+    """
+    column_list = ', '.join(_quote(column) for column in columns)
+    sql = f"COPY {_quote(table_name)} ({column_list}) FROM STDIN WITH (FORMAT {'binary' if binary else 'csv'})"
+    cur = conn.cursor()
+    try:
+        if hasattr(cur, 'copy_expert'):
+            cur.copy_expert(sql, io.BufferedReader(_ChunkStream(chunks), _COPY_BUFFER_SIZE), size=_COPY_BUFFER_SIZE)
+        else:
+            with cur.copy(sql) as copy:
+                for chunk in chunks:
+                    copy.write(chunk)
+    finally:
+        cur.close()
+
+def _execute(engine, *statements):
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        for statement in statements:
+            cur.execute(statement)
+        cur.close()
+        conn.commit()
+    finally:
+        conn.close()
+
+def _postgres_copy(engine, df, table_name, if_exists='append', index=False, binary=False, parallel=1,
+                   chunk_rows=DEFAULT_COPY_CHUNK_ROWS):
+    """
+    Writes the dataframe to the postgres table with COPY FROM STDIN. The rows are encoded as csv (or the binary
+    COPY format) chunk by chunk while they are sent, from arrow buffers, so polars and arrow input is not converted
+    to pandas. With parallel > 1, the slices of the frame are copied over parallel connections into a staging table
+    which is then moved into the table in one transaction. A replaced table is dropped and swapped with the staging
+    table in one transaction, so as with pandas to_sql the replace fails if views depend on the table.
+
+    Args:
+        engine (Engine): sqlalchemy engine of a psycopg2 / psycopg postgres url
+        df (DataFrame): pandas, polars or arrow (Table, RecordBatch, RecordBatchReader) frame
+        table_name (str): table name
+        if_exists (str, optional): fail, replace or append, as for pandas to_sql. Defaults to 'append'.
+        index (bool, optional): write the index of a pandas frame as a column. Defaults to False.
+        binary (bool, optional): use the binary COPY format, the column types of an existing table must then
+                                 match the frame types. Defaults to False (csv).
+        parallel (int, optional): number of connections loading the frame. Defaults to 1.
+        chunk_rows (int, optional): rows encoded at a time. Defaults to DEFAULT_COPY_CHUNK_ROWS.
+    """
+    schema, data = _arrow_input(df, index)
+    exists = inspect(engine).has_table(table_name)
+    if exists and if_exists=='fail':
+        raise ValueError(f"Table '{table_name}' already exists.")
+    encode = _binary_chunks if binary else _csv_chunks
+    if parallel <= 1 and not (exists and if_exists=='replace'):
+        conn = engine.raw_connection()
+        try:
+            if not exists:
+                cur = conn.cursor()
+                cur.execute(_create_table_sql(table_name, schema))
+                cur.close()
+            _copy_from_stdin(conn, table_name, schema.names, encode(_batches(data, chunk_rows)), binary)
+            conn.commit()
+        finally:
+            conn.close()
+        return
+    stage = f"{table_name}_stage_{uuid.uuid4().hex[:8]}"
+    if exists and if_exists=='append':
+        # the staging table is dropped after the insert, it does not need the wal
+        _execute(engine, f"CREATE UNLOGGED TABLE {_quote(stage)} (LIKE {_quote(table_name)} INCLUDING DEFAULTS)")
+    else:
+        _execute(engine, _create_table_sql(stage, schema))
+    try:
+        if which_dataframe(data)=='arrow_stream':
+            data = data.read_all()
+        step = -(-data.num_rows // parallel) or 1
+        def load(offset):
+            conn = engine.raw_connection()
+            try:
+                _copy_from_stdin(conn, stage, schema.names, encode(_batches(data.slice(offset, step), chunk_rows)), binary)
+                conn.commit()
+            finally:
+                conn.close()
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            list(executor.map(load, range(0, max(data.num_rows, 1), step)))
+        if exists and if_exists=='append':
+            column_list = ', '.join(_quote(column) for column in schema.names)
+            _execute(engine, f"INSERT INTO {_quote(table_name)} ({column_list}) SELECT {column_list} FROM {_quote(stage)}",
+                     f"DROP TABLE {_quote(stage)}")
+        else:
+            _execute(engine, f"DROP TABLE IF EXISTS {_quote(table_name)}", f"ALTER TABLE {_quote(stage)} RENAME TO {_quote(table_name)}")
+    finally:
+        # a no-op once the staging table is moved into the table
+        _execute(engine, f"DROP TABLE IF EXISTS {_quote(stage)}")
+
+# pragmas of the sqlite write connections, overridden by PRAGMAS in the config. journal_mode=WAL is left out: the
+# reads go through the sqlite library bundled in connectorx, and two sqlite libraries in one process do not see
+# each other's wal locks (stale reads and disk I/O errors)
+DEFAULT_SQLITE_PRAGMAS = {'synchronous': 'NORMAL', 'cache_size': -65536}
+# rows bound per executemany call of the sqlite writer
+DEFAULT_SQLITE_CHUNK_ROWS = 50000
+
+def _sqlite_connect(db_path, pragmas):
+    """
+    Opens a sqlite connection in autocommit mode (transactions are explicit) usable from any thread, and sets the pragmas
+    """
+    import sqlite3
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+def _sqlite_type(arrow_type):
+    """
+    Returns the sqlite column type of an arrow type, named as sqlalchemy creates them for pandas to_sql
+    """
+    import pyarrow.types as t
+    if t.is_dictionary(arrow_type):
+        return _sqlite_type(arrow_type.value_type)
+    if t.is_boolean(arrow_type):
+        return 'BOOLEAN'
+    if t.is_integer(arrow_type):
+        return 'BIGINT'
+    if t.is_floating(arrow_type) or t.is_decimal(arrow_type):
+        return 'FLOAT'
+    if t.is_date(arrow_type):
+        return 'DATE'
+    if t.is_timestamp(arrow_type):
+        return 'DATETIME'
+    if t.is_binary(arrow_type) or t.is_large_binary(arrow_type):
+        return 'BLOB'
+    return 'TEXT'
+
+def _sqlite_column(array):
+    """
+    Returns the values of an arrow array as a python list of sqlite values. Timestamps and dates are stored as
+    iso strings and booleans as integers, as sqlalchemy stores them.
+    """
+    import pyarrow as pa
+    import pyarrow.types as t
+    if t.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    if t.is_boolean(array.type):
+        array = array.cast(pa.int8())
+    elif t.is_decimal(array.type):
+        array = array.cast(pa.float64())
+    elif t.is_timestamp(array.type):
+        # timezone aware values are stored in utc
+        array = array.cast(pa.timestamp('us'), safe=False).cast(pa.string())
+    elif t.is_date(array.type) or t.is_time(array.type):
+        array = array.cast(pa.string())
+    if array.null_count==0 and (t.is_integer(array.type) or t.is_floating(array.type)):
+        # numpy builds the python numbers much faster than arrow scalars
+        return array.to_numpy().tolist()
+    return array.to_pylist()
+
+def _sqlite_write(conn, df, table_name, if_exists='append', index=False, indexes=None, defer_indexes=False,
+                  chunk_rows=DEFAULT_SQLITE_CHUNK_ROWS):
+    """
+    Writes the dataframe to the sqlite table in one transaction, binding chunks of rows built from the arrow column
+    buffers with executemany.
+
+    Args:
+        conn (sqlite3.Connection): connection in autocommit mode, see _sqlite_connect
+        df (DataFrame): pandas, polars or arrow frame
+        table_name (str): table name
+        if_exists (str, optional): fail, replace or append. Defaults to 'append'.
+        index (bool, optional): write the index of a pandas frame as a column. Defaults to False.
+        indexes (list, optional): columns (or tuples of columns) indexed after the rows are loaded. Defaults to None.
+        defer_indexes (bool, optional): drop the existing indexes of the table before the load and recreate them
+                                        after it, in the same transaction. Defaults to False.
+        chunk_rows (int, optional): rows bound per executemany call. Defaults to DEFAULT_SQLITE_CHUNK_ROWS.
+    """
+    schema, data = _arrow_input(df, index)
+    quoted = _quote(table_name)
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone()
+        if exists and if_exists=='fail':
+            raise ValueError(f"Table '{table_name}' already exists.")
+        if exists and if_exists=='replace':
+            conn.execute(f"DROP TABLE {quoted}")
+        if not exists or if_exists=='replace':
+            columns = ', '.join(f"{_quote(field.name)} {_sqlite_type(field.type)}" for field in schema)
+            conn.execute(f"CREATE TABLE {quoted} ({columns})")
+        deferred = []
+        if defer_indexes and exists and if_exists=='append':
+            deferred = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+                                    (table_name,)).fetchall()
+            for name, _ in deferred:
+                conn.execute(f"DROP INDEX {_quote(name)}")
+        column_list = ', '.join(_quote(name) for name in schema.names)
+        insert = f"INSERT INTO {quoted} ({column_list}) VALUES ({', '.join('?' * len(schema.names))})"
+        for batch in _batches(data, chunk_rows):
+            conn.executemany(insert, zip(*(_sqlite_column(column) for column in batch.columns)))
+        for _, sql in deferred:
+            conn.execute(sql)
+        for columns in indexes or []:
+            columns = (columns,) if isinstance(columns, str) else tuple(columns)
+            name = _quote(f"ix_{table_name}_{'_'.join(columns)}")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {quoted} ({', '.join(_quote(column) for column in columns)})")
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+
+def _backquote(name):
+    return '`' + name.replace('`', '``') + '`'
+
+def _mysql_type(arrow_type, starrocks=False):
+    """
+    Returns the mysql (or starrocks) column type of an arrow type
+    """
+    import pyarrow.types as t
+    if t.is_dictionary(arrow_type):
+        return _mysql_type(arrow_type.value_type, starrocks)
+    if t.is_boolean(arrow_type):
+        return 'BOOLEAN'
+    if t.is_int8(arrow_type):
+        return 'TINYINT'
+    if t.is_int16(arrow_type) or t.is_uint8(arrow_type):
+        return 'SMALLINT'
+    if t.is_int32(arrow_type) or t.is_uint16(arrow_type):
+        return 'INT'
+    if t.is_integer(arrow_type):
+        return 'BIGINT'
+    if t.is_float16(arrow_type) or t.is_float32(arrow_type):
+        return 'FLOAT'
+    if t.is_float64(arrow_type):
+        return 'DOUBLE'
+    if t.is_decimal(arrow_type):
+        return f'DECIMAL({arrow_type.precision},{arrow_type.scale})'
+    if t.is_date(arrow_type):
+        return 'DATE'
+    if t.is_timestamp(arrow_type):
+        return 'DATETIME' if starrocks else 'DATETIME(6)'
+    if t.is_binary(arrow_type) or t.is_large_binary(arrow_type):
+        return 'VARBINARY' if starrocks else 'LONGBLOB'
+    return 'STRING' if starrocks else 'TEXT'
+
+def _mysql_create_table_sql(table_name, schema, starrocks=False):
+    columns = ', '.join(f"{_backquote(field.name)} {_mysql_type(field.type, starrocks)}" for field in schema)
+    return f"CREATE TABLE {_backquote(table_name)} ({columns})"
+
+def _text_column(array):
+    """
+    Returns the arrow array as a large_string array of the values as mysql / starrocks parse them
+    """
+    import pyarrow as pa
+    import pyarrow.types as t
+    if t.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    if t.is_boolean(array.type):
+        array = array.cast(pa.int8())
+    elif t.is_timestamp(array.type):
+        # timezone aware values are written in utc
+        array = array.cast(pa.timestamp('us'), safe=False)
+    return array.cast(pa.large_string())
+
+def _delimited_chunks(batches, column_separator='\t', row_delimiter='\n', escape=True):
+    """
+    Encodes record batches as delimited text, one chunk per batch, with arrow compute kernels over whole columns.
+    Nulls are written as \\N. With escape, backslashes, tabs and newlines in the values are backslash escaped as
+    LOAD DATA expects them, without it the separators must not occur in the values.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    for batch in batches:
+        if not batch.num_rows:
+            continue
+        columns = []
+        for array in batch.columns:
+            value_type = array.type.value_type if pa.types.is_dictionary(array.type) else array.type
+            text = _text_column(array)
+            # numbers, dates and booleans have nothing to escape
+            if escape and (pa.types.is_string(value_type) or pa.types.is_large_string(value_type)):
+                for character, escaped in (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r')):
+                    text = pc.replace_substring(text, character, escaped)
+            columns.append(text.fill_null('\\N'))
+        rows = pc.binary_join_element_wise(*columns, pa.scalar(column_separator, pa.large_string()))
+        rows = pc.binary_join_element_wise(rows, pa.scalar('', pa.large_string()), pa.scalar(row_delimiter, pa.large_string()))
+        offsets, data = _variable_width_buffers(rows)
+        yield memoryview(data[offsets[0]:offsets[-1]])
+
+def _feed_pipe(path, chunks, errors):
+    try:
+        with open(path, 'wb') as pipe:
+            for chunk in chunks:
+                pipe.write(chunk)
+    except BrokenPipeError:
+        # the reader stopped, the statement reports the failure
+        pass
+    except BaseException as e:
+        errors.append(e)
+
+def _load_data_local_infile(cursor, table_name, columns, chunks):
+    """
+    Runs LOAD DATA LOCAL INFILE on the cursor of a connection opened with local_infile, reading the chunks through
+    a named pipe written by a thread, so the file is streamed as it is encoded and never stored. Without named pipes
+    (windows) the chunks are written to a temporary file first.
+    """
+    import os
+    import shutil
+    import tempfile
+    import threading
+    directory = tempfile.mkdtemp(prefix='dataligo-load-')
+    path = os.path.join(directory, 'data.tsv')
+    errors = []
+    sql = (f"LOAD DATA LOCAL INFILE %s INTO TABLE {_backquote(table_name)} CHARACTER SET utf8mb4 "
+           f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+           f"({', '.join(_backquote(column) for column in columns)})")
+    try:
+        if not hasattr(os, 'mkfifo'):
+            _feed_pipe(path, chunks, errors)
+            if errors:
+                raise errors[0]
+            cursor.execute(sql, (path,))
+            return
+        os.mkfifo(path)
+        feeder = threading.Thread(target=_feed_pipe, args=(path, chunks, errors), daemon=True)
+        feeder.start()
+        try:
+            cursor.execute(sql, (path,))
+        finally:
+            while feeder.is_alive():
+                # the statement failed before reading the whole pipe: open and close the read end so that
+                # the writer gets a broken pipe instead of blocking
+                os.close(os.open(path, os.O_RDONLY | os.O_NONBLOCK))
+                feeder.join(0.1)
+        if errors:
+            # the load read a truncated stream, the caller rolls it back
+            raise errors[0]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def _mysql_prepare_table(engine, cursor, table_name, schema, if_exists, starrocks=False):
+    """
+    Creates the table with the types of the arrow schema if it does not exist. DDL commits implicitly in mysql, so
+    a table to replace is not dropped: a staging table is created instead, to be loaded and then swapped in with
+    _mysql_swap_table. Returns the name of the table to load.
+    """
+    exists = inspect(engine).has_table(table_name)
+    if exists and if_exists=='fail':
+        raise ValueError(f"Table '{table_name}' already exists.")
+    if exists and if_exists=='replace':
+        stage = f"{table_name}_stage_{uuid.uuid4().hex[:8]}"
+        cursor.execute(_mysql_create_table_sql(stage, schema, starrocks))
+        return stage
+    if not exists:
+        cursor.execute(_mysql_create_table_sql(table_name, schema, starrocks))
+    return table_name
+
+def _mysql_swap_table(cursor, table_name, stage, starrocks=False):
+    """
+    Puts the loaded staging table in place of the table in one atomic statement (RENAME TABLE, or SWAP WITH on
+    starrocks) and drops the old table
+    """
+    if starrocks:
+        cursor.execute(f"ALTER TABLE {_backquote(table_name)} SWAP WITH {_backquote(stage)}")
+        old = stage
+    else:
+        old = f"{table_name}_old_{uuid.uuid4().hex[:8]}"
+        cursor.execute(f"RENAME TABLE {_backquote(table_name)} TO {_backquote(old)}, {_backquote(stage)} TO {_backquote(table_name)}")
+    cursor.execute(f"DROP TABLE {_backquote(old)}")
+
+def _mysql_load(engine, df, table_name, if_exists='append', index=False, chunk_rows=DEFAULT_COPY_CHUNK_ROWS):
+    """
+    Writes the dataframe to the mysql / mariadb table with LOAD DATA LOCAL INFILE, in one transaction. The table
+    is created with the types of the dataframe columns. A replaced table is loaded as a staging table which is then
+    renamed in its place, so readers see the old or the new rows, never a missing or partly loaded table.
+
+    Args:
+        engine (Engine): sqlalchemy engine whose connections are opened with local_infile
+        df (DataFrame): pandas, polars or arrow frame
+        table_name (str): table name
+        if_exists (str, optional): fail, replace or append. Defaults to 'append'.
+        index (bool, optional): write the index of a pandas frame as a column. Defaults to False.
+        chunk_rows (int, optional): rows encoded at a time. Defaults to DEFAULT_COPY_CHUNK_ROWS.
+    """
+    schema, data = _arrow_input(df, index)
+    conn = engine.raw_connection()
+    target = table_name
+    try:
+        cur = conn.cursor()
+        target = _mysql_prepare_table(engine, cur, table_name, schema, if_exists)
+        _load_data_local_infile(cur, target, schema.names, _delimited_chunks(_batches(data, chunk_rows)))
+        conn.commit()
+        if target!=table_name:
+            _mysql_swap_table(cur, table_name, target)
+            target = table_name
+        cur.close()
+    except BaseException:
+        conn.rollback()
+        if target!=table_name:
+            _execute(engine, f"DROP TABLE IF EXISTS {_backquote(target)}")
+        raise
+    finally:
+        conn.close()
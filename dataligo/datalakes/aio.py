@@ -0,0 +1,328 @@
+import base64
+import asyncio
+import weakref
+import threading
+import contextvars
+from io import BytesIO
+from functools import partial
+from ..exceptions import ModuleNotFoundException, ExtensionNotSupportException
+from ..instrumentation import current_operation
+from .streams import DEFAULT_PART_SIZE
+from .utils import (readers, df_concat, _is_multi_file, _split_glob, _match_names, _object_reader, _encode_dataframe,
+                    _reader_args, _read_extension)
+
+# number of requests a connector keeps in flight at the same time, across all its async calls
+DEFAULT_ASYNC_CONCURRENCY = 64
+# seconds allowed for one gcs request made by gcloud-aio
+_GCS_ASYNC_TIMEOUT = 300
+
+class _LoopResources():
+    def __init__(self, concurrency) -> None:
+        self.client = None
+        self.finalizer = None
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()
+
+async def _close_at_loop_shutdown(close):
+    # pending async generators are finalized in their loop by loop.shutdown_asyncgens (asyncio.run) before it is closed
+    try:
+        yield
+    finally:
+        await close()
+
+class AsyncResources():
+    def __init__(self, create_client, concurrency: int = DEFAULT_ASYNC_CONCURRENCY) -> None:
+        """
+        AsyncResources holds the async client and the concurrency limit of a connector for each event loop using it.
+        asyncio objects belong to the loop they are created in, so every loop gets its own client, closed by aclose
+        or when the loop shuts down.
+
+        Args:
+            create_client (callable): coroutine function returning (client, close), close being a coroutine function closing the client
+            concurrency (int, optional): number of requests in flight at the same time. Defaults to DEFAULT_ASYNC_CONCURRENCY.
+        """
+        self._create_client = create_client
+        self.concurrency = concurrency
+        self._loops = weakref.WeakKeyDictionary()
+        self._loops_lock = threading.Lock()
+
+    async def client(self):
+        """
+        Returns the async client of the running event loop, creating it on first use
+        """
+        resources = self._resources()
+        async with resources.lock:
+            if resources.client is None:
+                client, close = await self._create_client()
+                resources.finalizer = _close_at_loop_shutdown(close)
+                await resources.finalizer.__anext__()
+                resources.client = client
+        return resources.client
+
+    @property
+    def limit(self) -> asyncio.Semaphore:
+        """
+        Semaphore bounding the requests in flight
+        """
+        return self._resources().semaphore
+
+    async def aclose(self) -> None:
+        """
+        Closes the async client of the running event loop
+        """
+        with self._loops_lock:
+            resources = self._loops.pop(asyncio.get_running_loop(), None)
+        if resources is not None and resources.finalizer is not None:
+            await resources.finalizer.aclose()
+
+    def _resources(self):
+        loop = asyncio.get_running_loop()
+        with self._loops_lock:
+            if loop not in self._loops:
+                self._loops[loop] = _LoopResources(self.concurrency)
+            return self._loops[loop]
+
+async def _run_blocking(func, *args, **kwargs):
+    """
+    Runs func (parsing, encoding, file io) in the default executor of the event loop, so that it does not block
+    the loop. The worker thread reports to the instrumented operation of the caller.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, contextvars.copy_context().run, partial(func, *args, **kwargs))
+
+async def _bounded_map(func, items, concurrency):
+    """
+    Awaits the coroutine function func over the items on at most concurrency worker tasks, instead of one task
+    per item, and returns the results in the order of the items
+    """
+    items = list(items)
+    results = [None] * len(items)
+    indexes = iter(range(len(items)))
+    async def worker():
+        for index in indexes:
+            results[index] = await func(items[index])
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, len(items)))]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        raise
+    return results
+
+async def _async_read(list_names, get, key, extension, return_type, pandas_args, polars_args,
+                      concurrency=DEFAULT_ASYNC_CONCURRENCY):
+    """
+    Reads the object, or the objects matching the glob pattern / folder key, as a dataframe. The objects are
+    downloaded by the coroutine function get(name) and parsed in the executor, concurrency objects at a time.
+
+    Args:
+        list_names (callable): coroutine function, list_names(prefix) returns the object names under prefix
+        get (callable): coroutine function, get(name) returns the bytes of the object
+        key (str): object key, glob pattern or folder
+        concurrency (int, optional): number of objects loaded at the same time. Defaults to DEFAULT_ASYNC_CONCURRENCY.
+    """
+    reader_args = _reader_args(return_type, pandas_args, polars_args)
+    _readers = readers(return_type)
+    extension = _read_extension(key, extension)
+    if extension not in _readers:
+        raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
+    reader = _readers[extension]
+    async def load(name):
+        data = await get(name)
+        return await _run_blocking(_object_reader(name, _readers, reader), BytesIO(data), **reader_args)
+    if _is_multi_file(key):
+        names = _match_names(await list_names(_split_glob(key)[0]), key)
+        return df_concat(await _bounded_map(load, names, concurrency), return_type)
+    return await load(key)
+
+async def _async_encode(df, key, extension, pandas_args, polars_args, compression=None):
+    """
+    Encodes (and compresses) the dataframe in the format of the key suffix (or extension) in the executor and returns the bytes
+    """
+    buf = BytesIO()
+    await _run_blocking(_encode_dataframe, buf, df, key, extension, pandas_args, polars_args, compression)
+    return buf.getvalue()
+
+def _read_file_range(file_path, start, end):
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        return f.read(end - start)
+
+def _write_file_range(file_path, start, data):
+    with open(file_path, 'r+b') as f:
+        f.seek(start)
+        f.write(data)
+
+def _allocate_file(file_path, size):
+    with open(file_path, 'wb') as f:
+        f.truncate(size)
+
+async def _gather_limited(limit, coroutine_functions):
+    async def run(coroutine_function):
+        async with limit:
+            return await coroutine_function()
+    return await asyncio.gather(*(run(coroutine_function) for coroutine_function in coroutine_functions))
+
+def _s3_async_client_factory(config, concurrency):
+    async def create_client():
+        try:
+            from aiobotocore.session import get_session
+            from aiobotocore.config import AioConfig
+        except ImportError:
+            raise ModuleNotFoundException('aiobotocore not found. try `pip install aiobotocore`')
+        context = get_session().create_client('s3', aws_access_key_id=config['AWS_ACCESS_KEY_ID'],
+                                              aws_secret_access_key=config['AWS_SECRET_ACCESS_KEY'],
+                                              config=AioConfig(max_pool_connections=concurrency))
+        client = await context.__aenter__()
+        return client, partial(context.__aexit__, None, None, None)
+    return create_client
+
+def _gcs_async_client_factory(config):
+    async def create_client():
+        try:
+            from gcloud.aio.storage import Storage
+        except ImportError:
+            raise ModuleNotFoundException('gcloud-aio-storage not found. try `pip install gcloud-aio-storage`')
+        client = Storage(service_file=config['GOOGLE_APPLICATION_CREDENTIALS_PATH'])
+        return client, client.close
+    return create_client
+
+def _azure_blob_async_client_factory(config):
+    async def create_client():
+        try:
+            from azure.storage.blob.aio import BlobServiceClient
+        except ImportError:
+            raise ModuleNotFoundException('azure-storage-blob async support not found. try `pip install azure-storage-blob aiohttp`')
+        client = BlobServiceClient(account_url=f"https://{config['ACCOUNT_NAME']}.blob.core.windows.net",
+                                   credential=config['ACCOUNT_KEY'])
+        return client, client.close
+    return create_client
+
+async def _s3_async_list(client, bucket, prefix):
+    names = []
+    async for page in client.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+        names.extend(obj['Key'] for obj in page.get('Contents', []))
+    return names
+
+async def _s3_async_get(client, bucket, key, limit):
+    async with limit:
+        response = await client.get_object(Bucket=bucket, Key=key)
+        current_operation().first_byte()
+        async with response['Body'] as body:
+            data = await body.read()
+    current_operation().add_bytes(len(data))
+    return data
+
+async def _s3_async_upload(client, bucket, key, size, read_range, limit, part_size=DEFAULT_PART_SIZE, extra_args={}):
+    """
+    Uploads size bytes, read by the coroutine function read_range(start, end), to s3. Objects larger than part_size
+    are uploaded as a multipart upload whose parts are read and sent concurrently, within the limit.
+    """
+    if size <= part_size:
+        data = await read_range(0, size)
+        async with limit:
+            await client.put_object(Bucket=bucket, Key=key, Body=data, **extra_args)
+        current_operation().add_bytes(len(data))
+        return
+    # stay under the 10000 parts limit of s3
+    part_size = max(part_size, -(-size // 10000))
+    upload_id = (await client.create_multipart_upload(Bucket=bucket, Key=key, **extra_args))['UploadId']
+    async def upload_part(part_number, start):
+        data = await read_range(start, min(start + part_size, size))
+        response = await client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=data)
+        current_operation().add_bytes(len(data))
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+    try:
+        parts = await _gather_limited(limit, [partial(upload_part, index + 1, start)
+                                              for index, start in enumerate(range(0, size, part_size))])
+        await client.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts})
+    except BaseException:
+        await client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+async def _s3_async_download_file(client, bucket, key, file_path, limit, part_size=DEFAULT_PART_SIZE):
+    """
+    Downloads the s3 object to file_path with concurrent ranged GETs of part_size bytes, within the limit.
+    """
+    async with limit:
+        size = (await client.head_object(Bucket=bucket, Key=key))['ContentLength']
+    await _run_blocking(_allocate_file, file_path, size)
+    async def download_part(start):
+        end = min(start + part_size, size)
+        response = await client.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end - 1}')
+        async with response['Body'] as body:
+            data = await body.read()
+        current_operation().add_bytes(len(data))
+        await _run_blocking(_write_file_range, file_path, start, data)
+    await _gather_limited(limit, [partial(download_part, start) for start in range(0, size, part_size)])
+
+async def _gcs_async_list(client, bucket, prefix):
+    names = []
+    params = {'prefix': prefix}
+    while True:
+        page = await client.list_objects(bucket, params=params, timeout=_GCS_ASYNC_TIMEOUT)
+        names.extend(item['name'] for item in page.get('items', []))
+        if not page.get('nextPageToken'):
+            return names
+        params = {'prefix': prefix, 'pageToken': page['nextPageToken']}
+
+async def _gcs_async_get(client, bucket, blob_name, limit):
+    async with limit:
+        data = await client.download(bucket, blob_name, timeout=_GCS_ASYNC_TIMEOUT)
+    current_operation().add_bytes(len(data))
+    return data
+
+async def _azure_blob_async_list(client, container_name, prefix):
+    container_client = client.get_container_client(container_name)
+    return [name async for name in container_client.list_blob_names(name_starts_with=prefix)]
+
+async def _azure_blob_async_get(client, container_name, blob_name, limit):
+    async with limit:
+        downloader = await client.get_blob_client(container=container_name, blob=blob_name).download_blob()
+        current_operation().first_byte()
+        data = await downloader.readall()
+    current_operation().add_bytes(len(data))
+    return data
+
+async def _azure_blob_async_upload(blob_client, size, read_range, limit, overwrite=False, part_size=DEFAULT_PART_SIZE):
+    """
+    Uploads size bytes, read by the coroutine function read_range(start, end), to the blob. Blobs larger than part_size
+    are uploaded as staged blocks which are read and sent concurrently, within the limit, then committed.
+    """
+    if size <= part_size:
+        data = await read_range(0, size)
+        async with limit:
+            await blob_client.upload_blob(data, overwrite=overwrite)
+        current_operation().add_bytes(len(data))
+        return
+    from azure.storage.blob import BlobBlock
+    from azure.core import MatchConditions
+    # stay under the 50000 blocks limit of azure
+    part_size = max(part_size, -(-size // 50000))
+    async def stage_block(index, start):
+        data = await read_range(start, min(start + part_size, size))
+        # the block ids of a blob must all have the same length
+        block_id = base64.b64encode(f'{index:08d}'.encode()).decode()
+        await blob_client.stage_block(block_id, data)
+        current_operation().add_bytes(len(data))
+        return block_id
+    block_ids = await _gather_limited(limit, [partial(stage_block, index, start)
+                                              for index, start in enumerate(range(0, size, part_size))])
+    conditions = {} if overwrite else {'match_condition': MatchConditions.IfMissing}
+    async with limit:
+        await blob_client.commit_block_list([BlobBlock(block_id) for block_id in block_ids], **conditions)
+
+async def _azure_blob_async_download_file(blob_client, file_path, limit, part_size=DEFAULT_PART_SIZE):
+    """
+    Downloads the blob to file_path with concurrent ranged downloads of part_size bytes, within the limit.
+    """
+    async with limit:
+        size = (await blob_client.get_blob_properties()).size
+    await _run_blocking(_allocate_file, file_path, size)
+    async def download_part(start):
+        downloader = await blob_client.download_blob(offset=start, length=min(part_size, size - start))
+        data = await downloader.readall()
+        current_operation().add_bytes(len(data))
+        await _run_blocking(_write_file_range, file_path, start, data)
+    await _gather_limited(limit, [partial(download_part, start) for start in range(0, size, part_size)])
@@ -0,0 +1,157 @@
+import os
+import glob
+import hashlib
+import tempfile
+import threading
+
+class ObjectCache():
+    def __init__(self, cache_dir: str, max_size: int = None, validate: bool = True) -> None:
+        """
+        ObjectCache keeps a local copy of the objects read from S3, GCS and Azure Blob Storage, keyed by the
+        object path and its version (ETag or generation). The cache directory can be shared by multiple
+        processes: entries are written to a temporary file and atomically renamed into place.
+
+        Args:
+            cache_dir (str): directory where the objects are cached
+            max_size (int, optional): size budget of the cache directory in bytes. The least recently used
+                                      entries are evicted to stay under it. Defaults to None (unbounded).
+            validate (bool, optional): check the version of the object with a HEAD request before serving it
+                                       from the cache. If False, a cached object is served without any network call.
+                                       Defaults to True.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.validate = validate
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def stats(self) -> dict:
+        """
+        Returns the hit, miss and eviction counters of this cache object
+
+        Returns:
+            dict: counters
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def open(self, source: str, bucket: str, key: str, head, download):
+        """
+        Returns a file object of the cached object, downloading it first on a miss.
+
+        Args:
+            source (str): data source name (s3, gcs, azureblob)
+            bucket (str): bucket or container name
+            key (str): object key or blob name
+            head (callable): head() returns the current version of the object
+            download (callable): download(fileobj, version) writes that version of the object to fileobj
+
+        Returns:
+            file: binary file object positioned at the start of the object
+        """
+        entry = hashlib.sha256(f"{source}://{bucket}/{key}".encode()).hexdigest()
+        version = None
+        if self.validate:
+            version = head()
+            path = self._entry_path(entry, version)
+        else:
+            path = self._latest_entry_path(entry)
+        if path is not None:
+            cached = self._open_entry(path)
+            if cached is not None:
+                self._count('hits')
+                return cached
+        self._count('misses')
+        if version is None:
+            version = head()
+            path = self._entry_path(entry, version)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                download(tmp_file, version)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        # open before evicting, so that the entry stays readable even if it is evicted right away
+        cached = open(path, 'rb')
+        self._remove_stale_versions(entry, path)
+        self._evict()
+        return cached
+
+    def _entry_path(self, entry, version):
+        version_hash = hashlib.sha256(str(version).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{entry}-{version_hash}")
+
+    def _latest_entry_path(self, entry):
+        paths = glob.glob(os.path.join(self.cache_dir, f"{entry}-*"))
+        mtimes = []
+        for path in paths:
+            try:
+                mtimes.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue
+        return max(mtimes)[1] if mtimes else None
+
+    def _open_entry(self, path):
+        try:
+            cached = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            # mtime is the recency used by the LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return cached
+
+    def _remove_stale_versions(self, entry, current_path):
+        for path in glob.glob(os.path.join(self.cache_dir, f"{entry}-*")):
+            if path != current_path:
+                self._remove(path)
+
+    def _evict(self):
+        if self.max_size is None:
+            return
+        entries = []
+        for dir_entry in os.scandir(self.cache_dir):
+            if dir_entry.name.startswith('.tmp-'):
+                continue
+            try:
+                stat = dir_entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if self._remove(path):
+                self._count('evictions')
+            total_size -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except (FileNotFoundError, PermissionError):
+            # already removed by another process, or still open on windows
+            return False
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+def _object_cache(config):
+    """
+    Creates the ObjectCache from the CACHE_DIR, CACHE_MAX_SIZE and CACHE_VALIDATE keys of the connector config.
+    Returns None if CACHE_DIR is not set.
+    """
+    if not config.get('CACHE_DIR'):
+        return None
+    max_size = config.get('CACHE_MAX_SIZE')
+    return ObjectCache(config['CACHE_DIR'], max_size=int(max_size) if max_size else None,
+                       validate=config.get('CACHE_VALIDATE', True))
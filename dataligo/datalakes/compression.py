@@ -0,0 +1,214 @@
+import io
+import os
+import bz2
+import gzip
+import zlib
+from pathlib import Path
+from ..exceptions import ModuleNotFoundException, ExtensionNotSupportException
+
+# compression suffix of the object names -> compression
+COMPRESSIONS = {'gz': 'gzip', 'gzip': 'gzip', 'zst': 'zstd', 'zstd': 'zstd', 'bz2': 'bz2', 'lz4': 'lz4',
+                'sz': 'snappy', 'snappy': 'snappy'}
+# suffix appended to the written files
+COMPRESSION_SUFFIXES = {'gzip': 'gz', 'zstd': 'zst', 'bz2': 'bz2', 'lz4': 'lz4', 'snappy': 'sz'}
+# formats compressing their pages / buffers internally, the compression is passed to their writers
+_INTERNALLY_COMPRESSED_FORMATS = ['parquet', 'feather', 'arrow', 'avro']
+# formats whose readers seek, decompressed objects of these formats are buffered in memory
+_SEEKABLE_FORMATS = ['parquet', 'feather', 'arrow', 'avro', 'xlsx', 'xls', 'ods']
+_READ_CHUNK_SIZE = 1024 * 1024
+
+def _split_compression(name):
+    """
+    Splits an object name like `events.csv.gz` into the name without the compression suffix (`events.csv`)
+    and the compression (`gzip`). The compression is None if the name has no compression suffix.
+    """
+    suffix = Path(name).suffix[1:].lower()
+    if suffix in COMPRESSIONS:
+        return name[:-len(suffix) - 1], COMPRESSIONS[suffix]
+    return name, None
+
+def _compression_options(compression):
+    """
+    Returns (method, options) of the compression argument, a method name or a dict like
+    {'method': 'zstd', 'level': 10, 'threads': 4} as for pandas
+    """
+    if isinstance(compression, dict):
+        options = dict(compression)
+        return options.pop('method', None), options
+    return compression, {}
+
+def _write_format(name, extension, compression=None):
+    """
+    Returns (extension, stream compression, format compression) of a written file. The format and the
+    compression suffixes of the name take precedence over the extension and compression arguments.
+    A name with a compression suffix is compressed as a whole, with the options (level, threads) of a
+    compression dict, while the compression of the internally compressed formats (parquet, feather, avro)
+    is passed to their writers.
+    """
+    base, name_compression = _split_compression(name)
+    suffix = Path(base).suffix
+    if suffix:
+        extension = suffix[1:]
+    extension = extension.lower()
+    if name_compression:
+        method, options = _compression_options(compression)
+        if isinstance(compression, dict) and method not in (None, name_compression):
+            raise ExtensionNotSupportException(f'Compression {method} conflicts with the {name_compression} suffix of {name}')
+        return extension, {'method': name_compression, **options}, None
+    if compression is not None and extension in _INTERNALLY_COMPRESSED_FORMATS:
+        return extension, None, compression
+    return extension, compression, None
+
+def _compressed_suffix(extension, compression):
+    """
+    Suffix of the files written in the format of extension with the compression, like `csv.gz`.
+    The internally compressed formats keep their suffix.
+    """
+    method = _compression_options(compression)[0]
+    if method is None or extension in _INTERNALLY_COMPRESSED_FORMATS:
+        return extension
+    if method not in COMPRESSION_SUFFIXES:
+        raise ExtensionNotSupportException(f'Unsupported Compression: {method}')
+    return f"{extension}.{COMPRESSION_SUFFIXES[method]}"
+
+def _compressed_name(name, extension, compression):
+    """
+    Appends the compression suffix to the name of a written file, unless it already has one, so that the file
+    is decompressed when it is read back
+    """
+    if compression is None or _split_compression(name)[1]:
+        return name
+    extension = _write_format(name, extension)[0]
+    suffix = _compressed_suffix(extension, compression)
+    if suffix==extension:
+        return name
+    return f"{name}.{suffix.split('.')[-1]}"
+
+class _DecompressedReader(io.RawIOBase):
+    def __init__(self, fileobj, decompressor) -> None:
+        """
+        Readable file object decompressing fileobj chunk by chunk with decompressor.decompress
+        """
+        self._fileobj = fileobj
+        self._decompressor = decompressor
+        self._buffer = b''
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer and not self._eof:
+            chunk = self._fileobj.read(_READ_CHUNK_SIZE)
+            if chunk:
+                self._buffer = self._decompressor.decompress(chunk)
+            else:
+                self._eof = True
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+class _CompressedWriter(io.RawIOBase):
+    def __init__(self, fileobj, compressor, header: bytes = b'') -> None:
+        """
+        Writable file object compressing what is written to it with compressor.compress / flush into fileobj.
+        Closing it writes the end of the compressed stream, fileobj is left open.
+        """
+        self._fileobj = fileobj
+        self._compressor = compressor
+        self._written = 0
+        if header:
+            fileobj.write(header)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self._fileobj.write(compressed)
+        self._written += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._written
+
+    def close(self) -> None:
+        if not self.closed:
+            tail = self._compressor.flush()
+            if tail:
+                self._fileobj.write(tail)
+        super().close()
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ModuleNotFoundException('zstandard not found. try `pip install zstandard`')
+    return zstandard
+
+def _lz4_frame():
+    try:
+        import lz4.frame
+    except ImportError:
+        raise ModuleNotFoundException('lz4 not found. try `pip install lz4`')
+    return lz4.frame
+
+def _snappy():
+    try:
+        import snappy
+    except ImportError:
+        raise ModuleNotFoundException('python-snappy not found. try `pip install python-snappy`')
+    return snappy
+
+def _decompress(stream, compression, seekable=False):
+    """
+    Returns a file object of the decompressed content of stream, which is decompressed as it is read.
+    If seekable, the decompressed content is read into memory. snappy is the snappy framing format.
+    """
+    if compression is None:
+        return stream
+    if compression=='gzip':
+        decompressed = gzip.GzipFile(fileobj=stream, mode='rb')
+    elif compression=='bz2':
+        decompressed = bz2.BZ2File(stream, mode='rb')
+    elif compression=='zstd':
+        decompressed = io.BufferedReader(_zstandard().ZstdDecompressor().stream_reader(stream, read_across_frames=True),
+                                         _READ_CHUNK_SIZE)
+    elif compression=='lz4':
+        decompressed = _lz4_frame().LZ4FrameFile(stream, mode='rb')
+    elif compression=='snappy':
+        decompressed = io.BufferedReader(_DecompressedReader(stream, _snappy().StreamDecompressor()), _READ_CHUNK_SIZE)
+    else:
+        raise ExtensionNotSupportException(f'Unsupported Compression: {compression}')
+    if seekable:
+        return io.BytesIO(decompressed.read())
+    return decompressed
+
+def _compress(fileobj, compression):
+    """
+    Returns a writable file object compressing into fileobj. zstd is compressed on all the cpus unless
+    the threads option says otherwise.
+
+    Args:
+        fileobj: binary file object receiving the compressed stream, left open
+        compression (str or dict): gzip, zstd, bz2, lz4 or snappy, or a dict with the method and its level (and threads for zstd)
+    """
+    method, options = _compression_options(compression)
+    level = options.get('level')
+    if method=='gzip':
+        return _CompressedWriter(fileobj, zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31))
+    elif method=='bz2':
+        return _CompressedWriter(fileobj, bz2.BZ2Compressor(9 if level is None else level))
+    elif method=='zstd':
+        threads = options.get('threads', os.cpu_count() or 1)
+        compressor = _zstandard().ZstdCompressor(level=3 if level is None else level, threads=threads)
+        return _CompressedWriter(fileobj, compressor.compressobj())
+    elif method=='lz4':
+        compressor = _lz4_frame().LZ4FrameCompressor(compression_level=level or 0)
+        return _CompressedWriter(fileobj, compressor, header=compressor.begin())
+    elif method=='snappy':
+        return _CompressedWriter(fileobj, _snappy().StreamCompressor())
+    raise ExtensionNotSupportException(f'Unsupported Compression: {method}')
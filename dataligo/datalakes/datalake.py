@@ -1,15 +1,34 @@
 import boto3
 from google.cloud import storage
 from azure.storage.blob import BlobServiceClient
-from typing import Dict
+from azure.core import MatchConditions
+from typing import Dict, List
 import pandas as pd
-from io import BytesIO
 from pathlib import Path
 from .utils import (_s3_writer, _multi_file_load, _gcs_writer,
                      _azure_blob_writer, _s3_upload_file, 
-                    _s3_download_file, _s3_upload_folder, _s3_download_folder, readers, df_concat)
+                    _s3_download_file, _s3_upload_folder, _s3_download_folder, readers, df_concat,
+                    _parallel_map, DEFAULT_MAX_WORKERS, _is_multi_file, _split_glob, _match_names,
+                    _iter_batches, _read_parquet_pushdown, _partitioned_write, _reader_args, _object_reader,
+                    _read_extension, _dask_read, _gcs_remote_object)
+from .streams import _open_ranged, DEFAULT_STREAM_BUFFER
+from .cache import _object_cache
+from .parsing import _process_file_load
+from .spill import _spilled_download, DEFAULT_SPILL_THRESHOLD, _SPILL_CHUNK_SIZE
+from .transfer import TransferEngine, TransferJob, _format_summary, DEFAULT_TRANSFER_CONCURRENCY, DEFAULT_TRANSFER_RETRIES
+from botocore.config import Config
+from functools import partial
+from .sync import RemoteObject, _local_files, _sync_download, _sync_upload
+from .compression import _split_compression, _decompress, _compressed_name, _compressed_suffix
 from ..exceptions import ExtensionNotSupportException
+from ..instrumentation import instrumented, _message, current_operation
+from .aio import (AsyncResources, DEFAULT_ASYNC_CONCURRENCY, _GCS_ASYNC_TIMEOUT, _run_blocking, _async_read, _async_encode,
+                  _read_file_range, _s3_async_client_factory, _gcs_async_client_factory, _azure_blob_async_client_factory,
+                  _s3_async_list, _s3_async_get, _s3_async_upload, _s3_async_download_file, _gcs_async_list,
+                  _gcs_async_get, _azure_blob_async_list, _azure_blob_async_get, _azure_blob_async_upload,
+                  _azure_blob_async_download_file)
 import os
+import shutil
 
 
 class S3():
@@ -17,6 +36,14 @@ class S3():
         """
         S3 class create a ligo s3 object, through which you can able to read, write, upload, download data from AWS S3
 
+        Set CACHE_DIR (and optionally CACHE_MAX_SIZE in bytes, CACHE_VALIDATE) in the config to cache the read objects on local disk.
+        Objects larger than SPILL_THRESHOLD bytes are staged in a temporary file (in SPILL_DIR) instead of memory and
+        parsed from there.
+        Set TRANSFER_CONFIG to boto3 TransferConfig arguments to override the part size and concurrency of file transfers,
+        which are otherwise chosen from the file size.
+        The async methods (aread_as_dataframe, awrite_dataframe, aupload_file, adownload_file) use aiobotocore and keep
+        at most ASYNC_CONCURRENCY requests in flight.
+
         Args:
             config (dict): Automatically loaded from the config file (yaml)
         """
@@ -24,67 +51,168 @@ class S3():
             "s3",
             aws_access_key_id=config['AWS_ACCESS_KEY_ID'],
             aws_secret_access_key=config['AWS_SECRET_ACCESS_KEY'],
+            # enough pooled connections for the concurrent prefix reads and folder transfers
+            config=Config(max_pool_connections=max(DEFAULT_MAX_WORKERS, DEFAULT_TRANSFER_CONCURRENCY) * 2),
         )
+        # kept to create the connectors of the dask workers
+        self._config = config
+        self.cache = _object_cache(config)
+        self._spill_threshold = config.get('SPILL_THRESHOLD', DEFAULT_SPILL_THRESHOLD)
+        self._spill_dir = config.get('SPILL_DIR')
+        self._transfers = TransferEngine(config.get('TRANSFER_CONCURRENCY', DEFAULT_TRANSFER_CONCURRENCY),
+                                         config.get('TRANSFER_RETRIES', DEFAULT_TRANSFER_RETRIES))
+        self._transfer_config = config.get('TRANSFER_CONFIG') or {}
+        concurrency = config.get('ASYNC_CONCURRENCY', DEFAULT_ASYNC_CONCURRENCY)
+        self._async = AsyncResources(_s3_async_client_factory(config, concurrency), concurrency)
+
+    def close(self) -> None:
+        """
+        Closes the underlying boto3 client and its connection pool
+        """
+        self._transfers.close()
+        self._s3.meta.client.close()
+
+    async def aclose(self) -> None:
+        """
+        Closes the async client of the running event loop
+        """
+        await self._async.aclose()
 
+    @instrumented('s3_path', 's3://{bucket}/{key}')
     def read_as_dataframe(self,s3_path: str = None, bucket: str = None, key: str = None, pandas_args: Dict = {}, 
-                            polars_args: Dict = {}, extension='csv', return_type='pandas'):
+                            polars_args: Dict = {}, extension='csv', return_type='pandas', max_workers: int = DEFAULT_MAX_WORKERS,
+                            columns: List[str] = None, filters: List = None, processes: int = None):
         """
         Takes s3 path as arguments and return dataframe.
 
         Args:
             s3_path (str): s3 path of the file need to be loaded, for multiple file loading, use s3://bucket/path/filename*
-                           to load all files from folder, use s3://bucket/folder/.
+                           or a glob pattern like s3://bucket/folder/dt=2024-*/*.parquet. to load all files from folder, use s3://bucket/folder/.
             bucket (str): S3 Bucket Name
             key (str): file name with extension
             pandas_args (dict): pandas arguments like encoding, etc
             extension (str, optional): extension of the files, It take automatically from the s3_path parameter. Defaults to 'csv'.
-            return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask). dask returns a lazy
+                                         dataframe with one partition per object. Defaults to 'pandas'.
+            max_workers (int, optional): number of objects downloaded and parsed concurrently for multiple file loading. Defaults to DEFAULT_MAX_WORKERS.
+            columns (list, optional): parquet only, columns to read. Only these column chunks are downloaded. Defaults to None (all columns).
+            filters (list, optional): parquet only, pyarrow filters like [('dt', '>=', '2024-01-01')]. Row groups whose statistics
+                                      do not match are skipped without being downloaded. Defaults to None.
+            processes (int, optional): number of processes parsing the objects for multiple file loading, for csv, json and excel
+                                       whose parsing is CPU bound. Defaults to None (parsed on the download threads).
 
         Returns:
             DataFrame: Depends on the return_type parameter.
         """
-        if return_type=='polars':
-            import polars as pl
-            reader_args = polars_args
-        elif return_type=='pandas':
-            reader_args = pandas_args
+        reader_args = _reader_args(return_type, pandas_args, polars_args)
         _readers = readers(return_type)
-        if s3_path:
-            suffix = Path(s3_path).suffix
-        else:
-            suffix = Path(key).suffix
-        if suffix:
-            extension = suffix[1:]
+        extension = _read_extension(s3_path or key, extension)
         if extension not in _readers:
             raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
         reader = _readers[extension]
         if s3_path:
             bucket, key =  s3_path.split('/',3)[2:]
-        if key.endswith('*') or key.endswith('/*') or key.endswith('/'):
-            dfs = _multi_file_load(self._s3,bucket=bucket,key=key,reader=reader,extension=extension,reader_args=reader_args)
+        pushdown = columns is not None or filters is not None
+        if pushdown and (extension!='parquet' or _split_compression(key)[1]):
+            raise ExtensionNotSupportException('columns and filters are only supported for uncompressed parquet files')
+        if return_type=='dask':
+            # listed up front, each object is one lazy partition
+            names = list(_match_names(self._list_names(bucket, _split_glob(key)[0]), key)) if _is_multi_file(key) else [key]
+            return _dask_read(self, bucket, names, extension, pandas_args, columns, filters)
+        if pushdown:
+            def load_parquet(name):
+                with self._open(bucket, name, buffer_size=0) as stream:
+                    return _read_parquet_pushdown(stream, columns, filters, return_type)
+            if _is_multi_file(key):
+                names = _match_names(self._list_names(bucket, _split_glob(key)[0]), key)
+                return df_concat(list(_parallel_map(load_parquet, names, max_workers)), return_type)
+            return load_parquet(key)
+        if _is_multi_file(key):
+            keys = _match_names(self._list_names(bucket, _split_glob(key)[0]), key)
+            if processes:
+                dfs = _process_file_load(lambda obj_key: self._get_object(bucket, obj_key), keys, return_type, extension,
+                                         reader_args, max_workers, processes)
+            else:
+                dfs = _multi_file_load(lambda obj_key: self._get_object(bucket, obj_key), keys, reader=reader, reader_args=reader_args,
+                                       max_workers=max_workers, _readers=_readers)
             return df_concat(dfs,return_type)
         else:
-            obj = self._s3.Object(bucket_name=bucket, key=key)
-            stream = BytesIO(obj.get()['Body'].read())
-            df = reader(stream, **reader_args)
+            with self._get_object(bucket, key) as stream:
+                df = _object_reader(key, _readers, reader)(stream, **reader_args)
             return df
         
-    def write_dataframe(self, df, bucket: str, key: str, extension='csv', pandas_args = {}, polars_args = {}) -> None:
+    @instrumented('s3_path', 's3://{bucket}/{key}')
+    def iter_batches(self, s3_path: str = None, bucket: str = None, key: str = None, batch_size: int = 100000,
+                        pandas_args: Dict = {}, extension='csv', return_type='pandas'):
+        """
+        Takes s3 path as arguments and yields dataframes of batch_size rows. The object is streamed,
+        so the memory used is bounded by the batch size instead of the object size.
+
+        Args:
+            s3_path (str): s3 path of the file need to be loaded, for multiple file loading, use s3://bucket/path/filename*
+                           or a glob pattern. to load all files from folder, use s3://bucket/folder/.
+            bucket (str): S3 Bucket Name
+            key (str): file name with extension
+            batch_size (int, optional): number of rows per dataframe. Defaults to 100000.
+            pandas_args (dict): pandas arguments like encoding, etc used to parse csv and json lines files
+            extension (str, optional): extension of the files (csv, txt, json, parquet), It take automatically from the s3_path parameter. Defaults to 'csv'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow). Defaults to 'pandas'.
+
+        Yields:
+            DataFrame: Depends on the return_type parameter.
+        """
+        if s3_path:
+            bucket, key =  s3_path.split('/',3)[2:]
+        keys = _match_names(self._list_names(bucket, _split_glob(key)[0]), key) if _is_multi_file(key) else [key]
+        for obj_key in keys:
+            obj_extension = _read_extension(obj_key, extension)
+            compression = _split_compression(obj_key)[1]
+            buffer_size = 0 if obj_extension=='parquet' and compression is None else DEFAULT_STREAM_BUFFER
+            with self._open(bucket, obj_key, buffer_size=buffer_size) as stream:
+                stream = _decompress(stream, compression, seekable=obj_extension=='parquet')
+                yield from _iter_batches(stream, obj_extension, batch_size, return_type, pandas_args)
+
+    @instrumented('s3://{bucket}/{key}')
+    def write_dataframe(self, df, bucket: str, key: str, extension=None, pandas_args = {}, polars_args = {},
+                        partition_cols: List[str] = None, max_rows_per_file: int = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                        compression = None):
         """
         Takes DataFrame, bucket name, filename as arguments and write the dataframe to S3.
 
         Args:
             df (DataFrame): Dataframe which need to be uploaded
             bucket (str): S3 Bucket Name
-            key (str): file name with extension
-            extension (str, optional): extension of the files, It take automatically from the filename parameter. Defaults to 'csv'
+            key (str): file name with extension, or the folder prefix for partitioned writes
+            extension (str, optional): extension of the files, It take automatically from the filename parameter.
+                                       Defaults to None (csv, parquet for partitioned writes)
             index (bool, optional): pandas index parameter. Defaults to False.
             sep (str, optional): pandas sep parameter. Defaults to ','.
+            partition_cols (list, optional): write a hive partitioned dataset under the key prefix (prefix/col=value/part-00000.parquet).
+                                             The partition columns are encoded in the path, not in the files. Defaults to None.
+            max_rows_per_file (int, optional): split the dataset into files of at most this many rows. Defaults to None.
+            max_workers (int, optional): number of files encoded and uploaded concurrently for partitioned writes. Defaults to DEFAULT_MAX_WORKERS.
+            compression (str or dict, optional): gzip, zstd (multi-threaded), bz2, lz4 or snappy, or a dict like {'method': 'zstd', 'level': 10}.
+                                                 csv and json are compressed as a stream and the suffix (.gz, .zst, ...) is appended to the name,
+                                                 parquet and feather pass it to their writer as the page codec. A compression suffix in the name
+                                                 (events.csv.gz) compresses the file too. Defaults to None.
+
+        Returns:
+            list: manifest (key, partition values, rows) of the written files for partitioned writes, else None
         """
-        _s3_writer(self._s3, df, bucket, key, extension, pandas_args = pandas_args, polars_args = polars_args)
-        print("Dataframe saved to the s3 path:", f"s3://{bucket}/{key}")
+        partitioned = bool(partition_cols or max_rows_per_file)
+        extension = extension or ('parquet' if partitioned else 'csv')
+        if partitioned:
+            write = lambda part, part_key: _s3_writer(self._s3, part, bucket, part_key, extension, pandas_args = pandas_args, polars_args = polars_args,
+                                                      compression = compression)
+            manifest = _partitioned_write(write, df, key, _compressed_suffix(extension, compression), partition_cols, max_rows_per_file, max_workers)
+            _message("Dataframe saved as", len(manifest), "files to the s3 path:", f"s3://{bucket}/{key}")
+            return manifest
+        key = _compressed_name(key, extension, compression)
+        _s3_writer(self._s3, df, bucket, key, extension, pandas_args = pandas_args, polars_args = polars_args, compression = compression)
+        _message("Dataframe saved to the s3 path:", f"s3://{bucket}/{key}")
 
-    def upload_file(self, source_file_path: str, bucket: str, key: str):
+    @instrumented('s3://{bucket}/{key}')
+    def upload_file(self, source_file_path: str, bucket: str, key: str, transfer_config: Dict = None):
         """
         Takes source file path, bucket and key as arguments and upload the file to S3
 
@@ -92,11 +220,16 @@ class S3():
             source_file_path (str): source file path
             bucket (str): destination bucket
             key (str): destination file path
+            transfer_config (dict, optional): boto3 TransferConfig arguments (multipart_threshold, multipart_chunksize, max_concurrency, ...)
+                                              overriding TRANSFER_CONFIG of the config and the part size chosen from the file size. Defaults to None.
         """
-        _s3_upload_file(self._s3, file_path=source_file_path, bucket=bucket, key=key)
-        print("File uploaded to the s3 path:", f"s3://{bucket}/{key}")
+        _s3_upload_file(self._s3, file_path=source_file_path, bucket=bucket, key=key,
+                        transfer_config=self._transfer_overrides(transfer_config))
+        _message("File uploaded to the s3 path:", f"s3://{bucket}/{key}")
 
-    def download_file(self, s3_path: str = None, bucket: str = None, key: str = None, local_path_to_download: str = '.'):
+    @instrumented('s3_path', 's3://{bucket}/{key}')
+    def download_file(self, s3_path: str = None, bucket: str = None, key: str = None, local_path_to_download: str = '.',
+                      transfer_config: Dict = None):
         """
         Takes s3 path or (bucket and key name) as arguments and download the file
 
@@ -105,113 +238,343 @@ class S3():
             bucket (str, optional): S3 bucket name, if S3 path is not provided . Defaults to None.
             key (str, optional): S3 Key name, if S3 path is not provied. Defaults to None.
             path_to_download (str, optional): save location. Defaults to '.' (current directory).
+            transfer_config (dict, optional): boto3 TransferConfig arguments (multipart_threshold, multipart_chunksize, max_concurrency, ...)
+                                              overriding TRANSFER_CONFIG of the config and the part size chosen from the file size. Defaults to None.
         """
-        _s3_download_file(self._s3, s3_path=s3_path,bucket=bucket, key=key,path_to_download=local_path_to_download)
+        _s3_download_file(self._s3, s3_path=s3_path,bucket=bucket, key=key,path_to_download=local_path_to_download,
+                          transfer_config=self._transfer_overrides(transfer_config))
 
-    def upload_folder(self, local_folder_path: str, bucket: str, key: str) -> None:
+    @instrumented('s3://{bucket}/{key}')
+    def upload_folder(self, local_folder_path: str, bucket: str, key: str, sync: bool = False, delete: bool = False,
+                      transfer_config: Dict = None) -> dict:
         """
-        Takes local path, bucket and key as arguments and upload the folder to s3
+        Takes local path, bucket and key as arguments and upload the folder to s3.
+        The files are uploaded concurrently (TRANSFER_CONCURRENCY in config) and retried on failure (TRANSFER_RETRIES).
 
         Args:
             local_folder_path (str): local path of the folder want to be uploaded
             bucket (str): s3 bucket name
             key (str): s3 key name
+            sync (bool, optional): upload only the files which differ from the s3 objects (size, ETag / md5, mtime).
+                                   A manifest of the synced files is kept in the local folder. Defaults to False.
+            delete (bool, optional): with sync, delete the s3 objects which are not in the local folder. Defaults to False.
+            transfer_config (dict, optional): boto3 TransferConfig arguments (multipart_threshold, multipart_chunksize, max_concurrency, ...)
+                                              overriding TRANSFER_CONFIG of the config and the part size chosen from the file size. Defaults to None.
+
+        Returns:
+            dict: transfer summary (files, bytes, retries, seconds, bytes_per_second, and skipped, deleted with sync)
         """
-        _s3_upload_folder(self._s3,local_folder_path, bucket, key)
-        print("Folder uploaded to the s3 path:", f"s3://{bucket}/{key}")
+        summary = _s3_upload_folder(self._s3,local_folder_path, bucket, key, self._transfers, sync=sync, delete=delete,
+                                    transfer_config=self._transfer_overrides(transfer_config))
+        _message("Folder uploaded to the s3 path:", f"s3://{bucket}/{key}", f"({_format_summary(summary)})")
+        return summary
 
-    def download_folder(self, s3_path: str = None, bucket: str = None, key: str = None, local_path_to_download: str = '.'):
+    @instrumented('s3_path', 's3://{bucket}/{key}')
+    def download_folder(self, s3_path: str = None, bucket: str = None, key: str = None, local_path_to_download: str = '.',
+                        sync: bool = False, delete: bool = False, transfer_config: Dict = None) -> dict:
         """
-        Takes s3 path or (bucket and key name) as arguments and download the folder
+        Takes s3 path or (bucket and key name) as arguments and download the folder.
+        The files are downloaded concurrently (TRANSFER_CONCURRENCY in config) and retried on failure (TRANSFER_RETRIES).
 
         Args:
             s3_path (str, optional): S3 path from where it needs to download the folder. Defaults to None.
             bucket (str, optional): S3 bucket name, if S3 path is not provided . Defaults to None.
             key (str, optional): S3 Key name, if S3 path is not provied. Defaults to None.
             local_path_to_download (str, optional): save location. Defaults to '.' (current directory).
+            sync (bool, optional): download only the objects which differ from the local files (size, ETag / md5, mtime).
+                                   A manifest of the synced files is kept in the local folder. Defaults to False.
+            delete (bool, optional): with sync, delete the local files which are not in s3. Defaults to False.
+            transfer_config (dict, optional): boto3 TransferConfig arguments (multipart_threshold, multipart_chunksize, max_concurrency, ...)
+                                              overriding TRANSFER_CONFIG of the config and the part size chosen from the file size. Defaults to None.
+
+        Returns:
+            dict: transfer summary (files, bytes, retries, seconds, bytes_per_second, and skipped, deleted with sync)
+        """
+        return _s3_download_folder(self._s3, s3_path=s3_path, bucket=bucket,key=key,engine=self._transfers,
+                                   local_path_to_download=local_path_to_download, sync=sync, delete=delete,
+                                   transfer_config=self._transfer_overrides(transfer_config))
+
+    @instrumented('s3_path', 's3://{bucket}/{key}')
+    async def aread_as_dataframe(self, s3_path: str = None, bucket: str = None, key: str = None, pandas_args: Dict = {},
+                                 polars_args: Dict = {}, extension='csv', return_type='pandas'):
+        """
+        Async version of read_as_dataframe. The objects are downloaded concurrently on the event loop and parsed in the
+        default executor, so the loop is not blocked.
+
+        Args:
+            s3_path (str, optional): S3 path, glob pattern (s3://bucket/prefix/*.parquet) or folder ending with /. Defaults to None.
+            bucket (str, optional): S3 bucket name, if S3 path is not provided. Defaults to None.
+            key (str, optional): S3 key, glob pattern or folder, if S3 path is not provided. Defaults to None.
+            pandas_args (dict, optional): pandas reader arguments. Defaults to {}.
+            polars_args (dict, optional): polars reader arguments. Defaults to {}.
+            extension (str, optional): file extension, used if the key has no suffix. Defaults to 'csv'.
+            return_type (str, optional): 'pandas', 'polars' or 'arrow'. Defaults to 'pandas'.
+
+        Returns:
+            DataFrame: Pandas or Polars dataframe
+        """
+        if s3_path:
+            bucket, key = s3_path.split('/',3)[2:]
+        client = await self._async.client()
+        limit = self._async.limit
+        return await _async_read(partial(_s3_async_list, client, bucket), partial(_s3_async_get, client, bucket, limit=limit),
+                                 key, extension, return_type, pandas_args, polars_args, self._async.concurrency)
+
+    @instrumented('s3://{bucket}/{key}')
+    async def awrite_dataframe(self, df, bucket: str, key: str, extension='csv', pandas_args = {}, polars_args = {}, compression = None):
+        """
+        Async version of write_dataframe. The dataframe is encoded in the default executor and uploaded in concurrent
+        multipart parts.
+
+        Args:
+            df (DataFrame): Dataframe which need to be uploaded
+            bucket (str): S3 Bucket Name
+            key (str): file name with extension
+            extension (str, optional): extension of the file, It take automatically from the filename parameter. Defaults to 'csv'
+            compression (str or dict, optional): compression of the file, as for write_dataframe. Defaults to None.
+        """
+        key = _compressed_name(key, extension, compression)
+        data = await _async_encode(df, key, extension, pandas_args, polars_args, compression)
+        async def read_range(start, end):
+            return data[start:end]
+        await _s3_async_upload(await self._async.client(), bucket, key, len(data), read_range, self._async.limit)
+        _message("Dataframe saved to the s3 path:", f"s3://{bucket}/{key}")
+
+    @instrumented('s3://{bucket}/{key}')
+    async def aupload_file(self, source_file_path: str, bucket: str, key: str):
+        """
+        Async version of upload_file. Files larger than a part are uploaded in concurrent multipart parts,
+        read from the file in the default executor.
+
+        Args:
+            source_file_path (str): source file path
+            bucket (str): destination bucket
+            key (str): destination file path
+        """
+        async def read_range(start, end):
+            return await _run_blocking(_read_file_range, source_file_path, start, end)
+        await _s3_async_upload(await self._async.client(), bucket, key, os.path.getsize(source_file_path), read_range,
+                               self._async.limit)
+        _message("File uploaded to the s3 path:", f"s3://{bucket}/{key}")
+
+    @instrumented('s3_path', 's3://{bucket}/{key}')
+    async def adownload_file(self, s3_path: str = None, bucket: str = None, key: str = None, local_path_to_download: str = '.'):
+        """
+        Async version of download_file. The object is downloaded with concurrent ranged requests.
+
+        Args:
+            s3_path (str, optional): S3 path from where it needs to download the file. Defaults to None.
+            bucket (str, optional): S3 bucket name, if S3 path is not provided . Defaults to None.
+            key (str, optional): S3 Key name, if S3 path is not provied. Defaults to None.
+            local_path_to_download (str, optional): save location. Defaults to '.' (current directory).
         """
-        _s3_download_folder(self._s3, s3_path=s3_path, bucket=bucket,key=key,local_path_to_download=local_path_to_download)
+        if s3_path:
+            bucket, key = s3_path.split('/',3)[2:]
+        file_path = os.path.join(local_path_to_download, Path(key).name)
+        await _s3_async_download_file(await self._async.client(), bucket, key, file_path, self._async.limit)
+        _message("File downloaded to the path:", file_path)
+
+    def _transfer_overrides(self, transfer_config):
+        return {**self._transfer_config, **(transfer_config or {})}
+
+    def _list_names(self, bucket, prefix):
+        return (obj.key for obj in self._s3.Bucket(bucket).objects.filter(Prefix=prefix))
+
+    def _get_object(self, bucket, key):
+        client = self._s3.meta.client
+        if self.cache is None:
+            body = client.get_object(Bucket=bucket, Key=key)['Body']
+            current_operation().first_byte()
+            return _spilled_download(lambda fileobj: shutil.copyfileobj(body, fileobj, _SPILL_CHUNK_SIZE),
+                                     self._spill_threshold, self._spill_dir)
+        def download(fileobj, etag):
+            shutil.copyfileobj(client.get_object(Bucket=bucket, Key=key, IfMatch=etag)['Body'], fileobj)
+            current_operation().add_bytes(fileobj.tell())
+        return self.cache.open('s3', bucket, key, head=lambda: client.head_object(Bucket=bucket, Key=key)['ETag'],
+                               download=download)
+
+    def _open(self, bucket, key, buffer_size=DEFAULT_STREAM_BUFFER):
+        client = self._s3.meta.client
+        size = client.head_object(Bucket=bucket, Key=key)['ContentLength']
+        def fetch(start, end):
+            data = client.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end - 1}')['Body'].read()
+            current_operation().add_bytes(len(data))
+            return data
+        return _open_ranged(fetch, size, buffer_size)
 
 class GCS():
     def __init__(self,config):
         """
         GCS class create a ligo gcs object, through which you can able to read, write, upload, download data from Google Cloud Storage.
 
+        Set CACHE_DIR (and optionally CACHE_MAX_SIZE in bytes, CACHE_VALIDATE) in the config to cache the read blobs on local disk.
+        Blobs larger than SPILL_THRESHOLD bytes are staged in a temporary file (in SPILL_DIR) instead of memory and
+        parsed from there.
+        The async methods (aread_as_dataframe, awrite_dataframe, aupload_file, adownload_file) use gcloud-aio-storage and keep
+        at most ASYNC_CONCURRENCY requests in flight.
+
         Args:
             config (dict): Automatically loaded from the config file (yaml)
         """
         self._gcs = storage.Client.from_service_account_json(json_credentials_path=config['GOOGLE_APPLICATION_CREDENTIALS_PATH'])
+        # kept to create the connectors of the dask workers
+        self._config = config
+        self.cache = _object_cache(config)
+        self._spill_threshold = config.get('SPILL_THRESHOLD', DEFAULT_SPILL_THRESHOLD)
+        self._spill_dir = config.get('SPILL_DIR')
+        self._transfers = TransferEngine(config.get('TRANSFER_CONCURRENCY', DEFAULT_TRANSFER_CONCURRENCY),
+                                         config.get('TRANSFER_RETRIES', DEFAULT_TRANSFER_RETRIES))
+        self._async = AsyncResources(_gcs_async_client_factory(config), config.get('ASYNC_CONCURRENCY', DEFAULT_ASYNC_CONCURRENCY))
+
+    def close(self) -> None:
+        """
+        Closes the underlying gcs client and its http session
+        """
+        self._transfers.close()
+        self._gcs.close()
 
+    async def aclose(self) -> None:
+        """
+        Closes the async client of the running event loop
+        """
+        await self._async.aclose()
+
+    @instrumented('gcs_path', 'gs://{bucket}/{blob_name}')
     def read_as_dataframe(self, gcs_path: str = None, bucket: str = None, blob_name: str = None, pandas_args: Dict = {}, 
-                            polars_args: Dict = {}, extension='csv', return_type='pandas'):
+                            polars_args: Dict = {}, extension='csv', return_type='pandas', max_workers: int = DEFAULT_MAX_WORKERS,
+                            columns: List[str] = None, filters: List = None, processes: int = None):
         """Takes gcs path as argument and return dataframe.
 
         Args:
             gcs_path (str): gcs path of the file need to be loaded, for multiple file loading, use gs://bucket/path/filename*
-                           to load all files from folder, use gs://bucket/folder/.
+                           or a glob pattern like gs://bucket/folder/dt=2024-*/*.parquet. to load all files from folder, use gs://bucket/folder/.
             bucket (str): GCS Bucket Name
             blob_name (str): file name with extension
             pandas_args (dict): pandas arguments like encoding, etc
             extension (str, optional): extension of the files, It take automatically from the gcs path parameter. Defaults to 'csv'.
-            return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask). dask returns a lazy
+                                         dataframe with one partition per object. Defaults to 'pandas'.
+            max_workers (int, optional): number of objects downloaded and parsed concurrently for multiple file loading. Defaults to DEFAULT_MAX_WORKERS.
+            columns (list, optional): parquet only, columns to read. Only these column chunks are downloaded. Defaults to None (all columns).
+            filters (list, optional): parquet only, pyarrow filters like [('dt', '>=', '2024-01-01')]. Row groups whose statistics
+                                      do not match are skipped without being downloaded. Defaults to None.
+            processes (int, optional): number of processes parsing the objects for multiple file loading, for csv, json and excel
+                                       whose parsing is CPU bound. Defaults to None (parsed on the download threads).
 
         Returns:
             DataFrame: Depends on the return_type parameter.
         """
-        if return_type=='polars':
-            import polars as pl
-            reader_args = polars_args
-        elif return_type=='pandas':
-            reader_args = pandas_args
+        reader_args = _reader_args(return_type, pandas_args, polars_args)
         _readers = readers(return_type)
-        if gcs_path:
-            suffix = Path(gcs_path).suffix
-        else:
-            suffix = Path(blob_name).suffix
-        if suffix:
-            extension = suffix[1:]
+        extension = _read_extension(gcs_path or blob_name, extension)
         if extension not in _readers:
             raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
         reader = _readers[extension]
         if gcs_path:
             bucket, blob_name = gcs_path.split('/',3)[2:]
+        pushdown = columns is not None or filters is not None
+        if pushdown and (extension!='parquet' or _split_compression(blob_name)[1]):
+            raise ExtensionNotSupportException('columns and filters are only supported for uncompressed parquet files')
+        if return_type=='dask':
+            # listed up front, each object is one lazy partition
+            names = list(_match_names(self._list_names(bucket, _split_glob(blob_name)[0]), blob_name)) if _is_multi_file(blob_name) else [blob_name]
+            return _dask_read(self, bucket, names, extension, pandas_args, columns, filters)
+        if pushdown:
+            def load_parquet(name):
+                with self._open(bucket, name, buffer_size=0) as stream:
+                    return _read_parquet_pushdown(stream, columns, filters, return_type)
+            if _is_multi_file(blob_name):
+                names = _match_names(self._list_names(bucket, _split_glob(blob_name)[0]), blob_name)
+                return df_concat(list(_parallel_map(load_parquet, names, max_workers)), return_type)
+            return load_parquet(blob_name)
         bucket = self._gcs.get_bucket(bucket)
-        if blob_name.endswith('/') or blob_name.endswith('/*') or blob_name.endswith('*'):
-            blob_name = blob_name.strip('*')
-            blob_names = [blob.name for blob in bucket.list_blobs()]
-            dfs = []
-            for blob in blob_names:
-                if blob.startswith(blob_name):
-                    extension = Path(blob).suffix[1:]
-                    reader = _readers[extension]
-                    blob = bucket.blob(blob)
-                    data = blob.download_as_string()
-                    stream = BytesIO(data)
-                    df = reader(stream, **reader_args)
-                    dfs.append(df)
+        if _is_multi_file(blob_name):
+            prefix, _ = _split_glob(blob_name)
+            listing = self._list_names(bucket.name, prefix)
+            if processes:
+                dfs = _process_file_load(lambda name: self._get_object(bucket.name, name), _match_names(listing, blob_name),
+                                         return_type, extension, reader_args, max_workers, processes)
+            else:
+                dfs = _multi_file_load(lambda name: self._get_object(bucket.name, name), _match_names(listing, blob_name), reader=reader,
+                                       reader_args=reader_args, max_workers=max_workers, _readers=_readers)
             return df_concat(dfs,return_type)
         else:
-            blob = bucket.blob(blob_name)
-            data = blob.download_as_string()
-            stream = BytesIO(data)
-            df = reader(stream, **reader_args)
+            with self._get_object(bucket.name, blob_name) as stream:
+                df = _object_reader(blob_name, _readers, reader)(stream, **reader_args)
             return df
 
-    def write_dataframe(self, df, bucket, blob_name, extension='csv', pandas_args = {}, polars_args = {}):
+    @instrumented('gcs_path', 'gs://{bucket}/{blob_name}')
+    def iter_batches(self, gcs_path: str = None, bucket: str = None, blob_name: str = None, batch_size: int = 100000,
+                        pandas_args: Dict = {}, extension='csv', return_type='pandas'):
+        """
+        Takes gcs path as arguments and yields dataframes of batch_size rows. The blob is streamed,
+        so the memory used is bounded by the batch size instead of the blob size.
+
+        Args:
+            gcs_path (str): gcs path of the file need to be loaded, for multiple file loading, use gs://bucket/path/filename*
+                           or a glob pattern. to load all files from folder, use gs://bucket/folder/.
+            bucket (str): GCS Bucket Name
+            blob_name (str): file name with extension
+            batch_size (int, optional): number of rows per dataframe. Defaults to 100000.
+            pandas_args (dict): pandas arguments like encoding, etc used to parse csv and json lines files
+            extension (str, optional): extension of the files (csv, txt, json, parquet), It take automatically from the gcs path parameter. Defaults to 'csv'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow). Defaults to 'pandas'.
+
+        Yields:
+            DataFrame: Depends on the return_type parameter.
+        """
+        if gcs_path:
+            bucket, blob_name = gcs_path.split('/',3)[2:]
+        blob_names = _match_names(self._list_names(bucket, _split_glob(blob_name)[0]), blob_name) if _is_multi_file(blob_name) else [blob_name]
+        for name in blob_names:
+            blob_extension = _read_extension(name, extension)
+            compression = _split_compression(name)[1]
+            buffer_size = 0 if blob_extension=='parquet' and compression is None else DEFAULT_STREAM_BUFFER
+            with self._open(bucket, name, buffer_size=buffer_size) as stream:
+                stream = _decompress(stream, compression, seekable=blob_extension=='parquet')
+                yield from _iter_batches(stream, blob_extension, batch_size, return_type, pandas_args)
+
+    @instrumented('gs://{bucket}/{blob_name}')
+    def write_dataframe(self, df, bucket, blob_name, extension=None, pandas_args = {}, polars_args = {},
+                        partition_cols: List[str] = None, max_rows_per_file: int = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                        compression = None):
         """
         Takes DataFrame, bucket name, blob name as arguments and write the dataframe to GCS.
 
         Args:
             df (DataFrame): Dataframe which need to be uploaded
             bucket (str): GCS Bucket Name
-            blob_name (str): file name with extension
-            extension (str, optional): extension of the files, It take automatically from the filename parameter. Defaults to 'csv'
+            blob_name (str): file name with extension, or the folder prefix for partitioned writes
+            extension (str, optional): extension of the files, It take automatically from the filename parameter.
+                                       Defaults to None (csv, parquet for partitioned writes)
             index (bool, optional): pandas index parameter. Defaults to False.
             sep (str, optional): pandas sep parameter. Defaults to ','.
+            partition_cols (list, optional): write a hive partitioned dataset under the key prefix (prefix/col=value/part-00000.parquet).
+                                             The partition columns are encoded in the path, not in the files. Defaults to None.
+            max_rows_per_file (int, optional): split the dataset into files of at most this many rows. Defaults to None.
+            max_workers (int, optional): number of files encoded and uploaded concurrently for partitioned writes. Defaults to DEFAULT_MAX_WORKERS.
+            compression (str or dict, optional): gzip, zstd (multi-threaded), bz2, lz4 or snappy, or a dict like {'method': 'zstd', 'level': 10}.
+                                                 csv and json are compressed as a stream and the suffix (.gz, .zst, ...) is appended to the name,
+                                                 parquet and feather pass it to their writer as the page codec. A compression suffix in the name
+                                                 (events.csv.gz) compresses the file too. Defaults to None.
+
+        Returns:
+            list: manifest (key, partition values, rows) of the written files for partitioned writes, else None
         """
-        _gcs_writer(self._gcs,df,bucket=bucket,filename=blob_name,extension=extension, pandas_args = pandas_args, polars_args = polars_args)
-        print("Dataframe saved to the gcs path:", f"gs://{bucket}/{blob_name}")
+        partitioned = bool(partition_cols or max_rows_per_file)
+        extension = extension or ('parquet' if partitioned else 'csv')
+        if partitioned:
+            write = lambda part, name: _gcs_writer(self._gcs, part, bucket=bucket, filename=name, extension=extension, pandas_args = pandas_args, polars_args = polars_args,
+                                                   compression = compression)
+            manifest = _partitioned_write(write, df, blob_name, _compressed_suffix(extension, compression), partition_cols, max_rows_per_file, max_workers)
+            _message("Dataframe saved as", len(manifest), "files to the gcs path:", f"gs://{bucket}/{blob_name}")
+            return manifest
+        blob_name = _compressed_name(blob_name, extension, compression)
+        _gcs_writer(self._gcs,df,bucket=bucket,filename=blob_name,extension=extension, pandas_args = pandas_args, polars_args = polars_args,
+                    compression = compression)
+        _message("Dataframe saved to the gcs path:", f"gs://{bucket}/{blob_name}")
     
+    @instrumented('gs://{bucket}/{blob_name}')
     def upload_file(self, source_file_path: str, bucket: str, blob_name: str):
         """
         Takes source file path, bucket and blob name as arguments and upload the file to GCS
@@ -224,8 +587,10 @@ class GCS():
         Bucket = storage.Bucket(self._gcs, bucket)
         blob = Bucket.blob(blob_name)
         blob.upload_from_filename(source_file_path)
-        print("File uploaded to the gcs path:", f"gs://{bucket}/{blob_name}")
+        current_operation().add_bytes(os.path.getsize(source_file_path))
+        _message("File uploaded to the gcs path:", f"gs://{bucket}/{blob_name}")
 
+    @instrumented('gcs_path', 'gs://{bucket}/{blob_name}')
     def download_file(self, gcs_path: str = None, bucket: str = None, blob_name: str = None, path_to_download: str = '.'):
         """
         Takes gcs path or (bucket and blob name) as arguments and download the file
@@ -243,106 +608,366 @@ class GCS():
         filename = Path(blob_name).name
         file_path = os.path.join(path_to_download,filename)
         blob.download_to_filename(file_path)
-        print("File downloaded to the path:", f"{file_path}")
+        current_operation().add_bytes(os.path.getsize(file_path))
+        _message("File downloaded to the path:", f"{file_path}")
         
-    def upload_folder(self,local_folder_path: str, bucket: str, blob_path: str=''):
+    @instrumented('gs://{bucket}/{blob_path}')
+    def upload_folder(self,local_folder_path: str, bucket: str, blob_path: str='', sync: bool = False, delete: bool = False) -> dict:
+        """
+        Takes local path, bucket and blob path as arguments and upload the folder to GCS.
+        The files are uploaded concurrently (TRANSFER_CONCURRENCY in config) and retried on failure (TRANSFER_RETRIES).
+
+        Args:
+            local_folder_path (str): local path of the folder want to be uploaded
+            bucket (str): GCS Bucket Name
+            blob_path (str, optional): destination folder in the bucket. Defaults to ''.
+            sync (bool, optional): upload only the files which differ from the blobs (size, md5 / crc32c, mtime).
+                                   A manifest of the synced files is kept in the local folder. Defaults to False.
+            delete (bool, optional): with sync, delete the blobs under blob_path which are not in the local folder. Defaults to False.
+
+        Returns:
+            dict: transfer summary (files, bytes, retries, seconds, bytes_per_second, and skipped, deleted with sync)
+        """
         bucket = self._gcs.get_bucket(bucket)
-        for path, _, files in os.walk(local_folder_path):
-            for name in files:
-                local_path = os.path.join(path, name)
-                relative_path = os.path.relpath(local_path, local_folder_path).replace('\\', '/')
-                dest_blob_path = local_path.replace(local_folder_path, "").replace('\\', '/')
-                if blob_path:
-                    dest_blob_path = os.path.join(blob_path, relative_path)
-                blob = bucket.blob(dest_blob_path)
+        if sync:
+            prefix = blob_path.rstrip('/') + '/' if blob_path else ''
+            remote_objects = (obj._replace(name=obj.name[len(prefix):]) for obj in self._remote_objects(bucket, prefix))
+            def upload(local_path, name):
+                blob = bucket.blob(prefix + name)
+                # the upload response fills the etag and hashes of the blob
                 blob.upload_from_filename(local_path)
-        print('Folder uploaded to the bucket: ', f"{bucket}/{blob_path}")
+                return _gcs_remote_object(blob)
+            delete_remote = (lambda name: bucket.delete_blob(prefix + name)) if delete else None
+            summary = _sync_upload(self._transfers, local_folder_path, remote_objects, upload, delete_remote)
+        else:
+            def jobs():
+                for local_path, relative_path in _local_files(local_folder_path):
+                    dest_blob_path = local_path.replace(local_folder_path, "").replace('\\', '/')
+                    if blob_path:
+                        dest_blob_path = os.path.join(blob_path, relative_path)
+                    yield TransferJob(dest_blob_path, os.path.getsize(local_path),
+                                      partial(bucket.blob(dest_blob_path).upload_from_filename, local_path))
+            summary = self._transfers.run(jobs())
+        _message('Folder uploaded to the bucket: ', f"{bucket.name}/{blob_path}", f"({_format_summary(summary)})")
+        return summary
+
+    @instrumented('gcs_path', 'gs://{bucket}/{blob_path}')
+    def download_folder(self, gcs_path: str = None, bucket: str = None, blob_path: str = None, local_path_to_download: str = '.',
+                        sync: bool = False, delete: bool = False) -> dict:
+        """
+        Takes gcs path or (bucket and blob path) as arguments and download the folder.
+        The files are downloaded concurrently (TRANSFER_CONCURRENCY in config) and retried on failure (TRANSFER_RETRIES).
 
-    def download_folder(self, gcs_path: str = None, bucket: str = None, blob_path: str = None, local_path_to_download: str = '.'):
+        Args:
+            gcs_path (str, optional): GCS folder path. Defaults to None.
+            bucket (str, optional): GCS bucket name, if gcs path is not provided. Defaults to None.
+            blob_path (str, optional): GCS folder path in the bucket, if gcs path is not provided. Defaults to None.
+            local_path_to_download (str, optional): save location. Defaults to '.'.
+            sync (bool, optional): download only the blobs which differ from the local files (size, md5 / crc32c, mtime).
+                                   A manifest of the synced files is kept in the local folder. Defaults to False.
+            delete (bool, optional): with sync, delete the local files which are not in the GCS folder. Defaults to False.
+
+        Returns:
+            dict: transfer summary (files, bytes, retries, seconds, bytes_per_second, and skipped, deleted with sync)
+        """
         if gcs_path:
             bucket, blob_path = gcs_path.split('/',3)[2:]
         bucket = self._gcs.get_bucket(bucket)
-        os.makedirs(os.path.join(local_path_to_download,Path(blob_path).stem))
-        for blob in bucket.list_blobs(prefix=blob_path):
-            if '.' in blob.name:
-                filepath = os.path.join(local_path_to_download, blob.name)
+        if sync:
+            prefix = blob_path.rstrip('/') + '/'
+            remote_objects = (obj._replace(name=obj.name[len(prefix):]) for obj in self._remote_objects(bucket, prefix))
+            download = lambda obj, file_path: bucket.blob(prefix + obj.name).download_to_filename(file_path)
+            summary = _sync_download(self._transfers, os.path.join(local_path_to_download, blob_path.rstrip('/')),
+                                     remote_objects, download, delete)
+        else:
+            os.makedirs(os.path.join(local_path_to_download,Path(blob_path).stem), exist_ok=True)
+            def download(blob, filepath):
                 Path(filepath).parent.mkdir(parents=True, exist_ok=True)
                 blob.download_to_filename(filepath)
-        print('Folder downloaded to the path:',f"{local_path_to_download}/{Path(blob_path).stem}")
+            def jobs():
+                for blob in bucket.list_blobs(prefix=blob_path):
+                    if '.' in blob.name:
+                        yield TransferJob(blob.name, blob.size, partial(download, blob, os.path.join(local_path_to_download, blob.name)))
+            summary = self._transfers.run(jobs())
+        _message('Folder downloaded to the path:',f"{local_path_to_download}/{Path(blob_path).stem}", f"({_format_summary(summary)})")
+        return summary
+
+    @instrumented('gcs_path', 'gs://{bucket}/{blob_name}')
+    async def aread_as_dataframe(self, gcs_path: str = None, bucket: str = None, blob_name: str = None, pandas_args: Dict = {},
+                                 polars_args: Dict = {}, extension='csv', return_type='pandas'):
+        """
+        Async version of read_as_dataframe. The blobs are downloaded concurrently on the event loop and parsed in the
+        default executor, so the loop is not blocked.
+
+        Args:
+            gcs_path (str, optional): GCS path, glob pattern (gs://bucket/prefix/*.parquet) or folder ending with /. Defaults to None.
+            bucket (str, optional): GCS bucket name, if gcs path is not provided. Defaults to None.
+            blob_name (str, optional): blob name, glob pattern or folder, if gcs path is not provided. Defaults to None.
+            pandas_args (dict, optional): pandas reader arguments. Defaults to {}.
+            polars_args (dict, optional): polars reader arguments. Defaults to {}.
+            extension (str, optional): file extension, used if the blob name has no suffix. Defaults to 'csv'.
+            return_type (str, optional): 'pandas', 'polars' or 'arrow'. Defaults to 'pandas'.
+
+        Returns:
+            DataFrame: Pandas or Polars dataframe
+        """
+        if gcs_path:
+            bucket, blob_name = gcs_path.split('/',3)[2:]
+        client = await self._async.client()
+        limit = self._async.limit
+        return await _async_read(partial(_gcs_async_list, client, bucket), partial(_gcs_async_get, client, bucket, limit=limit),
+                                 blob_name, extension, return_type, pandas_args, polars_args, self._async.concurrency)
+
+    @instrumented('gs://{bucket}/{blob_name}')
+    async def awrite_dataframe(self, df, bucket, blob_name, extension='csv', pandas_args = {}, polars_args = {}, compression = None):
+        """
+        Async version of write_dataframe. The dataframe is encoded in the default executor.
+
+        Args:
+            df (DataFrame): Dataframe which need to be uploaded
+            bucket (str): GCS Bucket Name
+            blob_name (str): file name with extension
+            extension (str, optional): extension of the file, It take automatically from the filename parameter. Defaults to 'csv'
+            compression (str or dict, optional): compression of the file, as for write_dataframe. Defaults to None.
+        """
+        blob_name = _compressed_name(blob_name, extension, compression)
+        data = await _async_encode(df, blob_name, extension, pandas_args, polars_args, compression)
+        client = await self._async.client()
+        async with self._async.limit:
+            await client.upload(bucket, blob_name, data, timeout=_GCS_ASYNC_TIMEOUT)
+        current_operation().add_bytes(len(data))
+        _message("Dataframe saved to the gcs path:", f"gs://{bucket}/{blob_name}")
+
+    @instrumented('gs://{bucket}/{blob_name}')
+    async def aupload_file(self, source_file_path: str, bucket: str, blob_name: str):
+        """
+        Async version of upload_file
+
+        Args:
+            source_file_path (str): Source file path
+            bucket (str): GCS Bucket Name
+            blob_name (str): Blob name (destination file path)
+        """
+        client = await self._async.client()
+        async with self._async.limit:
+            await client.upload_from_filename(bucket, blob_name, source_file_path, timeout=_GCS_ASYNC_TIMEOUT)
+        current_operation().add_bytes(os.path.getsize(source_file_path))
+        _message("File uploaded to the gcs path:", f"gs://{bucket}/{blob_name}")
+
+    @instrumented('gcs_path', 'gs://{bucket}/{blob_name}')
+    async def adownload_file(self, gcs_path: str = None, bucket: str = None, blob_name: str = None, path_to_download: str = '.'):
+        """
+        Async version of download_file
+
+        Args:
+            gcs_path (str, optional): GCS file path. Defaults to None.
+            bucket (str, optional): GCS bucket name, if gcs path is not provided. Defaults to None.
+            blob_name (str, optional): GCS blob name, if gcs path is not provied. Defaults to None.
+            path_to_download (str, optional): save location. Defaults to '.'.
+        """
+        if gcs_path:
+            bucket, blob_name = gcs_path.split('/',3)[2:]
+        file_path = os.path.join(path_to_download, Path(blob_name).name)
+        client = await self._async.client()
+        async with self._async.limit:
+            await client.download_to_filename(bucket, blob_name, file_path, timeout=_GCS_ASYNC_TIMEOUT)
+        current_operation().add_bytes(os.path.getsize(file_path))
+        _message("File downloaded to the path:", file_path)
+
+    def _remote_objects(self, bucket, prefix):
+        for blob in bucket.list_blobs(prefix=prefix):
+            if blob.name.endswith('/'):
+                continue
+            yield _gcs_remote_object(blob)
+
+    def _list_names(self, bucket, prefix):
+        return (blob.name for blob in self._gcs.bucket(bucket).list_blobs(prefix=prefix))
+
+    def _get_object(self, bucket, blob_name):
+        if self.cache is None:
+            return _spilled_download(self._gcs.bucket(bucket).blob(blob_name).download_to_file, self._spill_threshold, self._spill_dir)
+        def download(fileobj, generation):
+            self._gcs.bucket(bucket).blob(blob_name, generation=generation).download_to_file(fileobj)
+            current_operation().add_bytes(fileobj.tell())
+        return self.cache.open('gcs', bucket, blob_name, head=lambda: self._gcs.bucket(bucket).get_blob(blob_name).generation,
+                               download=download)
+
+    def _open(self, bucket, blob_name, buffer_size=DEFAULT_STREAM_BUFFER):
+        blob = self._gcs.bucket(bucket).get_blob(blob_name)
+        def fetch(start, end):
+            data = blob.download_as_bytes(start=start, end=end - 1)
+            current_operation().add_bytes(len(data))
+            return data
+        return _open_ranged(fetch, blob.size, buffer_size)
 
 class AzureBlob():
     def __init__(self,config):
         """
         AzureBlob class create a ligo azureblob object, through which you can able to read, write, upload, download data from Azure Blob Storage.
 
+        Set CACHE_DIR (and optionally CACHE_MAX_SIZE in bytes, CACHE_VALIDATE) in the config to cache the read blobs on local disk.
+        Blobs larger than SPILL_THRESHOLD bytes are staged in a temporary file (in SPILL_DIR) instead of memory and
+        parsed from there.
+        The async methods (aread_as_dataframe, awrite_dataframe, aupload_file, adownload_file) use the aio client of
+        azure-storage-blob and keep at most ASYNC_CONCURRENCY requests in flight.
+
         Args:
             config (dict): Automatically loaded from the config file (yaml)
         """
         self._abs = BlobServiceClient(account_url=f"https://{config['ACCOUNT_NAME']}.blob.core.windows.net",
                                         credential=config['ACCOUNT_KEY'])
-        
+        # kept to create the connectors of the dask workers
+        self._config = config
+        self.cache = _object_cache(config)
+        self._spill_threshold = config.get('SPILL_THRESHOLD', DEFAULT_SPILL_THRESHOLD)
+        self._spill_dir = config.get('SPILL_DIR')
+        self._transfers = TransferEngine(config.get('TRANSFER_CONCURRENCY', DEFAULT_TRANSFER_CONCURRENCY),
+                                         config.get('TRANSFER_RETRIES', DEFAULT_TRANSFER_RETRIES))
+        self._async = AsyncResources(_azure_blob_async_client_factory(config), config.get('ASYNC_CONCURRENCY', DEFAULT_ASYNC_CONCURRENCY))
+
+    def close(self) -> None:
+        """
+        Closes the underlying blob service client and its http session
+        """
+        self._transfers.close()
+        self._abs.close()
+
+    async def aclose(self) -> None:
+        """
+        Closes the async client of the running event loop
+        """
+        await self._async.aclose()
+
+    @instrumented('{container_name}/{blob_name}')
     def read_as_dataframe(self, container_name: str,blob_name: str, pandas_args: Dict = {}, 
-                            polars_args: Dict = {}, extension='csv', return_type='pandas'):
+                            polars_args: Dict = {}, extension='csv', return_type='pandas', max_workers: int = DEFAULT_MAX_WORKERS,
+                            columns: List[str] = None, filters: List = None, processes: int = None):
         """Takes Azure Storage account container name and blob name and return datafarme.
 
         Args:
             container_name (str): Container Name of the azure storage account 
-            blob_name (str): Blob Name which wants to read
+            blob_name (str): Blob Name which wants to read, for multiple file loading, use path/filename* or a glob pattern
+                             like folder/dt=2024-*/*.parquet. to load all files from folder, use folder/.
             pandas_args (dict): pandas arguments like encoding, etc
             extension (str, optional): extension of the files, It take automatically from the blob_name parameter. Defaults to 'csv'.
-            return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask). dask returns a lazy
+                                         dataframe with one partition per object. Defaults to 'pandas'.
+            max_workers (int, optional): number of objects downloaded and parsed concurrently for multiple file loading. Defaults to DEFAULT_MAX_WORKERS.
+            columns (list, optional): parquet only, columns to read. Only these column chunks are downloaded. Defaults to None (all columns).
+            filters (list, optional): parquet only, pyarrow filters like [('dt', '>=', '2024-01-01')]. Row groups whose statistics
+                                      do not match are skipped without being downloaded. Defaults to None.
+            processes (int, optional): number of processes parsing the objects for multiple file loading, for csv, json and excel
+                                       whose parsing is CPU bound. Defaults to None (parsed on the download threads).
 
         Returns:
             DataFrame: Depends on the return_type parameter.
         """
-        if return_type=='polars':
-            import polars as pl
-            reader_args = polars_args
-        elif return_type=='pandas':
-            reader_args = pandas_args
+        reader_args = _reader_args(return_type, pandas_args, polars_args)
         _readers = readers(return_type)
-        suffix = Path(blob_name).suffix
-        if suffix:
-            extension = suffix[1:]
+        extension = _read_extension(blob_name, extension)
         if extension not in _readers:
             raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
         reader = _readers[extension]
-        container_client = self._abs.get_container_client(container_name)
-        if blob_name.endswith('/') or blob_name.endswith('/*') or blob_name.endswith('*'):
-            blob_name = blob_name.strip('*')
-            blob_names = [name for name in container_client.list_blob_names()]
-            dfs = []
-            for blob in blob_names:
-                if blob.startswith(blob_name):
-                    blob_client = container_client.get_blob_client(blob)
-                    stream = BytesIO(blob_client.download_blob().readall())
-                    extension = Path(blob).suffix[1:]
-                    reader = _readers[extension]
-                    df = reader(stream, **reader_args)
-                    dfs.append(df)
+        pushdown = columns is not None or filters is not None
+        if pushdown and (extension!='parquet' or _split_compression(blob_name)[1]):
+            raise ExtensionNotSupportException('columns and filters are only supported for uncompressed parquet files')
+        if return_type=='dask':
+            # listed up front, each object is one lazy partition
+            names = list(_match_names(self._list_names(container_name, _split_glob(blob_name)[0]), blob_name)) if _is_multi_file(blob_name) else [blob_name]
+            return _dask_read(self, container_name, names, extension, pandas_args, columns, filters)
+        if pushdown:
+            def load_parquet(name):
+                with self._open(container_name, name, buffer_size=0) as stream:
+                    return _read_parquet_pushdown(stream, columns, filters, return_type)
+            if _is_multi_file(blob_name):
+                names = _match_names(self._list_names(container_name, _split_glob(blob_name)[0]), blob_name)
+                return df_concat(list(_parallel_map(load_parquet, names, max_workers)), return_type)
+            return load_parquet(blob_name)
+        if _is_multi_file(blob_name):
+            prefix, _ = _split_glob(blob_name)
+            listing = self._list_names(container_name, prefix)
+            if processes:
+                dfs = _process_file_load(lambda name: self._get_object(container_name, name), _match_names(listing, blob_name),
+                                         return_type, extension, reader_args, max_workers, processes)
+            else:
+                dfs = _multi_file_load(lambda name: self._get_object(container_name, name), _match_names(listing, blob_name), reader=reader,
+                                       reader_args=reader_args, max_workers=max_workers, _readers=_readers)
             return df_concat(dfs,return_type)
         else:
-            blob_client = container_client.get_blob_client(blob_name)
-            stream = BytesIO(blob_client.download_blob().readall())
-            df = reader(stream, **reader_args)
+            with self._get_object(container_name, blob_name) as stream:
+                df = _object_reader(blob_name, _readers, reader)(stream, **reader_args)
             return df
         
-    def write_dataframe(self, df, container_name: str, blob_name: str, overwrite=True, extension='csv', pandas_args = {}, polars_args = {}):
+    @instrumented('{container_name}/{blob_name}')
+    def iter_batches(self, container_name: str, blob_name: str, batch_size: int = 100000, pandas_args: Dict = {},
+                        extension='csv', return_type='pandas'):
+        """
+        Takes Azure Storage account container name and blob name and yields dataframes of batch_size rows.
+        The blob is streamed, so the memory used is bounded by the batch size instead of the blob size.
+
+        Args:
+            container_name (str): Container Name of the azure storage account
+            blob_name (str): Blob Name which wants to read, for multiple file loading, use path/filename* or a glob pattern.
+                             to load all files from folder, use folder/.
+            batch_size (int, optional): number of rows per dataframe. Defaults to 100000.
+            pandas_args (dict): pandas arguments like encoding, etc used to parse csv and json lines files
+            extension (str, optional): extension of the files (csv, txt, json, parquet), It take automatically from the blob_name parameter. Defaults to 'csv'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow). Defaults to 'pandas'.
+
+        Yields:
+            DataFrame: Depends on the return_type parameter.
+        """
+        blob_names = _match_names(self._list_names(container_name, _split_glob(blob_name)[0]), blob_name) if _is_multi_file(blob_name) else [blob_name]
+        for name in blob_names:
+            blob_extension = _read_extension(name, extension)
+            compression = _split_compression(name)[1]
+            buffer_size = 0 if blob_extension=='parquet' and compression is None else DEFAULT_STREAM_BUFFER
+            with self._open(container_name, name, buffer_size=buffer_size) as stream:
+                stream = _decompress(stream, compression, seekable=blob_extension=='parquet')
+                yield from _iter_batches(stream, blob_extension, batch_size, return_type, pandas_args)
+
+    @instrumented('{container_name}/{blob_name}')
+    def write_dataframe(self, df, container_name: str, blob_name: str, overwrite=True, extension=None, pandas_args = {}, polars_args = {},
+                        partition_cols: List[str] = None, max_rows_per_file: int = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                        compression = None):
         """Takes DataFrame, container name, filename as arguments and write the dataframe to Azure Blob Storage.
 
         Args:
             df (DataFrame): Dataframe which need to be uploaded
             container_name (str): Container Name of the azure storage account
-            filename (str): file name with extension
+            filename (str): file name with extension, or the folder prefix for partitioned writes
             overwrite (bool, optional): Overwrite the existing data. Defaults to True.
-            extension (str, optional): extension of the files, It take automatically from the filename parameter. Defaults to 'csv'
+            extension (str, optional): extension of the files, It take automatically from the filename parameter.
+                                       Defaults to None (csv, parquet for partitioned writes)
             index (bool, optional): pandas index parameter. Defaults to False.
             sep (str, optional): pandas sep parameter. Defaults to ','.
+            partition_cols (list, optional): write a hive partitioned dataset under the key prefix (prefix/col=value/part-00000.parquet).
+                                             The partition columns are encoded in the path, not in the files. Defaults to None.
+            max_rows_per_file (int, optional): split the dataset into files of at most this many rows. Defaults to None.
+            max_workers (int, optional): number of files encoded and uploaded concurrently for partitioned writes. Defaults to DEFAULT_MAX_WORKERS.
+            compression (str or dict, optional): gzip, zstd (multi-threaded), bz2, lz4 or snappy, or a dict like {'method': 'zstd', 'level': 10}.
+                                                 csv and json are compressed as a stream and the suffix (.gz, .zst, ...) is appended to the name,
+                                                 parquet and feather pass it to their writer as the page codec. A compression suffix in the name
+                                                 (events.csv.gz) compresses the file too. Defaults to None.
+
+        Returns:
+            list: manifest (key, partition values, rows) of the written files for partitioned writes, else None
         """
-        _azure_blob_writer(self._abs, df, container_name,blob_name,overwrite=overwrite,extension=extension, pandas_args = {}, polars_args = {})
-        print("Dataframe saved to the container", container_name, "with the blob name of", blob_name)
+        partitioned = bool(partition_cols or max_rows_per_file)
+        extension = extension or ('parquet' if partitioned else 'csv')
+        if partitioned:
+            write = lambda part, name: _azure_blob_writer(self._abs, part, container_name, name, overwrite=overwrite, extension=extension,
+                                                          pandas_args = pandas_args, polars_args = polars_args, compression = compression)
+            manifest = _partitioned_write(write, df, blob_name, _compressed_suffix(extension, compression), partition_cols, max_rows_per_file, max_workers)
+            _message("Dataframe saved as", len(manifest), "files to the container", container_name, "under", blob_name)
+            return manifest
+        blob_name = _compressed_name(blob_name, extension, compression)
+        _azure_blob_writer(self._abs, df, container_name,blob_name,overwrite=overwrite,extension=extension, pandas_args = pandas_args, polars_args = polars_args,
+                           compression = compression)
+        _message("Dataframe saved to the container", container_name, "with the blob name of", blob_name)
 
     # source: https://learn.microsoft.com/en-us/azure/storage/blobs/storage-quickstart-blobs-python
+    @instrumented('{container_name}/{blob_name}')
     def upload_file(self,source_file_path: str, container_name: str, blob_name: str = None):
         """
         Takes source file path, container name and blob name as arguments and upload the file to Azure Blob Storage
@@ -359,9 +984,11 @@ class AzureBlob():
             blob_client = self._abs.get_blob_client(container=container_name, blob=filename)
         with open(source_file_path,'rb') as data:
             blob_client.upload_blob(data)
-        print("File uploaded to the container", container_name, "with the blob name of", blob_name)
+        current_operation().add_bytes(os.path.getsize(source_file_path))
+        _message("File uploaded to the container", container_name, "with the blob name of", blob_name)
 
     # source: https://learn.microsoft.com/en-us/azure/storage/blobs/storage-quickstart-blobs-python
+    @instrumented('{container_name}/{blob_name}')
     def download_file(self,container_name: str, blob_name: str, path_to_download='.'):
         """
         Takes container name and blob name as arguments and download the file
@@ -376,29 +1003,193 @@ class AzureBlob():
         container_client = self._abs.get_container_client(container= container_name)
         with open(file=download_file_path, mode="wb") as download_file:
             download_file.write(container_client.download_blob(blob_name).readall())
-        print('File downloaded to the path:', download_file_path)
+        current_operation().add_bytes(os.path.getsize(download_file_path))
+        _message('File downloaded to the path:', download_file_path)
 
-    def upload_folder(self, local_folder_path: str, container_name: str, blob_name: str) -> None:
+    @instrumented('{container_name}/{blob_name}')
+    def upload_folder(self, local_folder_path: str, container_name: str, blob_name: str, sync: bool = False, delete: bool = False) -> dict:
+        """
+        Takes local path, container name as arguments and upload the folder to Azure Blob Storage.
+        The files are uploaded concurrently (TRANSFER_CONCURRENCY in config) and retried on failure (TRANSFER_RETRIES).
+
+        Args:
+            local_folder_path (str): local path of the folder want to be uploaded
+            container_name (str): container name
+            blob_name (str): blob name, with sync it is the destination folder of the files in the container
+            sync (bool, optional): upload only the files which differ from the blobs (size, Content-MD5, mtime).
+                                   A manifest of the synced files is kept in the local folder. Defaults to False.
+            delete (bool, optional): with sync, delete the blobs under blob_name which are not in the local folder. Defaults to False.
+
+        Returns:
+            dict: transfer summary (files, bytes, retries, seconds, bytes_per_second, and skipped, deleted with sync)
+        """
         container_client = self._abs.get_container_client(container_name)
-        for root, _, files in os.walk(local_folder_path):
-            for filename in files:
-                local_path = os.path.join(root, filename)
-                relative_path = os.path.relpath(local_path, local_folder_path)
-                blob_name = relative_path.replace("\\", "/")
-                blob_client = container_client.get_blob_client(blob_name)
-                with open(local_path, "rb") as data:
-                    blob_client.upload_blob(data)
-        print("Folder uploaded to the container", container_name, "with the blob name of", Path(local_folder_path).stem)
-
-    def download_folder(self,container_name: str, blob_path: str, local_path_to_download='.'):
+        def upload(local_path, blob_name):
+            with open(local_path, "rb") as data:
+                # a retried upload may find the blob written by the failed attempt
+                result = container_client.get_blob_client(blob_name).upload_blob(data, overwrite=True)
+            # Content-MD5 is only returned for uploads done in a single request
+            content_md5 = result.get('content_md5')
+            return RemoteObject(blob_name, os.path.getsize(local_path), result['etag'],
+                                bytes(content_md5).hex() if content_md5 else None, None, result['last_modified'].timestamp())
+        if sync:
+            prefix = blob_name.rstrip('/') + '/' if blob_name else ''
+            remote_objects = (obj._replace(name=obj.name[len(prefix):]) for obj in self._remote_objects(container_client, prefix))
+            delete_remote = (lambda name: container_client.delete_blob(prefix + name)) if delete else None
+            summary = _sync_upload(self._transfers, local_folder_path, remote_objects,
+                                   lambda local_path, name: upload(local_path, prefix + name), delete_remote)
+        else:
+            def jobs():
+                for local_path, relative_path in _local_files(local_folder_path):
+                    yield TransferJob(relative_path, os.path.getsize(local_path), partial(upload, local_path, relative_path))
+            summary = self._transfers.run(jobs())
+        _message("Folder uploaded to the container", container_name, "with the blob name of", Path(local_folder_path).stem,
+              f"({_format_summary(summary)})")
+        return summary
+
+    @instrumented('{container_name}/{blob_path}')
+    def download_folder(self,container_name: str, blob_path: str, local_path_to_download='.', sync: bool = False, delete: bool = False) -> dict:
+        """
+        Takes container name and blob path as arguments and download the folder.
+        The files are downloaded concurrently (TRANSFER_CONCURRENCY in config) and retried on failure (TRANSFER_RETRIES).
+
+        Args:
+            container_name (str): container name
+            blob_path (str): folder path in the container
+            local_path_to_download (str, optional): save location. Defaults to '.'.
+            sync (bool, optional): download only the blobs which differ from the local files (size, Content-MD5, mtime).
+                                   A manifest of the synced files is kept in the local folder. Defaults to False.
+            delete (bool, optional): with sync, delete the local files which are not in the container folder. Defaults to False.
+
+        Returns:
+            dict: transfer summary (files, bytes, retries, seconds, bytes_per_second, and skipped, deleted with sync)
+        """
         container_client = self._abs.get_container_client(container_name)
-        for blob in container_client.list_blob_names():
-            if blob.startswith(blob_path):
-                blob_client = container_client.get_blob_client(blob)
-                file_path = os.path.join(local_path_to_download, blob)
-                print(file_path)
-                os.makedirs(os.path.dirname(file_path),exist_ok=True)
-                with open(file_path, "wb") as download_file:
-                    download_stream = blob_client.download_blob()
-                    download_file.write(download_stream.readall())
-        print('Folder downloaded to the path:', f"{local_path_to_download}/{Path(blob_path).stem}")
\ No newline at end of file
+        def download(blob, file_path):
+            os.makedirs(os.path.dirname(file_path),exist_ok=True)
+            with open(file_path, "wb") as download_file:
+                container_client.get_blob_client(blob).download_blob().readinto(download_file)
+        if sync:
+            prefix = blob_path.rstrip('/') + '/'
+            remote_objects = (obj._replace(name=obj.name[len(prefix):]) for obj in self._remote_objects(container_client, prefix))
+            summary = _sync_download(self._transfers, os.path.join(local_path_to_download, blob_path.rstrip('/')), remote_objects,
+                                     lambda obj, file_path: download(prefix + obj.name, file_path), delete)
+        else:
+            def jobs():
+                for blob in container_client.list_blobs(name_starts_with=blob_path):
+                    if blob.name.startswith(blob_path):
+                        yield TransferJob(blob.name, blob.size, partial(download, blob.name, os.path.join(local_path_to_download, blob.name)))
+            summary = self._transfers.run(jobs())
+        _message('Folder downloaded to the path:', f"{local_path_to_download}/{Path(blob_path).stem}", f"({_format_summary(summary)})")
+        return summary
+
+    @instrumented('{container_name}/{blob_name}')
+    async def aread_as_dataframe(self, container_name: str, blob_name: str, pandas_args: Dict = {},
+                                 polars_args: Dict = {}, extension='csv', return_type='pandas'):
+        """
+        Async version of read_as_dataframe. The blobs are downloaded concurrently on the event loop and parsed in the
+        default executor, so the loop is not blocked.
+
+        Args:
+            container_name (str): Container Name of the azure storage account
+            blob_name (str): Blob name, glob pattern (prefix/*.parquet) or folder ending with /
+            pandas_args (dict, optional): pandas reader arguments. Defaults to {}.
+            polars_args (dict, optional): polars reader arguments. Defaults to {}.
+            extension (str, optional): file extension, used if the blob name has no suffix. Defaults to 'csv'.
+            return_type (str, optional): 'pandas', 'polars' or 'arrow'. Defaults to 'pandas'.
+
+        Returns:
+            DataFrame: Pandas or Polars dataframe
+        """
+        client = await self._async.client()
+        limit = self._async.limit
+        return await _async_read(partial(_azure_blob_async_list, client, container_name),
+                                 partial(_azure_blob_async_get, client, container_name, limit=limit),
+                                 blob_name, extension, return_type, pandas_args, polars_args, self._async.concurrency)
+
+    @instrumented('{container_name}/{blob_name}')
+    async def awrite_dataframe(self, df, container_name: str, blob_name: str, overwrite=True, extension='csv', pandas_args = {}, polars_args = {},
+                               compression = None):
+        """
+        Async version of write_dataframe. The dataframe is encoded in the default executor.
+
+        Args:
+            df (DataFrame): Dataframe which need to be uploaded
+            container_name (str): Container Name of the azure storage account
+            blob_name (str): file name with extension
+            overwrite (bool, optional): Overwrite the existing data. Defaults to True.
+            extension (str, optional): extension of the file, It take automatically from the filename parameter. Defaults to 'csv'
+            compression (str or dict, optional): compression of the file, as for write_dataframe. Defaults to None.
+        """
+        blob_name = _compressed_name(blob_name, extension, compression)
+        data = await _async_encode(df, blob_name, extension, pandas_args, polars_args, compression)
+        client = await self._async.client()
+        async with self._async.limit:
+            await client.get_blob_client(container=container_name, blob=blob_name).upload_blob(data, overwrite=overwrite)
+        current_operation().add_bytes(len(data))
+        _message("Dataframe saved to the container", container_name, "with the blob name of", blob_name)
+
+    @instrumented('{container_name}/{blob_name}')
+    async def aupload_file(self, source_file_path: str, container_name: str, blob_name: str = None):
+        """
+        Async version of upload_file. Files larger than a block are uploaded in concurrent staged blocks,
+        read from the file in the default executor.
+
+        Args:
+            source_file_path (str): source file path
+            container_name (str): container name
+            blob_name (str, optional): blob name, if not mentioned, it automatically takes source filename as blob name. Defaults to None.
+        """
+        blob_name = blob_name or Path(source_file_path).name
+        async def read_range(start, end):
+            return await _run_blocking(_read_file_range, source_file_path, start, end)
+        client = await self._async.client()
+        await _azure_blob_async_upload(client.get_blob_client(container=container_name, blob=blob_name),
+                                       os.path.getsize(source_file_path), read_range, self._async.limit)
+        _message("File uploaded to the container", container_name, "with the blob name of", blob_name)
+
+    @instrumented('{container_name}/{blob_name}')
+    async def adownload_file(self, container_name: str, blob_name: str, path_to_download='.'):
+        """
+        Async version of download_file. The blob is downloaded with concurrent ranged requests.
+
+        Args:
+            container_name (str): container name
+            blob_name (str): blob name
+            path_to_download (str, optional): save location. Defaults to '.'.
+        """
+        download_file_path = os.path.join(path_to_download, Path(blob_name).name)
+        client = await self._async.client()
+        await _azure_blob_async_download_file(client.get_blob_client(container=container_name, blob=blob_name),
+                                              download_file_path, self._async.limit)
+        _message('File downloaded to the path:', download_file_path)
+
+    def _remote_objects(self, container_client, prefix):
+        for blob in container_client.list_blobs(name_starts_with=prefix):
+            content_md5 = blob.content_settings.content_md5
+            yield RemoteObject(blob.name, blob.size, blob.etag, bytes(content_md5).hex() if content_md5 else None, None,
+                               blob.last_modified.timestamp())
+
+    def _list_names(self, container_name, prefix):
+        return self._abs.get_container_client(container_name).list_blob_names(name_starts_with=prefix)
+
+    def _get_object(self, container_name, blob_name):
+        blob_client = self._abs.get_blob_client(container=container_name, blob=blob_name)
+        if self.cache is None:
+            downloader = blob_client.download_blob()
+            current_operation().first_byte()
+            return _spilled_download(downloader.readinto, self._spill_threshold, self._spill_dir)
+        def download(fileobj, etag):
+            blob_client.download_blob(etag=etag, match_condition=MatchConditions.IfNotModified).readinto(fileobj)
+            current_operation().add_bytes(fileobj.tell())
+        return self.cache.open('azureblob', container_name, blob_name, head=lambda: blob_client.get_blob_properties().etag,
+                               download=download)
+
+    def _open(self, container_name, blob_name, buffer_size=DEFAULT_STREAM_BUFFER):
+        blob_client = self._abs.get_blob_client(container=container_name, blob=blob_name)
+        size = blob_client.get_blob_properties().size
+        def fetch(start, end):
+            data = blob_client.download_blob(offset=start, length=end - start).readall()
+            current_operation().add_bytes(len(data))
+            return data
+        return _open_ranged(fetch, size, buffer_size)
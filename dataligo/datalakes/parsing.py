@@ -0,0 +1,134 @@
+import atexit
+import ctypes
+import threading
+import multiprocessing
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from ..utils import _to_arrow, _as_return_type
+from .spill import _local_path
+from .utils import readers, _object_reader, _parallel_map
+
+# process pools parsing objects, by number of processes, shared by all the connectors
+_PROCESS_POOLS = {}
+_PROCESS_POOLS_LOCK = threading.Lock()
+
+def _process_pool(processes):
+    with _PROCESS_POOLS_LOCK:
+        if processes not in _PROCESS_POOLS:
+            # the download threads of the parent make fork unsafe
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _PROCESS_POOLS[processes] = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context(method))
+        return _PROCESS_POOLS[processes]
+
+@atexit.register
+def _shutdown_process_pools():
+    with _PROCESS_POOLS_LOCK:
+        pools = list(_PROCESS_POOLS.values())
+        _PROCESS_POOLS.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+def _to_shared_memory(stream):
+    """
+    Copies the content of an in-memory stream to a new shared memory block, so that it reaches the pool without
+    being pickled. Returns (block, size); the caller unlinks the block.
+    """
+    data = stream.getbuffer() if hasattr(stream, 'getbuffer') else memoryview(stream.read())
+    with data:
+        shm = SharedMemory(create=True, size=max(data.nbytes, 1))
+        try:
+            shm.buf[:data.nbytes] = data
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        return shm, data.nbytes
+
+def _open_source(source):
+    if isinstance(source, str):
+        return open(source, 'rb')
+    name, size = source
+    shm = SharedMemory(name=name)
+    try:
+        with shm.buf[:size] as view:
+            return BytesIO(view)
+    finally:
+        shm.close()
+
+def _write_ipc(sink, table):
+    import pyarrow as pa
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+def _parse_to_shared_memory(name, source, return_type, extension, reader_args):
+    """
+    Runs in the pool. Parses the object (its local path or the (name, size) of the shared memory block holding it)
+    with the reader of return_type and writes it as an Arrow IPC stream to a new shared memory block.
+    Returns (block name, stream size); the parent unlinks the block.
+    """
+    import pyarrow as pa
+    _readers = readers(return_type)
+    with _open_source(source) as stream:
+        table = _to_arrow(_object_reader(name, _readers, _readers[extension])(stream, **reader_args))
+    sink = pa.MockOutputStream()
+    _write_ipc(sink, table)
+    size = sink.size()
+    shm = SharedMemory(create=True, size=max(size, 1))
+    try:
+        buffer = pa.py_buffer(shm.buf)
+        _write_ipc(pa.FixedSizeBufferWriter(buffer), table)
+        # the block can only be closed once no arrow buffer exports its memory
+        del buffer
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    return shm.name, size
+
+def _read_shared_memory(name, size):
+    """
+    Reads the Arrow IPC stream of the shared memory block into a table without copying it. The block is unlinked
+    at once and unmapped when the last buffer of the table is released.
+    """
+    import pyarrow as pa
+    shm = SharedMemory(name=name)
+    shm.unlink()
+    # the foreign buffer keeps the block mapped (its base) for as long as the table uses it
+    address = ctypes.addressof(ctypes.c_char.from_buffer(shm.buf))
+    return pa.ipc.open_stream(pa.foreign_buffer(address, size, base=shm)).read_all()
+
+def _process_file_load(get_object, names, return_type, extension, reader_args, max_workers, processes):
+    """
+    Downloads the objects on a thread pool and parses them on a pool of processes, so that csv / json / excel
+    parsing is not serialized by the GIL. The objects go to the processes and come back as Arrow IPC through
+    shared memory instead of being pickled. Objects on local disk (spilled or cached) are parsed from their path.
+
+    Args:
+        get_object (callable): get_object(name) returns a file object of the object
+        names (iterable): object names
+        return_type (str): pandas, polars or arrow, the readers of return_type parse the objects
+        extension (str): format of the objects without a format suffix
+        reader_args (dict): arguments of the readers, must be picklable
+        max_workers (int): number of objects downloaded concurrently
+        processes (int): number of parsing processes
+
+    Returns:
+        list: dataframes of the objects, in the order of names
+    """
+    executor = _process_pool(processes)
+    def load(name):
+        with get_object(name) as stream:
+            source, shm = _local_path(stream), None
+            if source is None:
+                shm, size = _to_shared_memory(stream)
+                source = (shm.name, size)
+            try:
+                block = executor.submit(_parse_to_shared_memory, name, source, return_type, extension, reader_args).result()
+            finally:
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+        return _as_return_type(_read_shared_memory(*block), return_type)
+    return list(_parallel_map(load, names, max_workers))
@@ -0,0 +1,98 @@
+import io
+import os
+import tempfile
+from ..instrumentation import current_operation
+
+# objects larger than this are staged in a temporary file instead of memory
+DEFAULT_SPILL_THRESHOLD = 256 * 1024 * 1024
+_SPILL_CHUNK_SIZE = 1024 * 1024
+
+class _SpilledFile(io.FileIO):
+    def __init__(self, path) -> None:
+        """
+        Readable file of a spilled object, the temporary file is removed when it is closed
+        """
+        super().__init__(path, 'rb')
+
+    def close(self) -> None:
+        if not self.closed:
+            super().close()
+            try:
+                os.remove(self.name)
+            except OSError:
+                pass
+
+class _SpillingWriter(io.RawIOBase):
+    def __init__(self, threshold, spill_dir=None) -> None:
+        """
+        Writable file object buffering in memory until threshold bytes are written, then moving the content
+        to a temporary file in spill_dir and writing the rest there
+        """
+        self._threshold = threshold
+        self._spill_dir = spill_dir
+        self._buffer = io.BytesIO()
+        self._file = None
+        self._path = None
+        self._written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self._file is None and self._threshold is not None and self._written + len(data) > self._threshold:
+            self._spill()
+        written = (self._file or self._buffer).write(data)
+        self._written += written
+        return written
+
+    def tell(self) -> int:
+        return self._written
+
+    def _spill(self):
+        fd, self._path = tempfile.mkstemp(dir=self._spill_dir, prefix='dataligo-spill-')
+        self._file = os.fdopen(fd, 'wb')
+        self._file.write(self._buffer.getbuffer())
+        self._buffer = None
+
+    def reader(self):
+        """
+        Returns a readable file object of the written content, a BytesIO or the spilled file
+        """
+        if self._file is None:
+            self._buffer.seek(0)
+            return self._buffer
+        self._file.close()
+        return _SpilledFile(self._path)
+
+    def discard(self) -> None:
+        """
+        Removes the temporary file of a failed download
+        """
+        if self._file is not None:
+            self._file.close()
+            os.remove(self._path)
+
+def _spilled_download(download, threshold=DEFAULT_SPILL_THRESHOLD, spill_dir=None):
+    """
+    Runs download(fileobj) and returns a readable file object of the downloaded object. Objects up to threshold
+    bytes are kept in memory, larger ones are streamed to a temporary file which is removed when it is closed.
+    A threshold of None keeps every object in memory.
+    """
+    writer = _SpillingWriter(threshold, spill_dir)
+    try:
+        download(writer)
+    except BaseException:
+        writer.discard()
+        raise
+    current_operation().add_bytes(writer.tell())
+    return writer.reader()
+
+def _local_path(stream):
+    """
+    Returns the path of the local file behind stream (a spilled or cached object), or None for in-memory streams.
+    Readers given the path parse the file natively, memory mapping it where they can.
+    """
+    name = getattr(stream, 'name', None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name
+    return None
@@ -0,0 +1,251 @@
+import io
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# size of the range requests made while streaming an object
+DEFAULT_STREAM_BUFFER = 8 * 1024 * 1024
+
+class RangedFile(io.RawIOBase):
+    def __init__(self, fetch, size: int) -> None:
+        """
+        Read only, seekable file object over a remote object. Every read is served by a range request,
+        so only the bytes actually read are downloaded.
+
+        Args:
+            fetch (callable): fetch(start, end) returns the bytes of the object in [start, end)
+            size (int): size of the object in bytes
+        """
+        self._fetch = fetch
+        self._size = size
+        self._pos = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self._size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        self._pos = max(self._pos, 0)
+        return self._pos
+
+    def readinto(self, b) -> int:
+        if self._pos >= self._size:
+            return 0
+        end = min(self._pos + len(b), self._size)
+        data = self._fetch(self._pos, end)
+        n = len(data)
+        b[:n] = data
+        self._pos += n
+        return n
+
+def _open_ranged(fetch, size: int, buffer_size: int = DEFAULT_STREAM_BUFFER):
+    """
+    Returns a file object over a remote object. With buffer_size, sequential reads are served by
+    range requests of buffer_size bytes (csv, json lines). With buffer_size=0, each read is its own
+    range request, which suits readers that seek around the file (parquet).
+    """
+    raw = RangedFile(fetch, size)
+    if not buffer_size:
+        return raw
+    return io.BufferedReader(raw, buffer_size=buffer_size)
+
+# S3 allows at most 10000 parts, each at least 5 MB except the last one
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_PART_CONCURRENCY = 4
+_PARTS_PER_SIZE_STEP = 1000
+
+class _PartWriter(io.RawIOBase):
+    def __init__(self, part_size: int, max_concurrency: int) -> None:
+        """
+        Write only file object uploading what is written to it in parts while it is being produced. At most
+        max_concurrency parts are in flight, so the memory used is bounded by (max_concurrency + 1) * part_size.
+        The part size doubles every 1000 parts. Subclasses upload the parts of the object store.
+        """
+        self._part_size = part_size
+        self._buffer = bytearray()
+        self._position = 0
+        self._started = False
+        self._parts = []
+        self._error = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, b) -> int:
+        if self._error is not None:
+            raise self._error
+        n = len(b)
+        self._buffer += b
+        self._position += n
+        while len(self._buffer) >= self._current_part_size():
+            part_size = self._current_part_size()
+            part = bytes(self._buffer[:part_size])
+            del self._buffer[:part_size]
+            self._upload_part(part)
+        return n
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if not self._started:
+                self._put_object(bytes(self._buffer))
+            else:
+                if self._buffer:
+                    self._upload_part(bytes(self._buffer))
+                self._complete([future.result() for future in self._parts])
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._buffer = bytearray()
+            self._executor.shutdown(wait=True)
+            super().close()
+
+    def abort(self) -> None:
+        """
+        Aborts the upload, so that no orphaned parts are left in the bucket
+        """
+        for future in self._parts:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        if self._started:
+            self._abort()
+            self._started = False
+        self._buffer = bytearray()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def _current_part_size(self):
+        return self._part_size * 2 ** (len(self._parts) // _PARTS_PER_SIZE_STEP)
+
+    def _upload_part(self, data):
+        if not self._started:
+            self._start()
+            self._started = True
+        # blocks the producer while max_concurrency parts are in flight
+        self._slots.acquire()
+        part_number = len(self._parts) + 1
+        self._parts.append(self._executor.submit(self._send_part, part_number, data))
+
+    def _send_part(self, part_number, data):
+        try:
+            return self._put_part(part_number, data)
+        except Exception as e:
+            self._error = e
+            raise
+        finally:
+            self._slots.release()
+
+    def _start(self):
+        pass
+
+    def _abort(self):
+        pass
+
+class S3MultipartWriter(_PartWriter):
+    def __init__(self, client, bucket: str, key: str, part_size: int = DEFAULT_PART_SIZE,
+                 max_concurrency: int = DEFAULT_PART_CONCURRENCY, extra_args: dict = {}) -> None:
+        """
+        Write only file object which uploads what is written to it as S3 multipart upload parts while it is
+        being produced. At most max_concurrency parts are in flight, so the memory used is bounded by
+        (max_concurrency + 1) * part_size. The part size doubles every 1000 parts, so the object size is not
+        limited by the 10000 parts limit. Objects smaller than one part are uploaded with a single PUT.
+
+        Use it as a context manager: the upload is completed on a clean exit and aborted on an exception.
+
+        Args:
+            client: boto3 s3 client
+            bucket (str): S3 Bucket Name
+            key (str): S3 key of the object
+            part_size (int, optional): size of the first parts in bytes. Defaults to DEFAULT_PART_SIZE.
+            max_concurrency (int, optional): number of parts uploaded concurrently. Defaults to DEFAULT_PART_CONCURRENCY.
+            extra_args (dict, optional): extra arguments of create_multipart_upload / put_object like ContentType. Defaults to {}.
+        """
+        super().__init__(max(part_size, 5 * 1024 * 1024), max_concurrency)
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._extra_args = extra_args
+        self._upload_id = None
+
+    def _put_object(self, data):
+        self._client.put_object(Bucket=self._bucket, Key=self._key, Body=data, **self._extra_args)
+
+    def _start(self):
+        response = self._client.create_multipart_upload(Bucket=self._bucket, Key=self._key, **self._extra_args)
+        self._upload_id = response['UploadId']
+
+    def _put_part(self, part_number, data):
+        response = self._client.upload_part(Bucket=self._bucket, Key=self._key, UploadId=self._upload_id,
+                                            PartNumber=part_number, Body=data)
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def _complete(self, parts):
+        self._client.complete_multipart_upload(Bucket=self._bucket, Key=self._key, UploadId=self._upload_id,
+                                               MultipartUpload={'Parts': parts})
+
+    def _abort(self):
+        self._client.abort_multipart_upload(Bucket=self._bucket, Key=self._key, UploadId=self._upload_id)
+        self._upload_id = None
+
+class AzureBlockWriter(_PartWriter):
+    def __init__(self, blob_client, overwrite: bool = True, part_size: int = DEFAULT_PART_SIZE,
+                 max_concurrency: int = DEFAULT_PART_CONCURRENCY) -> None:
+        """
+        Write only file object which uploads what is written to it as staged blocks of an Azure block blob while
+        it is being produced, and commits the block list on close. Memory is bounded as for S3MultipartWriter.
+        Blobs smaller than one block are uploaded with a single upload_blob. The uncommitted blocks of an aborted
+        upload are discarded by Azure.
+
+        Args:
+            blob_client: azure BlobClient of the blob
+            overwrite (bool, optional): overwrite an existing blob, else the commit fails if it exists. Defaults to True.
+            part_size (int, optional): size of the first blocks in bytes. Defaults to DEFAULT_PART_SIZE.
+            max_concurrency (int, optional): number of blocks uploaded concurrently. Defaults to DEFAULT_PART_CONCURRENCY.
+        """
+        super().__init__(part_size, max_concurrency)
+        self._blob_client = blob_client
+        self._overwrite = overwrite
+
+    def _put_object(self, data):
+        self._blob_client.upload_blob(data, overwrite=self._overwrite)
+
+    def _put_part(self, part_number, data):
+        # the block ids of a blob must all have the same length
+        block_id = base64.b64encode(f'{part_number:08d}'.encode()).decode()
+        self._blob_client.stage_block(block_id, data)
+        return block_id
+
+    def _complete(self, block_ids):
+        from azure.storage.blob import BlobBlock
+        from azure.core import MatchConditions
+        conditions = {} if self._overwrite else {'match_condition': MatchConditions.IfMissing}
+        self._blob_client.commit_block_list([BlobBlock(block_id) for block_id in block_ids], **conditions)
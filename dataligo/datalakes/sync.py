@@ -0,0 +1,227 @@
+import os
+import json
+import base64
+import hashlib
+import tempfile
+import threading
+from collections import namedtuple
+from functools import partial
+from .transfer import TransferJob
+
+# written to the root of the synced local folder, never uploaded
+SYNC_MANIFEST = '.dataligo-sync.json'
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# name: path relative to the synced folder, size: bytes, etag: version of the object,
+# md5: hex md5 of the content (None if unknown, like for multipart S3 ETags),
+# crc32c: base64 crc32c of the content (GCS only), mtime: last modified timestamp
+RemoteObject = namedtuple('RemoteObject', ['name', 'size', 'etag', 'md5', 'crc32c', 'mtime'])
+
+class SyncManifest():
+    def __init__(self, root: str) -> None:
+        """
+        SyncManifest records, for each file of a synced local folder, its size, mtime, content hashes and the
+        version (ETag) of the remote object it was last synced with. While the size and mtime of a file are
+        unchanged, the recorded values are trusted, so repeated syncs do not hash the local files again.
+
+        Args:
+            root (str): local folder being synced, the manifest is stored in it as SYNC_MANIFEST
+        """
+        self.root = root
+        self.path = os.path.join(root, SYNC_MANIFEST)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self._entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._entries = {}
+
+    def entry(self, name: str, stat) -> dict:
+        """
+        Returns the recorded entry of the file if it is unchanged since it was recorded, else an empty dict
+        """
+        entry = self._entries.get(name)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry
+        return {}
+
+    def record(self, name: str, local_path: str, etag: str = None, md5: str = None, crc32c: str = None) -> None:
+        stat = os.stat(local_path)
+        with self._lock:
+            self._entries[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                   'etag': etag, 'md5': md5, 'crc32c': crc32c}
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def save(self) -> None:
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+def _local_files(root):
+    """
+    Yields (local path, path relative to root with / separators) of the files under root, except the sync manifest
+    """
+    for dirpath, _, files in os.walk(root):
+        for filename in files:
+            local_path = os.path.join(dirpath, filename)
+            name = os.path.relpath(local_path, root).replace('\\', '/')
+            if name != SYNC_MANIFEST:
+                yield local_path, name
+
+def _file_md5(local_path):
+    md5 = hashlib.md5()
+    with open(local_path, 'rb') as f:
+        for chunk in iter(partial(f.read, _HASH_CHUNK_SIZE), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+def _file_crc32c(local_path):
+    try:
+        import google_crc32c
+    except ImportError:
+        return None
+    checksum = google_crc32c.Checksum()
+    with open(local_path, 'rb') as f:
+        for chunk in iter(partial(f.read, _HASH_CHUNK_SIZE), b''):
+            checksum.update(chunk)
+    return base64.b64encode(checksum.digest()).decode()
+
+def _compare(manifest, local_path, remote, direction):
+    """
+    Returns (unchanged, hashes): whether the local file has the same content as the remote object, and the
+    hashes of the local file known after the comparison.
+
+    The checks go from the cheapest to the most expensive: existence and size, the ETag recorded in the manifest,
+    the md5 or crc32c of the content (cached in the manifest), and finally, if the object has no content hash,
+    the mtimes: the transfer is needed only if the source side is newer.
+    """
+    try:
+        stat = os.stat(local_path)
+    except FileNotFoundError:
+        return False, {}
+    if stat.st_size != remote.size:
+        return False, {}
+    entry = manifest.entry(remote.name, stat)
+    if entry.get('etag') and entry['etag'] == remote.etag:
+        return True, {'md5': entry.get('md5'), 'crc32c': entry.get('crc32c')}
+    hashes = {'md5': entry.get('md5'), 'crc32c': entry.get('crc32c')}
+    if remote.crc32c and not remote.md5 and not hashes['crc32c']:
+        hashes['crc32c'] = _file_crc32c(local_path)
+    if remote.md5:
+        hashes['md5'] = hashes['md5'] or _file_md5(local_path)
+        unchanged = hashes['md5'] == remote.md5
+    elif remote.crc32c and hashes['crc32c']:
+        unchanged = hashes['crc32c'] == remote.crc32c
+    elif direction == 'download':
+        unchanged = stat.st_mtime >= remote.mtime
+    else:
+        unchanged = stat.st_mtime <= remote.mtime
+    if unchanged:
+        manifest.record(remote.name, local_path, etag=remote.etag, **hashes)
+    return unchanged, hashes
+
+def _sync_download(engine, local_root, remote_objects, download, delete=False):
+    """
+    Downloads the remote objects which differ from the files under local_root.
+
+    Args:
+        engine (TransferEngine): transfer engine of the connector
+        local_root (str): local folder
+        remote_objects (iterable): RemoteObject of the remote folder, named relative to local_root
+        download (callable): download(remote, local_path) downloads the object to local_path
+        delete (bool, optional): delete the local files which are not in remote_objects. Defaults to False.
+
+    Returns:
+        dict: transfer summary, with the number of skipped and deleted files
+    """
+    os.makedirs(local_root, exist_ok=True)
+    manifest = SyncManifest(local_root)
+    seen = set()
+    counts = {'skipped': 0, 'deleted': 0}
+    def run(remote, local_path):
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        download(remote, local_path)
+        manifest.record(remote.name, local_path, etag=remote.etag, md5=remote.md5, crc32c=remote.crc32c)
+    def jobs():
+        for remote in remote_objects:
+            seen.add(remote.name)
+            local_path = os.path.join(local_root, remote.name)
+            if _compare(manifest, local_path, remote, 'download')[0]:
+                counts['skipped'] += 1
+            else:
+                yield TransferJob(remote.name, remote.size, partial(run, remote, local_path))
+    try:
+        summary = engine.run(jobs())
+        if delete:
+            for local_path, name in list(_local_files(local_root)):
+                if name not in seen:
+                    os.remove(local_path)
+                    manifest.forget(name)
+                    counts['deleted'] += 1
+    finally:
+        manifest.save()
+    summary.update(counts)
+    return summary
+
+def _sync_upload(engine, local_root, remote_objects, upload, delete_remote=None):
+    """
+    Uploads the files under local_root which differ from the remote objects.
+
+    Args:
+        engine (TransferEngine): transfer engine of the connector
+        local_root (str): local folder
+        remote_objects (iterable): RemoteObject of the remote folder, named relative to local_root
+        upload (callable): upload(local_path, name) uploads the local file as the object of that relative name and
+                           returns the RemoteObject written, if known, whose ETag and hashes are recorded
+        delete_remote (callable, optional): delete_remote(name) deletes the remote object. If given, the remote
+                                            objects which are not in local_root are deleted. Defaults to None.
+
+    Returns:
+        dict: transfer summary, with the number of skipped and deleted files
+    """
+    if not os.path.isdir(local_root):
+        raise FileNotFoundError(f"local folder not found: {local_root}")
+    manifest = SyncManifest(local_root)
+    remotes = {remote.name: remote for remote in remote_objects}
+    seen = set()
+    counts = {'skipped': 0}
+    def run(local_path, name, hashes):
+        uploaded = upload(local_path, name)
+        if uploaded is not None:
+            # the object holds the local content, so the next sync matches it on the ETag without hashing
+            hashes = {'etag': uploaded.etag, 'md5': uploaded.md5 or hashes.get('md5'),
+                      'crc32c': uploaded.crc32c or hashes.get('crc32c')}
+        manifest.record(name, local_path, **hashes)
+    def jobs():
+        for local_path, name in _local_files(local_root):
+            seen.add(name)
+            remote = remotes.get(name)
+            if remote is not None:
+                unchanged, hashes = _compare(manifest, local_path, remote, 'upload')
+                if unchanged:
+                    counts['skipped'] += 1
+                    continue
+            else:
+                hashes = {}
+            yield TransferJob(name, os.path.getsize(local_path), partial(run, local_path, name, hashes))
+    try:
+        summary = engine.run(jobs())
+    finally:
+        manifest.save()
+    summary.update(counts)
+    summary['deleted'] = 0
+    if delete_remote is not None:
+        extra = [name for name in remotes if name not in seen]
+        if extra:
+            summary['deleted'] = engine.run(TransferJob(name, 0, partial(delete_remote, name)) for name in extra)['files']
+    return summary
@@ -0,0 +1,106 @@
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from ..exceptions import TransferFailedException
+from ..instrumentation import _run_in_context
+
+DEFAULT_TRANSFER_CONCURRENCY = 16
+DEFAULT_TRANSFER_RETRIES = 3
+
+# name: object key or local path reported in the summary, size: bytes, run: callable doing the transfer
+TransferJob = namedtuple('TransferJob', ['name', 'size', 'run'])
+
+class TransferEngine():
+    def __init__(self, max_workers: int = DEFAULT_TRANSFER_CONCURRENCY, retries: int = DEFAULT_TRANSFER_RETRIES,
+                 backoff: float = 0.5) -> None:
+        """
+        TransferEngine runs the file transfers of the folder upload / download methods on one shared thread pool,
+        so the concurrency limit applies across all the files (and all the folder calls) of a connector.
+
+        Args:
+            max_workers (int, optional): number of files transferred concurrently. Defaults to DEFAULT_TRANSFER_CONCURRENCY.
+            retries (int, optional): number of retries of a failed file transfer. Defaults to DEFAULT_TRANSFER_RETRIES.
+            backoff (float, optional): seconds to wait before the first retry, doubled on every retry. Defaults to 0.5.
+        """
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def run(self, jobs) -> dict:
+        """
+        Runs the transfer jobs and returns the throughput summary. The jobs iterable is consumed lazily, so a
+        listing can stream into the transfers.
+
+        Args:
+            jobs (iterable): TransferJob objects
+
+        Returns:
+            dict: files, bytes, retries, seconds and bytes_per_second of the transfer
+
+        Raises:
+            TransferFailedException: if some files still failed after the retries. Its summary attribute
+                                     lists them under failed.
+        """
+        executor = self._get_executor()
+        summary = {'files': 0, 'bytes': 0, 'retries': 0, 'failed': []}
+        start = time.monotonic()
+        pending = {}
+        for job in jobs:
+            pending[_run_in_context(executor, self._run_job, job)] = job
+            if len(pending) >= 2 * self.max_workers:
+                self._collect(pending, summary)
+        while pending:
+            self._collect(pending, summary)
+        summary['seconds'] = time.monotonic() - start
+        summary['bytes_per_second'] = summary['bytes'] / summary['seconds'] if summary['seconds'] else 0.0
+        if summary['failed']:
+            raise TransferFailedException(f"{len(summary['failed'])} file transfers failed", summary)
+        return summary
+
+    def close(self) -> None:
+        """
+        Shuts down the thread pool
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _run_job(self, job):
+        for attempt in range(self.retries + 1):
+            try:
+                job.run()
+                return attempt
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _collect(self, pending, summary):
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            job = pending.pop(future)
+            try:
+                summary['retries'] += future.result()
+                summary['files'] += 1
+                summary['bytes'] += job.size or 0
+            except Exception as e:
+                summary['retries'] += self.retries
+                summary['failed'].append((job.name, repr(e)))
+
+def _format_summary(summary):
+    mb = summary['bytes'] / (1024 * 1024)
+    text = (f"{summary['files']} files, {mb:.2f} MB in {summary['seconds']:.2f}s "
+            f"({mb / summary['seconds'] if summary['seconds'] else 0:.2f} MB/s, {summary['retries']} retries)")
+    if 'skipped' in summary:
+        text += f", {summary['skipped']} unchanged, {summary['deleted']} deleted"
+    return text
@@ -4,17 +4,60 @@ import pandas as pd
 from ..exceptions import ExtensionNotSupportException
 from boto3.s3.transfer import TransferConfig
 import os
-import threading
-import sys
-from ..utils import which_dataframe
+import fnmatch
+import base64
+from urllib.parse import quote
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from ..utils import which_dataframe, _to_arrow, _as_return_type, _dask, _worker_connector
+from ..instrumentation import current_operation, _message, _run_in_context
+from .streams import S3MultipartWriter, AzureBlockWriter
+from .transfer import TransferJob, _format_summary
+from .sync import RemoteObject, _local_files, _sync_download, _sync_upload
+from .spill import _local_path
+from .compression import (_split_compression, _decompress, _compress, _compression_options, _write_format,
+                          _SEEKABLE_FORMATS)
+from functools import partial
 
-multipart_config = TransferConfig(multipart_threshold=1024 * 50, 
-                        max_concurrency=8,
-                        multipart_chunksize=1024 * 10,
-                        use_threads=True)
+# default number of objects downloaded and parsed at the same time for prefix reads
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# S3 allows at most 10000 parts per multipart upload, the part size is chosen to stay well under it
+_MAX_TRANSFER_PARTS = 9000
+MIN_TRANSFER_CHUNKSIZE = 8 * 1024 * 1024
+DEFAULT_TRANSFER_MAX_CONCURRENCY = 10
+
+def _transfer_config(file_size=None, overrides={}, file_workers=1):
+    """
+    Returns the boto3 TransferConfig of an upload or download of file_size bytes. The part size is at least
+    MIN_TRANSFER_CHUNKSIZE and large enough to keep the transfer under _MAX_TRANSFER_PARTS parts, and files smaller
+    than one part are transferred in a single request, without a thread pool.
+
+    Args:
+        file_size (int, optional): size of the file in bytes. Defaults to None (unknown, the minimum part size is used).
+        overrides (dict, optional): TransferConfig arguments (multipart_threshold, multipart_chunksize, max_concurrency, ...)
+                                    taking precedence over the size based values. Defaults to {}.
+        file_workers (int, optional): number of files transferred concurrently, which share DEFAULT_TRANSFER_MAX_CONCURRENCY
+                                      part threads. Defaults to 1.
+
+    Returns:
+        TransferConfig: transfer settings
+    """
+    chunksize = MIN_TRANSFER_CHUNKSIZE
+    if file_size:
+        # rounded up to a whole MB
+        chunksize = max(chunksize, -(-file_size // _MAX_TRANSFER_PARTS // (1024 * 1024)) * 1024 * 1024)
+    parts = -(-file_size // chunksize) if file_size is not None else DEFAULT_TRANSFER_MAX_CONCURRENCY
+    max_concurrency = max(1, min(DEFAULT_TRANSFER_MAX_CONCURRENCY // max(file_workers, 1), parts))
+    settings = {'multipart_threshold': chunksize, 'multipart_chunksize': chunksize,
+                'max_concurrency': max_concurrency}
+    settings.update(overrides or {})
+    settings.setdefault('use_threads', settings['max_concurrency'] > 1)
+    return TransferConfig(**settings)
 
 def readers(return_type):
-    if return_type=='pandas':
+    # the partitions of a dask dataframe are pandas dataframes
+    if return_type in ('pandas', 'dask'):
         pd_readers = {'csv': pd.read_csv,'parquet': pd.read_parquet, 'feather': pd.read_feather, 'xlsx': pd.read_excel, 
             'xls': pd.read_excel, 'ods': pd.read_excel, 'json': pd.read_json,'txt': pd.read_csv}
         return pd_readers
@@ -23,90 +66,337 @@ def readers(return_type):
         pl_readers = {'csv': pl.read_csv,'parquet': pl.read_parquet, 'xlsx': pl.read_excel, 
             'xls': pl.read_excel, 'ods': pl.read_excel, 'json': pl.read_json,'txt': pl.read_csv, 'avro': pl.read_avro}
         return pl_readers
+    elif return_type=='arrow':
+        import pyarrow.csv as pa_csv
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+        # formats pyarrow cannot parse are read with pandas and converted
+        from_pandas = lambda reader: lambda stream, **kwargs: _to_arrow(reader(stream, **kwargs))
+        # local files are memory mapped, uncompressed feather / arrow columns then reference the mapping without a copy
+        read_parquet = partial(pq.read_table, memory_map=True)
+        read_feather = partial(feather.read_table, memory_map=True)
+        pa_readers = {'csv': pa_csv.read_csv, 'parquet': read_parquet, 'feather': read_feather, 'arrow': read_feather,
+            'xlsx': from_pandas(pd.read_excel), 'xls': from_pandas(pd.read_excel), 'ods': from_pandas(pd.read_excel),
+            'json': from_pandas(pd.read_json), 'txt': pa_csv.read_csv}
+        return pa_readers
+
+def _reader_args(return_type, pandas_args, polars_args):
+    # the pyarrow readers take their own options (read_options, parse_options, ...), which are not passed through
+    if return_type=='polars':
+        return polars_args
+    elif return_type in ('pandas', 'dask'):
+        return pandas_args
+    return {}
 
 def df_concat(dfs,return_type):
     if return_type=='pandas':     
         df = pd.concat(dfs,ignore_index=True)
         return df
     elif return_type=='polars':
+        import polars as pl
         df = pl.concat(dfs)
         return df
+    elif return_type=='arrow':
+        import pyarrow as pa
+        return pa.concat_tables(dfs, promote_options='default')
+    elif return_type=='dask':
+        return _dask()[1].concat(dfs)
+
+def _parallel_map(func, items, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Applies func to the items on a bounded thread pool and yields the results in the order of the items.
+    Items are consumed lazily, so a listing can stream straight into the workers.
+    """
+    if not max_workers or max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(_run_in_context(executor, func, item))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _iter_batches(stream, extension, batch_size, return_type, pandas_args={}):
+    """
+    Parses a file object incrementally and yields dataframes of at most batch_size rows.
+    csv and json lines are parsed row wise, parquet row group by row group.
+    """
+    if extension=='parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(stream).iter_batches(batch_size=batch_size):
+            yield _as_return_type(batch, return_type)
+        return
+    if extension in ['csv','txt']:
+        chunks = pd.read_csv(stream, chunksize=batch_size, **pandas_args)
+    elif extension=='json':
+        chunks = pd.read_json(stream, lines=True, chunksize=batch_size, **pandas_args)
+    else:
+        raise ExtensionNotSupportException(f'Unsupported Extension for batched read: {extension}')
+    with chunks:
+        for chunk in chunks:
+            yield _as_return_type(chunk, return_type)
+
+def _read_parquet_pushdown(stream, columns, filters, return_type):
+    """
+    Reads a parquet file object with column projection and row group filtering. Only the footer and
+    the column chunks of the matching row groups are read, so on a ranged file object only those
+    byte ranges are downloaded.
+    """
+    import pyarrow.parquet as pq
+    table = pq.read_table(stream, columns=columns, filters=filters)
+    return _as_return_type(table, return_type)
+
+def _dask_load_object(connector_class, config, bucket, name, extension, pandas_args, columns=None, filters=None):
+    connector = _worker_connector(connector_class, config)
+    if columns is not None or filters is not None:
+        with connector._open(bucket, name, buffer_size=0) as stream:
+            return _read_parquet_pushdown(stream, columns, filters, 'pandas')
+    _readers = readers('pandas')
+    with connector._get_object(bucket, name) as stream:
+        return _object_reader(name, _readers, _readers[extension])(stream, **pandas_args)
 
-def _multi_file_load(s3,bucket,key,reader,extension,reader_args):
-    key = key.strip('/*').strip('*').strip('/')
-    bucket = s3.Bucket(bucket)
-    pfx_objs = bucket.objects.filter(Prefix=key)
-    pfx_dfs = []
-    for obj in pfx_objs:
+def _dask_read(connector, bucket, names, extension, pandas_args, columns=None, filters=None):
+    """
+    Returns a dask dataframe with one lazy partition per object of names. A partition is downloaded and parsed
+    by a connector created from the config on the worker, so the graph can run on a distributed cluster.
+    The config is one node of the graph, shared by the partitions.
+    """
+    dask, dd = _dask()
+    load = dask.delayed(_dask_load_object, pure=True)
+    config = dask.delayed(connector._config, pure=True)
+    parts = [load(type(connector), config, bucket, name, extension, pandas_args, columns, filters)
+             for name in names]
+    return dd.from_delayed(parts)
+
+def _is_multi_file(key):
+    return key.endswith('/') or any(char in key for char in '*?[')
+
+def _split_glob(key):
+    """
+    Splits a key like `folder/dt=2024-*/*.parquet` into the literal prefix used for the server side
+    listing (`folder/dt=2024-`) and the glob pattern applied on the listed names.
+    The pattern is None if the key has no glob characters.
+    """
+    positions = [key.find(char) for char in '*?[' if char in key]
+    if not positions:
+        return key, None
+    return key[:min(positions)], key
+
+def _match_names(names, key):
+    """
+    Filters a (lazily paginated) listing of object names with the glob pattern of the key.
+    """
+    prefix, pattern = _split_glob(key)
+    for name in names:
+        if name.endswith('/') or not name.startswith(prefix):
+            continue
+        if pattern is None or fnmatch.fnmatchcase(name, pattern):
+            yield name
+
+def _object_reader(name, _readers, default_reader):
+    """
+    Returns the reader of the object, chosen from the suffix of its name. Objects with a compression suffix
+    (events.csv.gz) are decompressed as they are parsed, uncompressed objects staged on local disk (spilled
+    or cached) are parsed from their path.
+    """
+    base, compression = _split_compression(name)
+    reader = _readers.get(Path(base).suffix[1:], default_reader)
+    if compression is None:
+        return lambda stream, **reader_args: reader(_local_path(stream) or stream, **reader_args)
+    seekable = any(_readers.get(extension) is reader for extension in _SEEKABLE_FORMATS)
+    return lambda stream, **reader_args: reader(_decompress(stream, compression, seekable), **reader_args)
+
+def _read_extension(name, extension):
+    """
+    Returns the format extension of the object name, ignoring its compression suffix, or extension if it has none
+    """
+    suffix = Path(_split_compression(name)[0]).suffix
+    # a glob pattern like *.csv.* leaves the format to the suffix of each object
+    return suffix[1:] if suffix and not any(char in suffix for char in '*?[') else extension
+
+def _multi_file_load(get_object,names,reader,reader_args,max_workers=DEFAULT_MAX_WORKERS,_readers={}):
+    """
+    Downloads and parses the objects on a thread pool. get_object(name) returns a file object of the object.
+    """
+    def load(name):
+        with get_object(name) as stream:
+            return _object_reader(name, _readers, reader)(stream, **reader_args)
+    return list(_parallel_map(load, names, max_workers))
+
+# hive's directory name for null partition values
+HIVE_NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+def _split_partitions(df, partition_cols, max_rows_per_file):
+    """
+    Splits the dataframe by the distinct values of partition_cols (vectorized group by) and each partition
+    into slices of at most max_rows_per_file rows. The partition columns are dropped from the slices, as they
+    are encoded in the hive style path. Yields (partition values dict, file index, dataframe).
+    """
+    if which_dataframe(df)=='arrow_stream':
+        df = _to_arrow(df)
+    if not partition_cols:
+        groups = [((), df)]
+    elif which_dataframe(df)=='arrow':
+        groups = _arrow_groups(_to_arrow(df), partition_cols)
+    elif which_dataframe(df)=='polars':
+        groups = df.partition_by(partition_cols, as_dict=True, include_key=False).items()
+    else:
+        groups = ((values, part.drop(columns=partition_cols))
+                  for values, part in df.groupby(partition_cols, sort=False, observed=True, dropna=False))
+    for values, part in groups:
+        if not isinstance(values, tuple):
+            values = (values,)
+        partition = dict(zip(partition_cols or [], values))
+        step = max_rows_per_file or max(len(part), 1)
+        for index, start in enumerate(range(0, max(len(part), 1), step)):
+            if which_dataframe(part) in ('polars', 'arrow'):
+                yield partition, index, part.slice(start, step)
+            else:
+                yield partition, index, part.iloc[start:start + step]
+
+def _arrow_groups(table, partition_cols):
+    # one hash aggregation collects the row indices of every partition, which are then taken in one pass each
+    import pyarrow as pa
+    indices = table.append_column('__row', pa.array(range(len(table)), pa.int64()))
+    grouped = indices.group_by(partition_cols, use_threads=False).aggregate([('__row', 'list')])
+    data = table.drop_columns(partition_cols)
+    for values, rows in zip(grouped.select(partition_cols).to_pylist(), grouped['__row_list'].to_pylist()):
+        yield tuple(values[col] for col in partition_cols), data.take(rows)
+
+def _partition_dir(partition):
+    dirs = []
+    for col, value in partition.items():
+        value = HIVE_NULL_PARTITION if value is None or value != value else quote(str(value), safe='')
+        dirs.append(f"{col}={value}")
+    return '/'.join(dirs)
+
+def _partitioned_write(write, df, base_key, extension, partition_cols=None, max_rows_per_file=None,
+                       max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Writes the dataframe as a hive partitioned dataset (base_key/col=value/part-00000.extension).
+    The files are encoded and uploaded concurrently, write(df, key) writes a single file.
+
+    Returns:
+        list: manifest of the written files, each a dict with key, partition and rows
+    """
+    def write_file(piece):
+        partition, index, part = piece
+        key = '/'.join(path for path in [base_key.rstrip('/'), _partition_dir(partition), f"part-{index:05d}.{extension}"] if path)
+        write(part, key)
+        return {'key': key, 'partition': partition, 'rows': len(part)}
+    return list(_parallel_map(write_file, _split_partitions(df, partition_cols, max_rows_per_file), max_workers))
+
+def _s3_remote_object(key, size, e_tag, last_modified):
+    etag = e_tag.strip('"')
+    # the ETag of a multipart upload is not the md5 of the content
+    return RemoteObject(key, size, etag, None if '-' in etag else etag, None, last_modified.timestamp())
+
+def _s3_remote_objects(s3, bucket, prefix):
+    for obj in s3.Bucket(bucket).objects.filter(Prefix=prefix):
         if obj.key.endswith('/'):
             continue
-        body = BytesIO(obj.get()['Body'].read())
-        df = reader(body, **reader_args)
-        pfx_dfs.append(df)
-    return pfx_dfs
+        yield _s3_remote_object(obj.key, obj.size, obj.e_tag, obj.last_modified)
+
+def _gcs_remote_object(blob):
+    # composite objects have no md5, only a crc32c
+    md5 = base64.b64decode(blob.md5_hash).hex() if blob.md5_hash else None
+    return RemoteObject(blob.name, blob.size, blob.etag, md5, blob.crc32c, blob.updated.timestamp())
 
-def _s3_upload_folder(s3, local_folder_path, bucket, key):
+def _s3_upload_object(client, local_path, bucket, key, config):
+    client.upload_file(local_path, bucket, key, Config=config)
+    # upload_file does not return the ETag of the object
+    head = client.head_object(Bucket=bucket, Key=key)
+    return _s3_remote_object(key, head['ContentLength'], head['ETag'], head['LastModified'])
+
+def _s3_upload_folder(s3, local_folder_path, bucket, key, engine, sync=False, delete=False, transfer_config={}):
     key = key.rstrip('/')+'/'+Path(local_folder_path).stem
-    for root, _ , files in os.walk(local_folder_path):
-        for filename in files:
-            local_path = os.path.join(root, filename)
-            relative_path = os.path.relpath(local_path, local_folder_path)
-            relative_path = relative_path.replace("\\", "/")
-            s3_path = os.path.join(key, relative_path)
-            s3.Object(bucket, s3_path).upload_file(local_path,
-                            Config=multipart_config
-                            )
+    client = s3.meta.client
+    if sync:
+        prefix = key + '/'
+        remote_objects = (obj._replace(name=obj.name[len(prefix):]) for obj in _s3_remote_objects(s3, bucket, prefix))
+        upload = lambda local_path, name: _s3_upload_object(client, local_path, bucket, prefix + name,
+                                                            _transfer_config(os.path.getsize(local_path), transfer_config,
+                                                                             engine.max_workers))
+        delete_remote = (lambda name: client.delete_object(Bucket=bucket, Key=prefix + name)) if delete else None
+        return _sync_upload(engine, local_folder_path, remote_objects, upload, delete_remote)
+    def jobs():
+        for local_path, relative_path in _local_files(local_folder_path):
+            s3_path = f"{key}/{relative_path}"
+            size = os.path.getsize(local_path)
+            yield TransferJob(s3_path, size,
+                              partial(client.upload_file, local_path, bucket, s3_path,
+                                      Config=_transfer_config(size, transfer_config, engine.max_workers)))
+    return engine.run(jobs())
 
-def _s3_download_folder(s3,s3_path, bucket, key, local_path_to_download='.'):
+def _s3_download_folder(s3,s3_path, bucket, key, engine, local_path_to_download='.', sync=False, delete=False, transfer_config={}):
     if s3_path:
         bucket, key =  s3_path.split('/',3)[2:]
-    my_bucket = s3.Bucket(bucket)
+    client = s3.meta.client
     folder_to_download = Path(key).stem
     local_path = os.path.join(local_path_to_download, folder_to_download)
-    os.makedirs(local_path)
-    for obj in my_bucket.objects.filter(Prefix=key):
-        key = obj.key
-        if key.endswith('/'):
-            os.makedirs(os.path.join(local_path,key))
-        else:
-            s3.Object(bucket, key).download_file(os.path.join(local_path,key),Config=multipart_config)
-    print("Folder downloaded to the path:", f"{local_path}")
+    if sync:
+        download = lambda obj, file_path: client.download_file(bucket, obj.name, file_path,
+                                                               Config=_transfer_config(obj.size, transfer_config, engine.max_workers))
+        summary = _sync_download(engine, local_path, _s3_remote_objects(s3, bucket, key), download, delete)
+    else:
+        os.makedirs(local_path, exist_ok=True)
+        def download(obj_key, size, file_path):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            client.download_file(bucket, obj_key, file_path, Config=_transfer_config(size, transfer_config, engine.max_workers))
+        def jobs():
+            for obj in s3.Bucket(bucket).objects.filter(Prefix=key):
+                if obj.key.endswith('/'):
+                    os.makedirs(os.path.join(local_path,obj.key), exist_ok=True)
+                else:
+                    yield TransferJob(obj.key, obj.size, partial(download, obj.key, obj.size, os.path.join(local_path,obj.key)))
+        summary = engine.run(jobs())
+    _message("Folder downloaded to the path:", f"{local_path}", f"({_format_summary(summary)})")
+    return summary
 
 # source: https://medium.com/analytics-vidhya/aws-s3-multipart-upload-download-using-boto3-python-sdk-2dedb0945f11
 # source: https://boto3.amazonaws.com/v1/documentation/api/latest/_modules/boto3/s3/transfer.html
-def _s3_upload_file(s3, file_path, bucket, key):
+def _s3_upload_file(s3, file_path, bucket, key, transfer_config={}):
     suffix = Path(file_path).suffix
     if suffix:
         extension=suffix[1:]
     s3.Object(bucket, key).upload_file(file_path,
                             ExtraArgs={'ContentType': f'text/{extension}'},
-                            Config=multipart_config,
-                            Callback=ProgressPercentage(file_path)
+                            Config=_transfer_config(os.path.getsize(file_path), transfer_config),
+                            Callback=current_operation().add_bytes
                             )
-    print('\n')
 
  # source: https://medium.com/analytics-vidhya/aws-s3-multipart-upload-download-using-boto3-python-sdk-2dedb0945f11
  # source: https://boto3.amazonaws.com/v1/documentation/api/latest/_modules/boto3/s3/transfer.html
-def _s3_download_file(s3, s3_path=None, bucket=None, key=None, path_to_download='.'):
+def _s3_download_file(s3, s3_path=None, bucket=None, key=None, path_to_download='.', transfer_config={}):
     if s3_path:
         bucket, key =  s3_path.split('/',3)[2:]
         filename = key.split('/')[-1]
     else:
         filename = key.split('/')[-1]
     file_path = os.path.join(path_to_download,filename)
-    s3.Object(bucket, key).download_file(file_path,
-                            Config=multipart_config,
-                            Callback=ProgressPercentage(file_path)
+    obj = s3.Object(bucket, key)
+    obj.download_file(file_path,
+                            Config=_transfer_config(obj.content_length, transfer_config),
+                            Callback=current_operation().add_bytes
                             )
-    print('\n')
-    print("File downloaded to the path:", f"{file_path}")
+    _message("File downloaded to the path:", f"{file_path}")
 
-def _s3_writer(s3, df, bucket, filename, extension, pandas_args = {}, polars_args = {}):
-    buf = BytesIO()
-    suffix = Path(filename).suffix
-    if suffix:
-        extension = suffix[1:]
-    extension = extension.lower()
+def _write_dataframe_to(buf, df, extension, pandas_args = {}, polars_args = {}, compression = None):
+    """
+    Encodes the dataframe in the format of the extension and writes it to the binary file object buf.
+    compression is the codec of the internally compressed formats (parquet, feather, avro).
+    """
+    arrow_args = {}
+    if compression is not None:
+        method, options = _compression_options(compression)
+        level = {'compression_level': options['level']} if 'level' in options else {}
+        arrow_args = {'compression': method, **level}
+        pandas_args = {**pandas_args, 'compression': method, **level}
+        polars_args = {**polars_args, 'compression': method, **(level if extension=='parquet' else {})}
     if which_dataframe(df)=='pandas':
         if extension=='csv':
             df.to_csv(buf, **pandas_args)
@@ -135,104 +425,55 @@ def _s3_writer(s3, df, bucket, filename, extension, pandas_args = {}, polars_arg
             df.write_excel(buf, **polars_args)
         else:
             raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
-    buf.seek(0)
-    s3.Bucket(bucket).put_object(Key=filename, Body=buf.getvalue())
-    
-def _gcs_writer(gcs, df, bucket, filename, extension, pandas_args = {}, polars_args = {}):
-    buf = BytesIO()
-    suffix = Path(filename).suffix
-    if suffix:
-        extension = suffix[1:]
-    bucket = gcs.get_bucket(bucket)
-    extension = extension.lower()
-    if which_dataframe(df)=='pandas':
-        if extension=='csv':
-            bucket.blob(filename).upload_from_string(df.to_csv(**pandas_args), 'text/csv')
-        elif extension=='parquet':
-            bucket.blob(filename).upload_from_string(df.to_parquet(**pandas_args), 'text/parquet')
-        elif extension=='json':
-            bucket.blob(filename).upload_from_string(df.to_json(**pandas_args), 'text/json')
-        # elif extension=='feather':
-        #     bucket.blob(filename).upload_from_string(df.to_feather(), 'text/feather')
-        # elif extension in ['xlsx','xls']:
-        #     bucket.blob(filename).upload_from_string(df.to_excel(), 'text/xlsx')
-        else:
-            raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
-    elif which_dataframe(df)=='polars':
+    elif which_dataframe(df) in ('arrow', 'arrow_stream'):
+        # pyarrow writes csv, parquet and feather from the arrow buffers, the other formats go through pandas
         if extension=='csv':
-            bucket.blob(filename).upload_from_string(df.write_csv(**polars_args), 'text/csv')
+            import pyarrow.csv as pa_csv
+            pa_csv.write_csv(_to_arrow(df), buf)
         elif extension=='parquet':
-            df.write_parquet(buf, **polars_args)
-            buf.seek(0)
-            bucket.blob(filename).upload_from_file(buf)
-        elif extension=='json':
-            bucket.blob(filename).upload_from_string(df.write_json(**polars_args), 'text/json')
-        elif extension=='avro':
-            df.write_avro(buf, **polars_args)
-            buf.seek(0)
-            bucket.blob(filename).upload_from_file(buf)
-        # elif extension in ['feather','arrow']:
-        #     df.write_ipc(buf, **polars_args)
-        elif extension in ['xlsx','xls']:
-            bucket.blob(filename).upload_from_string(df.write_excel(**polars_args), 'text/excel')
-        else:
-            raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
-
-def _azure_blob_writer(abs, df, container_name,blob_name, extension, overwrite=True, pandas_args = {}, polars_args = {}):
-    suffix = Path(blob_name).suffix
-    if suffix:
-        extension = suffix[1:]
-    container_client = abs.get_container_client(container_name)
-    blob_client = container_client.get_blob_client(blob_name)
-    buf = BytesIO()
-    if which_dataframe(df) == 'pandas':
-        if extension=='csv':
-            df.to_csv(buf, **pandas_args)
-        elif extension=='json':
-            df.to_json(buf, **pandas_args)
-        elif extension=='parquet':
-            df.to_parquet(buf, **pandas_args)
-        elif extension=='feather':
-            df.to_feather(buf, **pandas_args)
-        elif extension in ['xlsx','xls']:
-            df.to_excel(buf, **pandas_args)
-        else:
-            raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
-    elif which_dataframe(df)=='polars':
-        if extension=='csv':
-            df.write_csv(buf, **polars_args)
-        elif extension=='parquet':
-            df.write_parquet(buf, **polars_args)
-        elif extension=='avro':
-            df.write_avro(buf, **polars_args)
-        elif extension=='json':
-            df.write_json(buf, **polars_args)
+            import pyarrow.parquet as pq
+            pq.write_table(_to_arrow(df), buf, **arrow_args)
         elif extension in ['feather','arrow']:
-            df.write_ipc(buf, **polars_args)
-        elif extension in ['xlsx','xls']:
-            df.write_excel(buf, **polars_args)
+            import pyarrow.feather as feather
+            feather.write_feather(_to_arrow(df), buf, **arrow_args)
+        elif extension in ['json','xlsx','xls']:
+            _write_dataframe_to(buf, _to_arrow(df).to_pandas(), extension, pandas_args, polars_args)
         else:
             raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
-    buf.seek(0)
-    blob_client.upload_blob(buf.getvalue(), overwrite=overwrite)
 
-# source: https://medium.com/analytics-vidhya/aws-s3-multipart-upload-download-using-boto3-python-sdk-2dedb0945f11
-# source: https://boto3.amazonaws.com/v1/documentation/api/latest/_modules/boto3/s3/transfer.html
-class ProgressPercentage(object):
-    def __init__(self, filename):
-        self._filename = filename
-        self._size = float(os.path.getsize(filename))
-        self._seen_so_far = 0
-        self._lock = threading.Lock()
-
-    def __call__(self, bytes_amount):
-        # To simplify we'll assume this is hooked up
-        # to a single filename.
-        with self._lock:
-            self._seen_so_far += bytes_amount
-            percentage = (self._seen_so_far / self._size) * 100
-            sys.stdout.write(
-                "\r%s  %s / %s  (%.2f%%)" % (
-                    self._filename, self._seen_so_far, self._size,
-                    percentage))
-            sys.stdout.flush()
\ No newline at end of file
+def _encode_dataframe(buf, df, name, extension, pandas_args = {}, polars_args = {}, compression = None):
+    """
+    Writes the dataframe to the binary file object buf in the format of the name suffix (or extension),
+    compressed as the compression suffix of the name (or the compression argument) says. The stream
+    compression is applied as the encoder writes, without buffering the uncompressed output.
+    """
+    extension, stream_compression, format_compression = _write_format(name, extension, compression)
+    out = _compress(buf, stream_compression) if stream_compression else buf
+    if extension in ['xlsx','xls']:
+        # excel writers need a seekable buffer
+        excel = BytesIO()
+        _write_dataframe_to(excel, df, extension, pandas_args, polars_args)
+        out.write(excel.getbuffer())
+    else:
+        _write_dataframe_to(out, df, extension, pandas_args, polars_args, format_compression)
+    if out is not buf:
+        out.close()
+
+def _s3_writer(s3, df, bucket, filename, extension, pandas_args = {}, polars_args = {}, compression = None):
+    # the encoded output is streamed into multipart upload parts instead of being buffered whole
+    with S3MultipartWriter(s3.meta.client, bucket, filename) as writer:
+        _encode_dataframe(writer, df, filename, extension, pandas_args, polars_args, compression)
+        current_operation().add_bytes(writer.tell())
+    
+def _gcs_writer(gcs, df, bucket, filename, extension, pandas_args = {}, polars_args = {}, compression = None):
+    # the encoded output is streamed as the chunks of a resumable upload, which is cancelled on an exception
+    with gcs.bucket(bucket).blob(filename).open('wb', ignore_flush=True) as writer:
+        _encode_dataframe(writer, df, filename, extension, pandas_args, polars_args, compression)
+        current_operation().add_bytes(writer.tell())
+
+def _azure_blob_writer(abs, df, container_name,blob_name, extension, overwrite=True, pandas_args = {}, polars_args = {}, compression = None):
+    # the encoded output is streamed into staged blocks instead of being buffered whole
+    blob_client = abs.get_container_client(container_name).get_blob_client(blob_name)
+    with AzureBlockWriter(blob_client, overwrite) as writer:
+        _encode_dataframe(writer, df, blob_name, extension, pandas_args, polars_args, compression)
+        current_operation().add_bytes(writer.tell())
@@ -1,12 +1,12 @@
 import connectorx as cx
-from .utils import _df_to_file_writer, _snowflake_connector, _snowflake_executer
+from .utils import (_df_to_file_writer, _snowflake_connector, _snowflake_executer, _snowflake_write_arrow,
+                    _redshift_copy, _starrocks_stream_load, _BIGQUERY_WRITE_DISPOSITIONS)
+from ..databases.utils import _arrow_input, _backquote, _mysql_prepare_table, _mysql_swap_table
 from ..databases.database import DBCX
-from ..exceptions import ParamsMissingException, UnSupportedDataFrameException
 import pandas as pd
-from sqlalchemy import create_engine
-from snowflake.connector.pandas_tools import write_pandas
-from google.oauth2 import service_account
-from ..utils import which_dataframe
+from io import BytesIO
+from ..utils import which_dataframe, _to_pandas, _to_arrow, _rebatch, _as_return_type
+from ..instrumentation import instrumented, _message
 
 class SnowFlake():
     def __init__(self, config):
@@ -18,6 +18,7 @@ class SnowFlake():
         """
         self._config = config
         
+    @instrumented('database')
     def read_as_dataframe(self,query: str,database: str = None,schema: str = None,protocol: str ='https',return_type: str ='pandas'):
         """
         Takes query as arguments and return dataframe
@@ -27,7 +28,7 @@ class SnowFlake():
             database (str, optional): database name, if None, it take it from config. Defaults to None.
             schema (str, optional): schema name, if None, it take it from config. Defaults to None.
             protocol (str, optional): protocol Defaults to 'https'.
-            return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
 
         Returns:
             DataFrame: Depends on the return_type parameter.
@@ -37,6 +38,34 @@ class SnowFlake():
         sf_conn.close()
         return df
     
+    @instrumented('database')
+    def iter_batches(self, query: str, database: str = None, schema: str = None, protocol: str = 'https',
+                     batch_size: int = 100000, return_type: str = 'pandas'):
+        """
+        Takes query as argument and yields dataframes of batch_size rows. The result chunks are fetched one at a time
+        as arrow batches, so the memory used is bounded by the batch size instead of the result size.
+
+        Args:
+            query (str): select query
+            database (str, optional): database name, if None, it take it from config. Defaults to None.
+            schema (str, optional): schema name, if None, it take it from config. Defaults to None.
+            protocol (str, optional): protocol Defaults to 'https'.
+            batch_size (int, optional): number of rows per dataframe. Defaults to 100000.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow). Defaults to 'pandas'.
+
+        Yields:
+            DataFrame: Depends on the return_type parameter.
+        """
+        sf_conn = _snowflake_connector(self._config, database=database, schema=schema, protocol=protocol)
+        try:
+            cur = sf_conn.cursor()
+            cur.execute(query)
+            for table in _rebatch(cur.fetch_arrow_batches(), batch_size):
+                yield _as_return_type(table, return_type)
+        finally:
+            sf_conn.close()
+
+    @instrumented('filename')
     def download_as_file(self, query: str, filename: str, database: str = None, schema: str = None, protocol: str = 'https') -> None:
         """
         Takes query, filename as arguments and download the data as file
@@ -48,14 +77,16 @@ class SnowFlake():
             schema (str, optional): schema name, if None, it take it from config. Defaults to None.
         """
         sf_conn = _snowflake_connector(self._config, database=database, schema=schema, protocol=protocol)
-        df = _snowflake_executer(sf_conn, query, return_type='pandas')
+        df = _snowflake_executer(sf_conn, query, return_type='arrow')
         _df_to_file_writer(df,filename)
-        print('File saved to the path:', filename)
+        _message('File saved to the path:', filename)
 
     # source: https://docs.snowflake.com/en/developer-guide/python-connector/python-connector-api#write_pandas
+    @instrumented('table_name')
     def write_dataframe(self,df,table_name: str, database: str = None, schema: str = None, protocol: str = 'https'):
         """
-        Takes dataframe, table name as arguments and write the dataframe to SnowFlake
+        Takes dataframe, table name as arguments and write the dataframe to SnowFlake.
+        Polars and arrow frames are loaded as parquet without being converted to pandas.
 
         Args:
             df (Dataframe): Dataframe which need to be loaded
@@ -64,14 +95,13 @@ class SnowFlake():
             schema (str, optional): schema name. Defaults to None.
             protocol (str, optional): protocol used. Defaults to 'https'.
         """
+        from snowflake.connector.pandas_tools import write_pandas
         sf_conn = _snowflake_connector(self._config, database=database, schema=schema, protocol=protocol)
         if which_dataframe(df)=='pandas':
             success, nchunks, nrows, _ = write_pandas(sf_conn, df, table_name)
-        elif which_dataframe(df)=='polars':
-            success, nchunks, nrows, _ = write_pandas(sf_conn, df.to_pandas(), table_name)
         else:
-            raise UnSupportedDataFrameException(f"Unsupported Dataframe: {which_dataframe(df)}")
-        print("Dataframe saved to the snowflake table:", f"{table_name}")
+            _snowflake_write_arrow(sf_conn, _to_arrow(df), table_name)
+        _message("Dataframe saved to the snowflake table:", f"{table_name}")
         
 
 class BigQuery():
@@ -85,19 +115,46 @@ class BigQuery():
         self._config = config
         self._bq_conn = 'bigquery://' + config['GOOGLE_APPLICATION_CREDENTIALS_PATH']
 
+    @instrumented()
     def read_as_dataframe(self, query: str,return_type: str ='pandas'):
         """
         Takes query as the arguments and return the dataframe
 
         Args:
             query (str): select query
-            return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask etc). Defaults to 'pandas'. Defaults to 'pandas'.
 
         Returns:
             DataFrame: Depends on the return_type parameter.
         """
         return cx.read_sql(self._bq_conn, query,return_type=return_type)
     
+    @instrumented()
+    def iter_batches(self, query: str, batch_size: int = 100000, return_type: str ='pandas'):
+        """
+        Takes query as argument and yields dataframes of batch_size rows. The result is fetched page by page
+        (through the BigQuery Storage API when it is installed), so the memory used is bounded by the batch size.
+
+        Args:
+            query (str): select query
+            batch_size (int, optional): number of rows per dataframe. Defaults to 100000.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow). Defaults to 'pandas'.
+
+        Yields:
+            DataFrame: Depends on the return_type parameter.
+        """
+        from google.cloud import bigquery
+        from google.oauth2 import service_account
+        credentials = service_account.Credentials.from_service_account_file(self._config['GOOGLE_APPLICATION_CREDENTIALS_PATH'])
+        client = bigquery.Client(project=credentials.project_id, credentials=credentials)
+        try:
+            pages = client.query(query).result(page_size=batch_size).to_arrow_iterable()
+            for table in _rebatch(pages, batch_size):
+                yield _as_return_type(table, return_type)
+        finally:
+            client.close()
+
+    @instrumented('filename')
     def download_as_file(self, query: str, filename: str) -> None:
         """
         Takes query, filename as arguments and download the data as file
@@ -106,13 +163,15 @@ class BigQuery():
             query (str): select query
             filename (str): filename to save the file
         """
-        df = cx.read_sql(self._bq_conn, query,return_type='pandas')
+        df = cx.read_sql(self._bq_conn, query,return_type='arrow')
         _df_to_file_writer(df,filename)
-        print('File saved to the path:', filename)
+        _message('File saved to the path:', filename)
 
+    @instrumented('table_name')
     def write_dataframe(self, df, table_name: str, project_id: str, if_exists: str = 'append') -> None:
         """
-        Takes dataframe, table name, project id as arguments and write the dataframe to BigQuery
+        Takes dataframe, table name, project id as arguments and write the dataframe to BigQuery.
+        Polars and arrow frames are loaded as parquet with a load job, without being converted to pandas.
 
         Args:
             df (DataFrame): Dataframe which need to be loaded
@@ -120,29 +179,60 @@ class BigQuery():
             project_id (str): project id
             if_exists (str, optional): operation to do if the table exists. Defaults to 'append'.
         """
+        from google.oauth2 import service_account
         credentials = service_account.Credentials.from_service_account_file(self._config['GOOGLE_APPLICATION_CREDENTIALS_PATH'])
         if which_dataframe(df)=='pandas': 
             df.to_gbq(destination_table=table_name, project_id=project_id, if_exists=if_exists, credentials=credentials)
-        elif which_dataframe(df)=='polars':
-            df.to_pandas().to_gbq(destination_table=table_name, project_id=project_id, if_exists=if_exists, credentials=credentials)
         else:
-            raise UnSupportedDataFrameException(f"Unsupported Dataframe: {which_dataframe(df)}")
-        print("Dataframe saved to the table:", f"{table_name}")
+            from google.cloud import bigquery
+            import pyarrow.parquet as pq
+            buf = BytesIO()
+            pq.write_table(_to_arrow(df), buf)
+            buf.seek(0)
+            client = bigquery.Client(project=project_id, credentials=credentials)
+            job_config = bigquery.LoadJobConfig(source_format=bigquery.SourceFormat.PARQUET,
+                                                write_disposition=_BIGQUERY_WRITE_DISPOSITIONS[if_exists])
+            client.load_table_from_file(buf, table_name, job_config=job_config).result()
+        _message("Dataframe saved to the table:", f"{table_name}")
 
     
 class Redshift(DBCX):
     def __init__(self, config) -> None:
         """
         Redshift class create the ligo redshift object, through which you can able to read, write, download data from Redshift.
+        With COPY_STAGING_PATH (s3://bucket/prefix) and COPY_IAM_ROLE in the config, dataframes are written with COPY
+        from parquet parts staged in s3, read with the AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY of the config if set.
 
         Args:
             config (dict): Automatically loaded from the config file (yaml)
         """
         super().__init__(config,'redshift')
+        self._config = config
+        self._s3_client = None
+
+    def close(self) -> None:
+        """
+        Disposes the sqlalchemy engines of the writes and closes the s3 client of the staging path
+        """
+        super().close()
+        if self._s3_client is not None:
+            self._s3_client.close()
+            self._s3_client = None
+
+    def _staging_client(self):
+        if self._s3_client is None:
+            import boto3
+            self._s3_client = boto3.client('s3', aws_access_key_id=self._config.get('AWS_ACCESS_KEY_ID'),
+                                           aws_secret_access_key=self._config.get('AWS_SECRET_ACCESS_KEY'))
+        return self._s3_client
     
-    def write_dataframe(self, df,  table_name: str, database: str = None, if_exists: str = 'append',index=False):
+    @instrumented('table_name')
+    def write_dataframe(self, df,  table_name: str, database: str = None, if_exists: str = 'append',index=False,
+                        parallel: int = 4):
         """
-        Takes dataframe, table name as arguments and write the dataframe to Redshift
+        Takes dataframe, table name as arguments and write the dataframe to Redshift. Redshift has no COPY FROM STDIN,
+        with a staging path in the config the dataframe is staged as parquet in s3 and loaded with COPY, otherwise
+        it is inserted with pandas to_sql.
 
         Args:
             df (DataFrame): Dataframe which need to be loaded
@@ -150,22 +240,16 @@ class Redshift(DBCX):
             database (str, optional): database name. Defaults to None.
             if_exists (str, optional): operation to do if the table exists. Defaults to 'append'.
             index (bool, optional): Write DataFrame index as a column. Defaults to False.
+            parallel (int, optional): number of parquet parts uploaded concurrently to the staging path. Defaults to 4.
         """
-        conn_str = self._conn_str.replace('redshift','postgresql')
-        if self._dbname_in_config:
-            engine = create_engine(conn_str)
-        elif database:
-            engine = create_engine(f"{conn_str}/{database}")
+        engine = self._engines.get(self._get_conn_str(database).replace('redshift','postgresql', 1))
+        if self._config.get('COPY_STAGING_PATH') and self._config.get('COPY_IAM_ROLE'):
+            _redshift_copy(engine, self._staging_client(), df, table_name, self._config['COPY_STAGING_PATH'],
+                           self._config['COPY_IAM_ROLE'], if_exists=if_exists, index=index, parallel=parallel)
         else:
-            raise ParamsMissingException(f"database parameter missing. Either add it in config file or pass it as an argument.")
-
-        if which_dataframe(df)=='pandas':
-            df.to_sql(table_name,engine,if_exists=if_exists,index=index)
-        elif which_dataframe(df)=='polars':
-            df.to_pandas().to_sql(table_name,engine,if_exists=if_exists,index=index)
-        else:
-            raise UnSupportedDataFrameException(f"Unsupported Dataframe: {which_dataframe(df)}")
-        print("Dataframe saved to the table:", f"{table_name}")
+            # to_sql binds the rows from pandas, polars and arrow input is converted
+            _to_pandas(df).to_sql(table_name,engine,if_exists=if_exists,index=index)
+        _message("Dataframe saved to the table:", f"{table_name}")
         
 class StarRocks(DBCX):
     """
@@ -175,4 +259,51 @@ class StarRocks(DBCX):
         config (dict): Automatically loaded from the config file (yaml)
     """
     def __init__(self, config) -> None:
-        super().__init__(config,'mysql')
\ No newline at end of file
+        super().__init__(config,'mysql')
+        self._config = config
+
+    @instrumented('table_name')
+    def write_dataframe(self, df,  table_name: str, database: str = None, if_exists: str = 'append',index=False,
+                        bulk: bool = False, parallel: int = 4, chunk_rows: int = 500000):
+        """
+        Takes dataframe, table name as arguments and write the dataframe to StarRocks. With bulk, the rows are loaded
+        with Stream Load over the http port of the frontend (HTTP_PORT in config, 8030 by default) in chunks of
+        chunk_rows rows, parallel chunks at a time. Each chunk is a load transaction with its own label, retried
+        with the same label on transient failures, so a chunk is never loaded twice, but a failed write can leave
+        the chunks loaded before the failure. A replaced table is loaded as a staging table, swapped in with
+        ALTER TABLE SWAP WITH once all the chunks are loaded.
+
+        Args:
+            df (DataFrame): Dataframe which need to be loaded
+            table_name (str): table name
+            database (str, optional): database name. Defaults to None.
+            if_exists (str, optional): operation to do if the table exists. Defaults to 'append'.
+            index (bool, optional): Write DataFrame index as a column. Defaults to False.
+            bulk (bool, optional): load with Stream Load instead of INSERT batches. Defaults to False.
+            parallel (int, optional): number of chunks loaded concurrently. Defaults to 4.
+            chunk_rows (int, optional): rows per load transaction. Defaults to 500000.
+        """
+        engine = self._engines.get(self._get_conn_str(database))
+        if bulk:
+            schema, data = _arrow_input(df, index)
+            conn = engine.raw_connection()
+            try:
+                cur = conn.cursor()
+                target = _mysql_prepare_table(engine, cur, table_name, schema, if_exists, starrocks=True)
+                try:
+                    database = self._config['DATABASE'] if self._dbname_in_config else database
+                    url = f"http://{self._config['HOST']}:{self._config.get('HTTP_PORT', 8030)}/api/{database}/{target}/_stream_load"
+                    _starrocks_stream_load(url, self._config['USERNAME'], self._config['PASSWORD'], data, parallel=parallel,
+                                           chunk_rows=chunk_rows)
+                    if target!=table_name:
+                        _mysql_swap_table(cur, table_name, target, starrocks=True)
+                except BaseException:
+                    if target!=table_name:
+                        cur.execute(f"DROP TABLE IF EXISTS {_backquote(target)}")
+                    raise
+            finally:
+                conn.close()
+        else:
+            # to_sql binds the rows from pandas, polars and arrow input is converted
+            _to_pandas(df).to_sql(table_name,engine,if_exists=if_exists,index=index)
+        _message("Dataframe saved to the table:", f"{table_name}")
@@ -1,9 +1,16 @@
+import os
+import uuid
+import tempfile
 import pandas as pd
 from pathlib import Path
-from snowflake import connector
-from ..exceptions import ExtensionNotSupportException
+from ..exceptions import ExtensionNotSupportException, StreamLoadException
+from ..utils import which_dataframe, _to_pandas, _to_arrow
+
+# if_exists of DataFrame.to_gbq as the write disposition of a bigquery load job
+_BIGQUERY_WRITE_DISPOSITIONS = {'fail': 'WRITE_EMPTY', 'replace': 'WRITE_TRUNCATE', 'append': 'WRITE_APPEND'}
 
 def _snowflake_connector(config, database, schema, protocol):
+    from snowflake import connector
     if database and schema:
         sf_conn = connector.connect(
             host = config['HOST'],
@@ -34,14 +41,45 @@ def _snowflake_executer(conn, query, return_type='pandas'):
     elif return_type=='polars':
         import polars as pl
         data = pl.from_arrow(cur.fetch_arrow_all())
+    elif return_type=='arrow':
+        data = cur.fetch_arrow_all()
     return data
 
+def _snowflake_write_arrow(conn, table, table_name):
+    """
+    Loads the arrow table into the existing snowflake table the way write_pandas does for pandas frames:
+    the table is written as a parquet file, PUT to the table stage and copied with the columns matched by name.
+    """
+    import pyarrow.parquet as pq
+    filename = f"{uuid.uuid4().hex}.parquet"
+    stage = f'@%"{table_name}"'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, filename)
+        pq.write_table(table, file_path)
+        cur = conn.cursor()
+        try:
+            cur.execute(f"PUT 'file://{Path(file_path).as_posix()}' {stage} AUTO_COMPRESS=FALSE")
+            cur.execute(f"COPY INTO \"{table_name}\" FROM {stage} FILES=('{filename}') FILE_FORMAT=(TYPE=PARQUET) "
+                        "MATCH_BY_COLUMN_NAME=CASE_INSENSITIVE PURGE=TRUE")
+        finally:
+            cur.close()
+
 def _df_to_file_writer(df,filename: str) -> None:
     suffix = Path(filename).suffix
     if suffix:
         extension = suffix[1:]
     else:
         extension = 'csv'
+    if which_dataframe(df) in ('arrow', 'arrow_stream') and extension in ['parquet', 'feather']:
+        # written from the arrow buffers, the other formats go through pandas
+        if extension=='parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(_to_arrow(df), filename)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(_to_arrow(df), filename)
+        return
+    df = _to_pandas(df)
     if extension=='csv':
         df.to_csv(filename, index=False)
     elif extension=='parquet':
@@ -55,4 +93,185 @@ def _df_to_file_writer(df,filename: str) -> None:
     elif extension=='feather':
         df.to_feather(filename)
     else:
-        raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
\ No newline at end of file
+        raise ExtensionNotSupportException(f'Unsupported Extension: {extension}')
+def _redshift_copy(engine, s3_client, df, table_name, staging_path, iam_role, if_exists='append', index=False,
+                   parallel=4, chunk_rows=1000000):
+    """
+    Writes the dataframe to the redshift table with COPY from s3: the frame is staged as parquet parts of chunk_rows
+    rows under staging_path (uploaded on parallel threads), loaded by the cluster slices in parallel, and the parts
+    are removed. The table is created (or replaced) and loaded in one transaction.
+
+    Args:
+        engine (Engine): sqlalchemy engine of the redshift cluster (postgresql dialect)
+        s3_client (S3.Client): boto3 s3 client writing to staging_path
+        df (DataFrame): pandas, polars or arrow frame
+        table_name (str): table name
+        staging_path (str): s3://bucket/prefix the parts are staged under
+        iam_role (str): arn of the iam role the cluster reads the parts with
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy import inspect
+    from ..databases.utils import _arrow_input, _batches, _create_table_sql, _quote
+    schema, data = _arrow_input(df, index)
+    exists = inspect(engine).has_table(table_name)
+    if exists and if_exists=='fail':
+        raise ValueError(f"Table '{table_name}' already exists.")
+    bucket, _, prefix = staging_path.replace('s3://', '', 1).partition('/')
+    prefix = f"{prefix.strip('/')}/{table_name}-{uuid.uuid4().hex}/".lstrip('/')
+    def upload(part):
+        number, batch = part
+        buf = pa.BufferOutputStream()
+        pq.write_table(pa.Table.from_batches([batch]), buf)
+        s3_client.put_object(Bucket=bucket, Key=f"{prefix}part-{number:05d}.parquet", Body=buf.getvalue().to_pybytes())
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            parts = len(list(executor.map(upload, enumerate(_batches(data, chunk_rows)))))
+        statements = []
+        if exists and if_exists=='replace':
+            statements.append(f"DROP TABLE {_quote(table_name)}")
+        if not exists or if_exists=='replace':
+            statements.append(_create_table_sql(table_name, schema, redshift=True))
+        if parts:
+            statements.append(f"COPY {_quote(table_name)} FROM 's3://{bucket}/{prefix}' IAM_ROLE '{iam_role}' FORMAT AS PARQUET")
+        conn = engine.raw_connection()
+        try:
+            cur = conn.cursor()
+            for statement in statements:
+                cur.execute(statement)
+            cur.close()
+            conn.commit()
+        finally:
+            conn.close()
+    finally:
+        for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+            keys = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+            if keys:
+                s3_client.delete_objects(Bucket=bucket, Delete={'Objects': keys})
+
+# stream load statuses of a committed load, the other statuses are failures
+_STREAM_LOAD_DONE = ('Success', 'Publish Timeout')
+# seconds allowed to connect to / get the response of a stream load request
+_STREAM_LOAD_CONNECT_TIMEOUT = 30
+_STREAM_LOAD_READ_TIMEOUT = 600
+
+def _stream_load_put(http, url, headers, body, max_redirects=3):
+    """
+    PUTs the body, following the redirect of the frontend to a backend by hand: http clients drop the
+    authorization header (and some the body) when they follow a redirect to another host.
+    """
+    for _ in range(max_redirects + 1):
+        response = http.request('PUT', url, body=body, headers=headers, redirect=False, retries=False)
+        if response.status not in (301, 302, 303, 307, 308):
+            return response
+        url = response.headers['Location']
+    raise StreamLoadException(f"Too many redirects loading {url}")
+
+class _RetryStreamLoad(Exception):
+    pass
+
+def _stream_load_attempt(http, url, headers, body):
+    """
+    Returns once the load is committed, raises _RetryStreamLoad on transient failures (connection errors, 5xx,
+    label still in progress) and StreamLoadException on the others
+    """
+    import json
+    import urllib3
+    label = headers['label']
+    try:
+        response = _stream_load_put(http, url, headers, body)
+    except urllib3.exceptions.HTTPError as e:
+        raise _RetryStreamLoad(repr(e))
+    if response.status >= 500:
+        raise _RetryStreamLoad(f"http status {response.status}")
+    if response.status != 200:
+        raise StreamLoadException(f"Stream load {label} rejected with http status {response.status}", response.data)
+    result = json.loads(response.data)
+    status = result.get('Status')
+    if status in _STREAM_LOAD_DONE:
+        return
+    if status=='Label Already Exists':
+        # committed by an earlier attempt whose response was lost
+        if result.get('ExistingJobStatus')=='FINISHED':
+            return
+        raise _RetryStreamLoad(f"label {label} is {result.get('ExistingJobStatus')}")
+    error_url = f" (rejected rows: {result['ErrorURL']})" if result.get('ErrorURL') else ''
+    raise StreamLoadException(f"Stream load {label} failed: {result.get('Message')}{error_url}", result)
+
+def _stream_load_chunk(http, url, headers, body, retries, backoff):
+    """
+    Loads one chunk with the label of headers, retrying transient failures with the same label, so that a chunk
+    committed by an attempt whose response was lost is not loaded twice. Returns the number of retries.
+    """
+    import time
+    for attempt in range(retries + 1):
+        try:
+            _stream_load_attempt(http, url, headers, body)
+            return attempt
+        except _RetryStreamLoad as e:
+            if attempt==retries:
+                raise StreamLoadException(f"Stream load {headers['label']} failed after {retries} retries: {e}")
+            time.sleep(backoff * 2 ** attempt)
+
+def _starrocks_stream_load(url, username, password, df, index=False, parallel=4, chunk_rows=500000, retries=3,
+                           backoff=0.5, label_prefix=None):
+    """
+    Loads the dataframe into the starrocks table of the stream load url in chunks of chunk_rows rows, parallel
+    chunks at a time. Each chunk is its own load transaction with the label <label_prefix>_<chunk number>.
+    The rows are encoded as text with \\x01 / \\x02 column / row separators (nulls as \\N), which the values must not contain.
+
+    Args:
+        url (str): http://<fe host>:<http port>/api/<database>/<table>/_stream_load
+        username (str): starrocks user
+        password (str): starrocks password
+        df (DataFrame): pandas, polars or arrow frame
+        index (bool, optional): write the index of a pandas frame as a column. Defaults to False.
+        parallel (int, optional): number of chunks loaded concurrently. Defaults to 4.
+        chunk_rows (int, optional): rows per load transaction. Defaults to 500000.
+        retries (int, optional): retries of a chunk on transient failures. Defaults to 3.
+        backoff (float, optional): seconds before the first retry, doubled on every retry. Defaults to 0.5.
+        label_prefix (str, optional): prefix of the labels. Defaults to None (a new random prefix).
+
+    Returns:
+        int: number of chunks loaded
+    """
+    import re
+    import urllib3
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from ..databases.utils import _arrow_input, _backquote, _batches, _delimited_chunks
+    from ..instrumentation import current_operation, _run_in_context
+    schema, data = _arrow_input(df, index)
+    label_prefix = label_prefix or re.sub(r'[^-\w]', '_', f"dataligo_{url.rstrip('/').split('/')[-2]}_{uuid.uuid4().hex}")[:100]
+    headers = {**urllib3.util.make_headers(basic_auth=f"{username}:{password}"), 'Expect': '100-continue',
+               'format': 'csv', 'column_separator': '\\x01', 'row_delimiter': '\\x02',
+               'columns': ', '.join(_backquote(name) for name in schema.names)}
+    http = urllib3.PoolManager(maxsize=parallel, timeout=urllib3.Timeout(connect=_STREAM_LOAD_CONNECT_TIMEOUT,
+                                                                         read=_STREAM_LOAD_READ_TIMEOUT))
+    def load(number, batch):
+        body = b''.join(_delimited_chunks([batch], '\x01', '\x02', escape=False))
+        retried = _stream_load_chunk(http, url, {**headers, 'label': f"{label_prefix}_{number}"}, body, retries, backoff)
+        current_operation().add_bytes(len(body))
+        current_operation().add_retries(retried)
+    chunks = 0
+    pending = set()
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            try:
+                for number, batch in enumerate(_batches(data, chunk_rows)):
+                    pending.add(_run_in_context(executor, load, number, batch))
+                    chunks += 1
+                    # bound the encoded chunks held in memory
+                    if len(pending) >= 2 * parallel:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        for future in pending:
+            future.result()
+    finally:
+        http.clear()
+    return chunks
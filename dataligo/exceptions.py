@@ -20,4 +20,14 @@ class UnSupportedDataFrameException(Exception):
 
 class ModuleNotFoundException(Exception):
     def __init__(self,message):
-        self.message = message
\ No newline at end of file
+        self.message = message
+
+class TransferFailedException(Exception):
+    def __init__(self,message,summary=None):
+        self.message = message
+        self.summary = summary
+
+class StreamLoadException(Exception):
+    def __init__(self,message,response=None):
+        self.message = message
+        self.response = response
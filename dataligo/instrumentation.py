@@ -0,0 +1,391 @@
+import time
+import logging
+import inspect
+import threading
+import contextvars
+from bisect import bisect_left
+from functools import wraps
+from .utils import which_dataframe
+from .exceptions import ModuleNotFoundException
+
+logger = logging.getLogger('dataligo')
+
+_current_operation = contextvars.ContextVar('dataligo_operation', default=None)
+
+class Operation():
+    def __init__(self, instrumentation, source: str, operation: str, target: str = None) -> None:
+        """
+        Metrics of one connector method call, sent to the sinks of the instrumentation when the call ends.
+
+        Args:
+            instrumentation (Instrumentation): instrumentation the operation reports to
+            source (str): data source name (eg: s3, postgresql)
+            operation (str): connector method name (eg: read_as_dataframe)
+            target (str, optional): path, table or index the operation works on. Defaults to None.
+        """
+        self.instrumentation = instrumentation
+        self.source = source
+        self.operation = operation
+        self.target = target
+        self.bytes = 0
+        self.rows = None
+        self.files = None
+        self.retries = 0
+        self.time_to_first_byte = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_bytes(self, n: int) -> None:
+        """
+        Adds n transferred bytes and marks the time to first byte. Thread safe, usable as a boto3 transfer Callback.
+        """
+        with self._lock:
+            if self.time_to_first_byte is None:
+                self.time_to_first_byte = time.perf_counter() - self._start
+            self.bytes += n
+
+    def first_byte(self) -> None:
+        """
+        Marks the time to first byte, if not marked already
+        """
+        self.add_bytes(0)
+
+    def add_rows(self, n: int) -> None:
+        with self._lock:
+            self.rows = (self.rows or 0) + n
+
+    def add_retries(self, n: int) -> None:
+        with self._lock:
+            self.retries += n
+
+    def message(self, *args) -> None:
+        """
+        User facing message of the operation, see Instrumentation.message
+        """
+        self.instrumentation.message(*args)
+
+    def _observe(self, df, result):
+        # rows of the dataframe returned or written, bytes / files / retries of a transfer summary,
+        # files of a partitioned write manifest
+        if self.rows is None:
+            if which_dataframe(result) in ('pandas', 'polars', 'arrow'):
+                self.rows = len(result)
+            elif which_dataframe(df) in ('pandas', 'polars', 'arrow'):
+                self.rows = len(df)
+        if isinstance(result, dict) and 'files' in result and 'bytes' in result:
+            self.files = result['files']
+            self.bytes = self.bytes or result['bytes']
+            self.retries += result.get('retries', 0)
+        elif isinstance(result, list) and result and isinstance(result[0], dict) and 'rows' in result[0]:
+            self.files = len(result)
+
+    def _metrics(self, error=None):
+        seconds = time.perf_counter() - self._start
+        return {'source': self.source, 'operation': self.operation, 'target': self.target,
+                'status': 'error' if error is not None else 'ok', 'error': repr(error) if error is not None else None,
+                'bytes': self.bytes, 'rows': self.rows, 'files': self.files, 'retries': self.retries,
+                'seconds': seconds, 'time_to_first_byte': self.time_to_first_byte,
+                'start_time': self.start_time, 'end_time': self.start_time + seconds}
+
+class _NoOperation(Operation):
+    # reported to outside of an instrumented call, the metrics are dropped
+    def __init__(self) -> None:
+        super().__init__(None, None, None)
+
+    def add_bytes(self, n: int) -> None:
+        pass
+
+    def first_byte(self) -> None:
+        pass
+
+    def add_rows(self, n: int) -> None:
+        pass
+
+    def add_retries(self, n: int) -> None:
+        pass
+
+    def message(self, *args) -> None:
+        DEFAULT_INSTRUMENTATION.message(*args)
+
+class Instrumentation():
+    def __init__(self, sinks: list = None, verbose: bool = False) -> None:
+        """
+        Sends the metrics of every connector method call to its sinks, objects with a record(metrics) method.
+        Connector messages are logged to the dataligo logger, and printed only if verbose.
+
+        Args:
+            sinks (list, optional): metric sinks. Defaults to None.
+            verbose (bool, optional): print the messages of the connectors. Defaults to False.
+        """
+        self.sinks = list(sinks or [])
+        self.verbose = verbose
+
+    def add_sink(self, sink) -> None:
+        """
+        Adds a metric sink
+
+        Args:
+            sink (object): object with a record(metrics) method
+        """
+        self.sinks.append(sink)
+
+    def message(self, *args) -> None:
+        """
+        Logs a user facing message, and prints it if verbose
+        """
+        if self.verbose:
+            print(*args)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(' '.join(str(arg) for arg in args))
+
+    def start(self, source: str, operation: str, target: str = None) -> Operation:
+        """
+        Starts an operation, which is sent to the sinks by finish
+        """
+        return Operation(self, source, operation, target)
+
+    def finish(self, operation: Operation, error: BaseException = None) -> None:
+        """
+        Sends the metrics of the operation to the sinks. A failing sink is logged and does not fail the operation.
+        """
+        if not self.sinks:
+            return
+        metrics = operation._metrics(error)
+        for sink in self.sinks:
+            try:
+                sink.record(metrics)
+            except Exception:
+                logger.exception('dataligo metric sink %r failed', sink)
+
+# used by the connectors created without a Ligo object
+DEFAULT_INSTRUMENTATION = Instrumentation()
+_NO_OPERATION = _NoOperation()
+
+def current_operation() -> Operation:
+    """
+    Returns the operation of the instrumented connector method being run, else one whose metrics are dropped.
+    """
+    return _current_operation.get() or _NO_OPERATION
+
+def _message(*args) -> None:
+    current_operation().message(*args)
+
+def _bind_arguments(signature, self, args, kwargs):
+    try:
+        bound = signature.bind(self, *args, **kwargs)
+    except TypeError:
+        return {}
+    bound.apply_defaults()
+    return bound.arguments
+
+def _target(name, arguments):
+    if '{' in name:
+        try:
+            return name.format(**arguments)
+        except (KeyError, IndexError):
+            return None
+    value = arguments.get(name)
+    return str(value) if value is not None else None
+
+def instrumented(*target_args):
+    """
+    Decorator of the connector methods, which runs the call as an operation of the connector's instrumentation.
+    Plain, generator and coroutine methods are supported.
+
+    Args:
+        *target_args (str): names of the method arguments describing the target, or templates of them like
+                            's3://{bucket}/{key}'. The first one which is not None is used.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        def start(self, args, kwargs):
+            # read by the idle eviction of the connectors cached by Ligo
+            self.last_used = time.monotonic()
+            instrumentation = getattr(self, 'instrumentation', DEFAULT_INSTRUMENTATION)
+            source = getattr(self, 'data_source', type(self).__name__.lower())
+            arguments = _bind_arguments(signature, self, args, kwargs)
+            target = next(filter(None, (_target(name, arguments) for name in target_args)), None)
+            return instrumentation, instrumentation.start(source, func.__name__, target), arguments
+
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def generator_wrapper(self, *args, **kwargs):
+                instrumentation, op, arguments = start(self, args, kwargs)
+                error = None
+                try:
+                    token = _current_operation.set(op)
+                    try:
+                        batches = func(self, *args, **kwargs)
+                    finally:
+                        _current_operation.reset(token)
+                    while True:
+                        # the operation is only current while the generator runs, not while the caller handles a batch
+                        token = _current_operation.set(op)
+                        try:
+                            batch = next(batches)
+                        except StopIteration:
+                            break
+                        finally:
+                            _current_operation.reset(token)
+                        op.first_byte()
+                        op.add_rows(len(batch))
+                        yield batch
+                except BaseException as e:
+                    if not isinstance(e, GeneratorExit):
+                        error = e
+                    raise
+                finally:
+                    instrumentation.finish(op, error)
+            return generator_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def coroutine_wrapper(self, *args, **kwargs):
+                instrumentation, op, arguments = start(self, args, kwargs)
+                token = _current_operation.set(op)
+                try:
+                    result = await func(self, *args, **kwargs)
+                except BaseException as e:
+                    instrumentation.finish(op, e)
+                    raise
+                finally:
+                    _current_operation.reset(token)
+                op._observe(arguments.get('df'), result)
+                instrumentation.finish(op)
+                return result
+            return coroutine_wrapper
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            instrumentation, op, arguments = start(self, args, kwargs)
+            token = _current_operation.set(op)
+            try:
+                result = func(self, *args, **kwargs)
+            except BaseException as e:
+                instrumentation.finish(op, e)
+                raise
+            finally:
+                _current_operation.reset(token)
+            op._observe(arguments.get('df'), result)
+            instrumentation.finish(op)
+            return result
+        return wrapper
+    return decorator
+
+def _run_in_context(executor, func, *args):
+    """
+    Submits func to the executor with a copy of the current context, so the worker reports to the caller's operation.
+    """
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+class LoggingSink():
+    def __init__(self, logger: logging.Logger = logger, level: int = logging.INFO) -> None:
+        """
+        Logs one line per operation, with the metrics as the `dataligo` attribute of the log record.
+
+        Args:
+            logger (logging.Logger, optional): logger. Defaults to the dataligo logger.
+            level (int, optional): log level. Defaults to logging.INFO.
+        """
+        self.logger = logger
+        self.level = level
+
+    def record(self, metrics: dict) -> None:
+        self.logger.log(self.level, "%s.%s %s %s: %d bytes, %s rows, %d retries in %.3fs (ttfb %s)",
+                        metrics['source'], metrics['operation'], metrics['target'] or '', metrics['status'],
+                        metrics['bytes'], metrics['rows'], metrics['retries'], metrics['seconds'],
+                        f"{metrics['time_to_first_byte']:.3f}s" if metrics['time_to_first_byte'] is not None else '-',
+                        extra={'dataligo': metrics})
+
+DEFAULT_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+class MetricsRegistry():
+    def __init__(self, buckets: tuple = DEFAULT_DURATION_BUCKETS) -> None:
+        """
+        Aggregates the operations in process as Prometheus style counters and duration histograms.
+
+        Args:
+            buckets (tuple, optional): upper bounds in seconds of the histogram buckets. Defaults to DEFAULT_DURATION_BUCKETS.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, metrics: dict) -> None:
+        labels = (('source', metrics['source']), ('operation', metrics['operation']), ('status', metrics['status']))
+        with self._lock:
+            self._increment('dataligo_operations_total', labels, 1)
+            self._increment('dataligo_bytes_total', labels, metrics['bytes'])
+            self._increment('dataligo_rows_total', labels, metrics['rows'] or 0)
+            self._increment('dataligo_retries_total', labels, metrics['retries'])
+            self._observe('dataligo_operation_seconds', labels, metrics['seconds'])
+            if metrics['time_to_first_byte'] is not None:
+                self._observe('dataligo_time_to_first_byte_seconds', labels, metrics['time_to_first_byte'])
+
+    def snapshot(self) -> dict:
+        """
+        Returns the current values
+
+        Returns:
+            dict: {'counters': {(name, labels): value}, 'histograms': {(name, labels): {'buckets', 'sum', 'count'}}}
+        """
+        with self._lock:
+            return {'counters': dict(self._counters),
+                    'histograms': {key: {'buckets': list(value['buckets']), 'sum': value['sum'], 'count': value['count']}
+                                   for key, value in self._histograms.items()}}
+
+    def render(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for (name, labels), value in sorted(snapshot['counters'].items()):
+            lines.append(f"{name}{{{_format_labels(labels)}}} {value}")
+        for (name, labels), value in sorted(snapshot['histograms'].items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), value['buckets']):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{{{_format_labels(labels + (('le', le),))}}} {cumulative}")
+            lines.append(f"{name}_sum{{{_format_labels(labels)}}} {value['sum']}")
+            lines.append(f"{name}_count{{{_format_labels(labels)}}} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def _increment(self, name, labels, value):
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0) + value
+
+    def _observe(self, name, labels, value):
+        histogram = self._histograms.setdefault((name, labels), {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0})
+        histogram['buckets'][bisect_left(self.buckets, value)] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+def _format_labels(labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels)
+
+class OpenTelemetrySink():
+    def __init__(self, tracer=None) -> None:
+        """
+        Creates one dataligo.<operation> span per operation, with the metrics as attributes.
+
+        Args:
+            tracer (opentelemetry.trace.Tracer, optional): tracer. Defaults to the tracer of the global tracer provider.
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ModuleNotFoundException('opentelemetry not found. try `pip install opentelemetry-api`')
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer('dataligo')
+
+    def record(self, metrics: dict) -> None:
+        attributes = {f"dataligo.{key}": value for key, value in metrics.items()
+                      if value is not None and key not in ('start_time', 'end_time', 'error')}
+        span = self.tracer.start_span(f"dataligo.{metrics['operation']}", start_time=int(metrics['start_time'] * 1e9),
+                                      attributes=attributes)
+        if metrics['error'] is not None:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, metrics['error']))
+        span.end(end_time=int(metrics['end_time'] * 1e9))
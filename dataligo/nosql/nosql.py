@@ -1,8 +1,9 @@
 import pandas as pd
 from typing import List, Dict
 from sqlalchemy import create_engine
-from ..utils import which_dataframe
-from ..exceptions import UnSupportedDataFrameException, ModuleNotFoundException
+from ..utils import _to_records, _as_return_type
+from ..instrumentation import instrumented, _message
+from ..exceptions import ModuleNotFoundException
 
 class ElasticSearch():
     def __init__(self,config):
@@ -24,7 +25,14 @@ class ElasticSearch():
                 self._es = Elasticsearch([config['HOST']])
         except ImportError:
             raise ModuleNotFoundException('elasticsearch not found. try `pip install elasticsearch`')
+
+    def close(self) -> None:
+        """
+        Closes the elasticsearch client and its connection pool
+        """
+        self._es.close()
     
+    @instrumented('index')
     def read_as_dataframe(self,query: str,index: str,return_type='pandas'):
         """
         Takes query and index as arguments and return the dataframe
@@ -47,7 +55,11 @@ class ElasticSearch():
         elif return_type=='polars':
             import polars as pl
             return pl.from_records(records)
+        elif return_type=='arrow':
+            import pyarrow as pa
+            return pa.Table.from_pylist(records)
         
+    @instrumented('index')
     def write_dataframe(self, df, index: str):
         """
         Takes DataFrame, index name as arguments and write the dataframe to ElasticSearch.
@@ -56,12 +68,7 @@ class ElasticSearch():
             index (str): index name
         """
         from elasticsearch.helpers import bulk
-        if which_dataframe(df)=='pandas':
-            records = df.to_dict('records')
-        elif which_dataframe(df)=='polars':
-            records = df.to_dicts()
-        else:
-            raise UnSupportedDataFrameException(f"Unsupported Dataframe: {which_dataframe(df)}")
+        records = _to_records(df)
         actions = [
             {
                 "_index": index,
@@ -71,7 +78,7 @@ class ElasticSearch():
         ]
         # Perform the bulk insert operation
         bulk(self._es, actions)
-        print("Dataframe saved to the es index:", f"{index}")
+        _message("Dataframe saved to the es index:", f"{index}")
 
         
 class MongoDB():
@@ -88,6 +95,13 @@ class MongoDB():
         except ImportError:
             raise ModuleNotFoundException('pymongo not found. try `pip install pymongo`')
 
+    def close(self) -> None:
+        """
+        Closes the mongodb client and its connection pool
+        """
+        self._mdb.close()
+
+    @instrumented('{database}.{collection}')
     def read_as_dataframe(self,database: str,collection: str,filter_query: dict=None,return_type='pandas'):
         """
         Takes database, collections as arguments and return the dataframe
@@ -110,7 +124,12 @@ class MongoDB():
         elif return_type=='polars':
             import polars as pl
             return pl.from_records(records)
+        elif return_type=='arrow':
+            import pyarrow as pa
+            # arrow has no type for the bson ObjectId
+            return pa.Table.from_pylist([{**record, '_id': str(record['_id'])} if '_id' in record else record for record in records])
         
+    @instrumented('{database}.{collection}')
     def write_dataframe(self, df, database: str, collection: str):
         """
         Takes DataFrame, database name, collection name as arguments and write the dataframe to MongoDB.
@@ -120,14 +139,9 @@ class MongoDB():
             database (str): database name
             collection (str): collection name
         """
-        if which_dataframe(df)=='pandas':
-            records = df.to_dict('records')
-        elif which_dataframe(df)=='polars':
-            records = df.to_dicts()
-        else:
-            raise UnSupportedDataFrameException(f"Unsupported Dataframe: {which_dataframe(df)}")
+        records = _to_records(df)
         self._mdb[database][collection].insert_many(records)
-        print("Dataframe saved to the collections:", f"{collection}")
+        _message("Dataframe saved to the collections:", f"{collection}")
 
 # reference: https://github.com/DrGFreeman/dynamo-pandas
 class DynamoDB():
@@ -145,6 +159,7 @@ class DynamoDB():
         except ImportError:
             raise ModuleNotFoundException('dynamo_pandas not found. try `pip install dynamo-pandas`')
 
+    @instrumented('table')
     def read_as_dataframe(self, table: str, keys=None, attributes=None, dtype=None,return_type='pandas'):
         """
         Takes table name, keys as arguments and return the dataframe
@@ -154,7 +169,7 @@ class DynamoDB():
             keys (list, optional): filter query. Defaults to None.
             attributes (list, optional): fields want to pull from dynamodb. Defaults to None.
             dtype (dict, optional): parse the return field data type. Defaults to None.
-            return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask etc). Defaults to 'pandas'.
 
         Returns:
             DataFrame: Depends on the return_type parameter.
@@ -179,7 +194,11 @@ class DynamoDB():
         elif return_type=='polars':
             import polars as pl
             return pl.from_records(items)
+        elif return_type=='arrow':
+            import pyarrow as pa
+            return pa.Table.from_pylist(items)
     
+    @instrumented('table')
     def write_dataframe(self, df, table: str):
         """
         Takes DataFrame, table name as arguments and write the dataframe to DynamoDB.
@@ -189,14 +208,9 @@ class DynamoDB():
             table (str): table name
         """
         from dynamo_pandas.transactions import put_items
-        if which_dataframe(df)=='pandas':
-            records = df.to_dict('records')
-        elif which_dataframe(df)=='polars':
-            records = df.to_dicts()
-        else:
-            raise UnSupportedDataFrameException(f"Unsupported Dataframe: {which_dataframe(df)}")
+        records = _to_records(df)
         put_items(items=records, table=table, boto3_kwargs=self._ddb)
-        print("Dataframe records updated to the DynamoDB table:", table)
+        _message("Dataframe records updated to the DynamoDB table:", table)
 
 # source: https://www.cdata.com/kb/tech/redis-python-pandas.rst
 class Redis():
@@ -209,15 +223,22 @@ class Redis():
         """
         self._redis_engine = create_engine(f"redis:///?Server={config['HOST']}&;Port={config['PORT']}&Password={config['PASSWORD']}")
 
+    def close(self) -> None:
+        """
+        Disposes the sqlalchemy engine and its connection pool
+        """
+        self._redis_engine.dispose()
+
+    @instrumented()
     def read_as_dataframe(self, query: str, return_type='pandas'):
         """
         Takes query as arguments and return the dataframe
 
         Args:
             query (str): query
-            return_type (str, optional): which dataframe you want to return (pandas, polars, dask etc). Defaults to 'pandas'.
+            return_type (str, optional): which dataframe you want to return (pandas, polars, arrow, dask etc). Defaults to 'pandas'.
 
         Returns:
             DataFrame: Depends on the return_type parameter.
         """
-        return pd.read_sql(query, self._redis_engine)
\ No newline at end of file
+        return _as_return_type(pd.read_sql(query, self._redis_engine), return_type)
\ No newline at end of file
@@ -1,3 +1,7 @@
+import json
+import threading
+from .exceptions import UnSupportedDataFrameException, ModuleNotFoundException
+
 def which_dataframe(df):
     df_type = str(type(df)).split("'")[1]
     if df_type.startswith('pandas'):
@@ -5,4 +9,112 @@ def which_dataframe(df):
     elif df_type.startswith('polars'):
         return 'polars'
     elif df_type.startswith('dask'):
-        return 'dask'
\ No newline at end of file
+        return 'dask'
+    elif df_type in ('pyarrow.lib.Table', 'pyarrow.lib.RecordBatch'):
+        return 'arrow'
+    elif df_type=='pyarrow.lib.RecordBatchReader':
+        return 'arrow_stream'
+
+def _to_arrow(df):
+    """
+    Returns the dataframe as a pyarrow Table. Arrow input is returned as is and polars frames share their
+    buffers with the table, only pandas input is copied.
+    """
+    import pyarrow as pa
+    df_type = which_dataframe(df)
+    if df_type=='arrow':
+        return df if isinstance(df, pa.Table) else pa.Table.from_batches([df])
+    elif df_type=='arrow_stream':
+        return df.read_all()
+    elif df_type=='polars':
+        return df.to_arrow()
+    elif df_type=='pandas':
+        return pa.Table.from_pandas(df, preserve_index=False)
+    raise UnSupportedDataFrameException(f"Unsupported Dataframe: {df_type}")
+
+def _to_pandas(df):
+    """
+    Returns the dataframe as a pandas DataFrame, for the writers which only take pandas
+    """
+    df_type = which_dataframe(df)
+    if df_type=='pandas':
+        return df
+    elif df_type=='polars':
+        return df.to_pandas()
+    elif df_type in ('arrow', 'arrow_stream'):
+        return _to_arrow(df).to_pandas()
+    raise UnSupportedDataFrameException(f"Unsupported Dataframe: {df_type}")
+
+def _to_records(df):
+    """
+    Returns the rows of the dataframe as a list of dicts
+    """
+    df_type = which_dataframe(df)
+    if df_type=='pandas':
+        return df.to_dict('records')
+    elif df_type=='polars':
+        return df.to_dicts()
+    elif df_type in ('arrow', 'arrow_stream'):
+        return _to_arrow(df).to_pylist()
+    raise UnSupportedDataFrameException(f"Unsupported Dataframe: {df_type}")
+
+def _as_return_type(df, return_type):
+    """
+    Converts the dataframe to the return_type (pandas, polars or arrow)
+    """
+    if return_type=='arrow':
+        return _to_arrow(df)
+    elif return_type=='polars':
+        import polars as pl
+        if which_dataframe(df)=='polars':
+            return df
+        elif which_dataframe(df)=='pandas':
+            return pl.from_pandas(df)
+        return pl.from_arrow(_to_arrow(df))
+    return _to_pandas(df)
+
+def _rebatch(batches, batch_size):
+    """
+    Regroups an iterable of arrow record batches (or tables) of any size into tables of batch_size rows,
+    the last one holding the remaining rows
+    """
+    import pyarrow as pa
+    pending, rows = [], 0
+    for batch in batches:
+        table = _to_arrow(batch)
+        while table.num_rows:
+            take = min(batch_size - rows, table.num_rows)
+            pending.append(table.slice(0, take))
+            rows += take
+            table = table.slice(take)
+            if rows==batch_size:
+                yield pa.concat_tables(pending)
+                pending, rows = [], 0
+    if rows:
+        yield pa.concat_tables(pending)
+
+def _dask():
+    """
+    Returns the dask and dask.dataframe modules for return_type='dask'
+    """
+    try:
+        import dask
+        import dask.dataframe as dd
+    except ImportError:
+        raise ModuleNotFoundException('dask not found. try `pip install "dask[dataframe]"`')
+    return dask, dd
+
+# connectors created on the dask workers, by connector class and config
+_WORKER_CONNECTORS = {}
+_WORKER_CONNECTORS_LOCK = threading.Lock()
+
+def _worker_connector(connector_class, config):
+    """
+    Returns the connector of the config created in this process (a dask worker), so that the dask tasks carry the
+    config instead of clients or connection strings
+    """
+    key = (connector_class, json.dumps(config, sort_keys=True, default=str))
+    with _WORKER_CONNECTORS_LOCK:
+        if key not in _WORKER_CONNECTORS:
+            _WORKER_CONNECTORS[key] = connector_class(config)
+        return _WORKER_CONNECTORS[key]